@@ -0,0 +1,145 @@
+"""
+Throughput and tail latency of /room/run at several candidate counts.
+
+Starts the fake LLM and the fake code runner, runs the service against them,
+and for every candidate count prepares that many rooms (task and test suite
+generated) and has every candidate run its solution `--runs` times in a row
+against the visible tests.
+
+    python -m benchmarks.code_run_load [--candidates 1,10,50] [--runs 5]
+        [--latency lognormal] [--median 0.3] [--rate-limit-rate 0] [--error-rate 0]
+"""
+
+import argparse
+import asyncio
+import time
+from collections import defaultdict
+
+import aiohttp
+
+from benchmarks.fake_llm import FakeLLMConfig, start_fake_llm
+from benchmarks.fake_runner import LATENCY_DISTRIBUTIONS, FakeRunnerConfig, start_fake_runner
+from benchmarks.load_test import (
+    Candidate,
+    Results,
+    fake_env,
+    free_port,
+    percentile,
+    start_service,
+    wait_ready,
+)
+
+
+async def prepare(candidate: Candidate) -> None:
+    """
+    Room with a task and visible tests
+    """
+    await candidate.create_room()
+    await candidate.stream("task", "/api/v1/room/task/sse")
+    await candidate.wait_for_tests()
+
+
+async def run_level(base_url: str, candidates: int, runs: int) -> tuple[list[float], dict, float]:
+    """
+    (latencies, errors, seconds) of `runs` runs by each of `candidates` candidates
+    """
+    latencies: list[float] = []
+    errors: dict[str, int] = defaultdict(int)
+
+    sessions = [
+        aiohttp.ClientSession(
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=aiohttp.ClientTimeout(total=300),
+        )
+        for _ in range(candidates)
+    ]
+    players = [Candidate(base_url, Results(), run_code=True, session=s) for s in sessions]
+
+    try:
+        await asyncio.gather(*(prepare(candidate) for candidate in players))
+
+        async def play(candidate: Candidate) -> None:
+            for _ in range(runs):
+                started = time.perf_counter()
+                try:
+                    await candidate.run_tests()
+                except aiohttp.ClientResponseError as e:
+                    errors[str(e.status)] += 1
+                    continue
+                except Exception as e:
+                    errors[type(e).__name__] += 1
+                    continue
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(play(candidate) for candidate in players))
+        elapsed = time.perf_counter() - started
+
+        # Rooms without answers may fail to compute metrics, that is not measured here
+        await asyncio.gather(*(candidate.stop() for candidate in players), return_exceptions=True)
+    finally:
+        await asyncio.gather(*(session.close() for session in sessions))
+    return latencies, errors, elapsed
+
+
+async def run_benchmark(args: argparse.Namespace) -> None:
+    llm_port, runner_port, service_port = free_port(), free_port(), free_port()
+    # Fast model, the runner is what is measured
+    fake = await start_fake_llm(FakeLLMConfig(ttft=0.01, tokens_per_second=5000), llm_port)
+    runner = await start_fake_runner(
+        FakeRunnerConfig(
+            latency=args.latency,
+            median=args.median,
+            rate_limit_rate=args.rate_limit_rate,
+            error_rate=args.error_rate,
+            max_concurrency=args.max_concurrency,
+            seed=args.seed,
+        ),
+        runner_port,
+    )
+    service = start_service(service_port, fake_env(llm_port, runner_port))
+    base_url = f"http://127.0.0.1:{service_port}"
+
+    try:
+        await wait_ready(base_url)
+        print(
+            f"{'candidates':>10} {'runs':>6} {'runs/s':>8} {'p50 s':>8} {'p95 s':>8} "
+            f"{'p99 s':>8} {'max s':>8}  errors"
+        )
+        for candidates in args.candidates:
+            latencies, errors, elapsed = await run_level(base_url, candidates, args.runs)
+            if latencies:
+                print(
+                    f"{candidates:>10} {len(latencies):>6} {len(latencies) / elapsed:>8.2f} "
+                    f"{percentile(latencies, 50):>8.3f} {percentile(latencies, 95):>8.3f} "
+                    f"{percentile(latencies, 99):>8.3f} {max(latencies):>8.3f}  {dict(errors) or ''}"
+                )
+            else:
+                print(f"{candidates:>10} {0:>6}  all runs failed: {dict(errors)}")
+    finally:
+        service.terminate()
+        service.wait(timeout=30)
+        await runner.cleanup()
+        await fake.cleanup()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        "--candidates",
+        type=lambda value: [int(n) for n in value.split(",")],
+        default=[1, 10, 50],
+        help="comma-separated candidate counts",
+    )
+    parser.add_argument("--runs", type=int, default=5, help="runs per candidate")
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--median", type=float, default=0.3, help="runner latency, seconds")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=8, help="runner executions at once")
+    parser.add_argument("--seed", type=int, default=0)
+    asyncio.run(run_benchmark(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+"""
+Deterministic fake backends for benchmarking without the real services.
+
+Serves an OpenAI-compatible `/v1/chat/completions` (streaming and not) and
+`/v1/models`, plus the vacancy service routes the interview service calls
+(`/vacancy/vacancies/{id}` and `/vacancy/vacancies/{id}/interview`).
+
+Replies are scripted per call type, recognised by the system prompt:
+reasoning in `<think>`, a `<ctrl>` block where the service expects one, then
+the visible body or JSON. Text is streamed in small chunks, so tags get split
+across chunk boundaries like with a real model. Time to first token, tokens
+per second and the failure rate (503 before the first token) are configurable;
+with the same seed the same requests fail. Streams the client closes early are
+counted in `disconnects`.
+
+    python -m benchmarks.fake_llm [--port 8100] [--ttft 0.3] [--tps 40] [--failure-rate 0.01]
+
+then point the service at it:
+
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 VACANCY_SERVICE_URL=http://127.0.0.1:8100/vacancy
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import time
+from dataclasses import dataclass
+from typing import Any, Iterator
+
+from aiohttp import web
+
+from src.adapters.ai_chat.ai_utils.prompt_utils import load_prompt
+
+
+@dataclass(slots=True)
+class FakeLLMConfig:
+    """
+    Timing and failure behaviour of the fake LLM
+    """
+
+    ttft: float = 0.3
+    tokens_per_second: float = 40.0
+    failure_rate: float = 0.0
+    # Characters per streamed delta, about one token
+    chunk_chars: int = 4
+    # Words of reasoning before every reply
+    think_words: int = 60
+    seed: int = 0
+
+
+_THINK_WORDS = (
+    "the candidate answered about async code so next I should check their "
+    "understanding of the event loop and keep the question short and concrete"
+).split()
+
+_TEST_SUITE = {
+    "tests": [
+        {
+            "id": f"t{i}",
+            "input_data": f"{i} {-i * 2}",
+            "expected_output": str(-i),
+            "is_hidden": i > 3,
+        }
+        for i in range(1, 11)
+    ]
+}
+
+_METRICS_BLOCK2 = {
+    "summary": "The candidate explained their solutions clearly.",
+    "clarity_score": 4,
+    "completeness_score": 3,
+    "feedback_response": "Accepted hints and improved the solution.",
+    "tech_fit_level": "medium",
+    "tech_fit_comment": "Solid basics, limited experience with concurrency.",
+}
+
+_METRICS_BLOCK3 = {
+    "strengths": "Clear reasoning, tests edge cases.",
+    "weaknesses": "Slow on algorithmic complexity.",
+    "cheating_summary": "No signs of cheating.",
+    "seniority_guess": "middle",
+    "recommendation": "hire",
+}
+
+_SCRIPTS: dict[str, tuple[str | None, str]] = {
+    # system prompt file: (ctrl block, body)
+    "create_chat_plan_system_prompt.txt": (
+        None,
+        "1. Warm-up question about recent projects.\n2. Coding task on parsing input.\n"
+        "3. Follow-up about complexity.\n4. Theory question about concurrency.",
+    ),
+    "chat_welcome_system_prompt.txt": (
+        None,
+        "Hello! Welcome to the interview. We will start with a short coding task, "
+        "then talk about your experience. Feel free to ask questions at any time.",
+    ),
+    "response_system_prompt.txt": (
+        '{"user_type": "answer", "assistant_type": "response"}',
+        "Thanks, that makes sense. Could you also explain how your solution behaves "
+        "when the input is empty, and what its time complexity is?",
+    ),
+    "create_task_system_prompt.txt": (
+        '{"task_type": "code", "task_language": "python"}',
+        "Read two integers a and b from standard input, separated by a space, "
+        "and print their sum. Handle negative numbers.",
+    ),
+    "check_solution_system_prompt.txt": (
+        None,
+        "The solution reads the input correctly and passes the visible tests. "
+        "Consider validating the input format.",
+    ),
+    "create_test_suite_system_prompt.txt": (None, json.dumps(_TEST_SUITE, indent=2)),
+    "metrics_block2_system_prompt.txt": (None, json.dumps(_METRICS_BLOCK2)),
+    "metrics_block3_system_prompt.txt": (None, json.dumps(_METRICS_BLOCK3)),
+}
+
+
+def _scripts_by_prompt() -> dict[str, tuple[str | None, str]]:
+    return {load_prompt(f"system/{name}"): script for name, script in _SCRIPTS.items()}
+
+
+def scripted_reply(ctrl: str | None, body: str, think_words: int) -> str:
+    """
+    Full model output: reasoning, optional control block, body
+    """
+    think = " ".join(_THINK_WORDS[i % len(_THINK_WORDS)] for i in range(think_words))
+    reply = f"<think>{think}</think>"
+    if ctrl is not None:
+        reply += f"<ctrl>{ctrl}</ctrl>"
+    return reply + body
+
+
+def chunked(text: str, size: int) -> Iterator[str]:
+    """
+    Split text into deltas of `size` characters
+    """
+    for start in range(0, len(text), size):
+        yield text[start : start + size]
+
+
+class FakeLLM:
+    """
+    aiohttp handlers of the fake LLM and vacancy service
+    """
+
+    def __init__(self, config: FakeLLMConfig):
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._scripts = _scripts_by_prompt()
+        self.requests = 0
+        self.failures = 0
+        self.disconnects = 0
+
+    def app(self) -> web.Application:
+        """
+        Application serving all fake routes
+        """
+        app = web.Application()
+        app.router.add_get("/v1/models", self.models)
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_get("/vacancy/vacancies/{vacancy_id}", self.vacancy)
+        app.router.add_post("/vacancy/vacancies/{vacancy_id}/interview", self.interview_results)
+        return app
+
+    async def models(self, request: web.Request) -> web.Response:
+        return web.json_response({"object": "list", "data": [{"id": "fake", "object": "model"}]})
+
+    async def vacancy(self, request: web.Request) -> web.Response:
+        return web.json_response(
+            {
+                "profession": "Backend developer",
+                "position": "Middle",
+                "requirements": ["Python", "asyncio", "SQL"],
+                "tasks": [],
+                "task_ideas": ["parsing input", "concurrency"],
+                "duration": 60,
+            }
+        )
+
+    async def interview_results(self, request: web.Request) -> web.Response:
+        await request.read()
+        return web.json_response({"ok": True})
+
+    async def chat_completions(self, request: web.Request) -> web.StreamResponse:
+        payload: dict[str, Any] = await request.json()
+        self.requests += 1
+
+        if self._random.random() < self.config.failure_rate:
+            self.failures += 1
+            await asyncio.sleep(self.config.ttft)
+            return web.json_response(
+                {"error": {"message": "Injected failure", "type": "server_error"}}, status=503
+            )
+
+        system_prompt = payload["messages"][0]["content"]
+        ctrl, body = self._scripts.get(system_prompt, (None, "OK"))
+        reply = scripted_reply(ctrl, body, self.config.think_words)
+        model = payload.get("model", "fake")
+
+        if payload.get("max_tokens") == 1:
+            reply = reply[: self.config.chunk_chars]
+
+        if not payload.get("stream"):
+            deltas = len(reply) / self.config.chunk_chars
+            await asyncio.sleep(self.config.ttft + deltas / self.config.tokens_per_second)
+            return web.json_response(
+                {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {
+                            "index": 0,
+                            "message": {"role": "assistant", "content": reply},
+                            "finish_reason": "stop",
+                        }
+                    ],
+                }
+            )
+
+        response = web.StreamResponse(headers={"Content-Type": "text/event-stream"})
+        await response.prepare(request)
+        await asyncio.sleep(self.config.ttft)
+
+        interval = 1 / self.config.tokens_per_second
+        next_at = time.perf_counter()
+        try:
+            for delta in chunked(reply, self.config.chunk_chars):
+                await response.write(_sse_chunk(model, {"content": delta}, None))
+                next_at += interval
+                await asyncio.sleep(max(0.0, next_at - time.perf_counter()))
+        except ConnectionResetError:
+            # The client closed the stream, a real server would stop generating here
+            self.disconnects += 1
+            return response
+        except asyncio.CancelledError:
+            self.disconnects += 1
+            raise
+        await response.write(_sse_chunk(model, {}, "stop"))
+        await response.write(b"data: [DONE]\n\n")
+        await response.write_eof()
+        return response
+
+
+def _sse_chunk(model: str, delta: dict[str, str], finish_reason: str | None) -> bytes:
+    chunk = {
+        "id": "chatcmpl-fake",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(chunk)}\n\n".encode()
+
+
+async def start_fake_llm(config: FakeLLMConfig, port: int) -> web.AppRunner:
+    """
+    Serve the fake backends on 127.0.0.1:port, returns the runner to clean up
+    """
+    runner = web.AppRunner(FakeLLM(config).app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--ttft", type=float, default=0.3, help="seconds to the first token")
+    parser.add_argument("--tps", type=float, default=40.0, help="streamed tokens per second")
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeLLMConfig(
+        ttft=args.ttft,
+        tokens_per_second=args.tps,
+        failure_rate=args.failure_rate,
+        seed=args.seed,
+    )
+    web.run_app(FakeLLM(config).app(), host="127.0.0.1", port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
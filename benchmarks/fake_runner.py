@@ -0,0 +1,233 @@
+"""
+Local stand-in for the code runner.
+
+Speaks the `/api/v1/run` contract of the RapidAPI runner `CodeRunService`
+calls: the request carries `language`, `stdin` and the source in `files`, the
+response has `status`, `exception`, `stdout`, `stderr`, `executionTime`
+(milliseconds) and `stdin`. Python is really executed in a subprocess, other
+languages get an "unsupported" failure.
+
+Each request waits for a latency drawn from a configurable distribution
+(fixed, uniform or lognormal) and can be answered with an injected 429 (with
+Retry-After) or 5xx instead; with the same seed the same requests fail.
+
+    python -m benchmarks.fake_runner [--port 8200] [--latency lognormal] [--median 0.3]
+        [--rate-limit-rate 0.05] [--error-rate 0.01]
+
+then point the service at it with CODE_RUN_SERVICE_URL=http://127.0.0.1:8200
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Any
+
+from aiohttp import web
+
+LATENCY_DISTRIBUTIONS = ("fixed", "uniform", "lognormal")
+
+
+@dataclass(slots=True)
+class FakeRunnerConfig:
+    """
+    Latency, failure and execution behaviour of the fake runner
+    """
+
+    # fixed: always `median`; uniform: between `low` and `high`;
+    # lognormal: median `median`, spread `sigma`
+    latency: str = "lognormal"
+    median: float = 0.3
+    low: float = 0.1
+    high: float = 0.5
+    sigma: float = 0.5
+    rate_limit_rate: float = 0.0
+    error_rate: float = 0.0
+    retry_after: int = 1
+    # Programs executed at once, further requests queue like on a real runner
+    max_concurrency: int = 8
+    timeout: float = 5.0
+    seed: int = 0
+
+
+class FakeRunner:
+    """
+    aiohttp handlers of the fake code runner
+    """
+
+    def __init__(self, config: FakeRunnerConfig):
+        if config.latency not in LATENCY_DISTRIBUTIONS:
+            raise ValueError(f"Unknown latency distribution {config.latency}")
+        self.config = config
+        self._random = random.Random(config.seed)
+        self._executing = asyncio.Semaphore(config.max_concurrency)
+        self.requests = 0
+        self.rate_limited = 0
+        self.errors = 0
+
+    def app(self) -> web.Application:
+        """
+        Application serving the runner routes
+        """
+        app = web.Application()
+        app.router.add_post("/api/v1/run", self.run)
+        # CodeRunService.warm_up opens a connection with HEAD /
+        app.router.add_route("HEAD", "/", self.root)
+        return app
+
+    async def root(self, request: web.Request) -> web.Response:
+        return web.Response()
+
+    def latency(self) -> float:
+        """
+        Injected latency of one request in seconds
+        """
+        config = self.config
+        if config.latency == "uniform":
+            return self._random.uniform(config.low, config.high)
+        if config.latency == "lognormal":
+            return self._random.lognormvariate(0.0, config.sigma) * config.median
+        return config.median
+
+    async def run(self, request: web.Request) -> web.Response:
+        payload: dict[str, Any] = await request.json()
+        self.requests += 1
+
+        # Drawn up front so the sequence of outcomes only depends on the seed
+        latency = self.latency()
+        outcome = self._random.random()
+        await asyncio.sleep(latency)
+
+        if outcome < self.config.rate_limit_rate:
+            self.rate_limited += 1
+            return web.json_response(
+                {"message": "Too many requests"},
+                status=429,
+                headers={"Retry-After": str(self.config.retry_after)},
+            )
+        if outcome < self.config.rate_limit_rate + self.config.error_rate:
+            self.errors += 1
+            return web.json_response(
+                {"message": "Injected failure"}, status=self._random.choice((500, 502, 503))
+            )
+
+        language = payload.get("language", "")
+        stdin = payload.get("stdin") or ""
+        files = payload.get("files") or []
+        # CodeRunService sends a single file object, the runner API a list of them
+        code = (files if isinstance(files, dict) else files[0])["content"] if files else ""
+
+        if language != "python":
+            return web.json_response(
+                _result("failed", f"Language {language} is not supported by the fake runner", stdin)
+            )
+
+        async with self._executing:
+            return web.json_response(await execute_python(code, stdin, self.config.timeout))
+
+
+def _result(
+    status: str,
+    exception: str | None,
+    stdin: str,
+    stdout: str | None = None,
+    stderr: str | None = None,
+    execution_time: int | None = None,
+) -> dict[str, Any]:
+    return {
+        "status": status,
+        "exception": exception,
+        "stdout": stdout,
+        "stderr": stderr,
+        "executionTime": execution_time,
+        "stdin": stdin,
+    }
+
+
+async def execute_python(code: str, stdin: str, timeout: float) -> dict[str, Any]:
+    """
+    Run a Python program in a subprocess, in the runner's response format
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.py")
+        with open(path, "w", encoding="utf-8") as file:
+            file.write(code)
+
+        started = time.perf_counter()
+        process = await asyncio.create_subprocess_exec(
+            sys.executable,
+            "-I",
+            path,
+            cwd=directory,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await asyncio.wait_for(process.communicate(stdin.encode()), timeout)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+            return _result("failed", f"Timed out after {timeout}s", stdin)
+        execution_time = round((time.perf_counter() - started) * 1000)
+
+    stderr_text = stderr.decode(errors="replace") or None
+    exception = None
+    if process.returncode != 0:
+        # Like the runner: the last traceback line, e.g. "ValueError: ..."
+        lines = (stderr_text or "").strip().splitlines()
+        exception = lines[-1] if lines else f"Exit code {process.returncode}"
+    return _result(
+        "success" if process.returncode == 0 else "failed",
+        exception,
+        stdin,
+        stdout.decode(errors="replace"),
+        stderr_text,
+        execution_time,
+    )
+
+
+async def start_fake_runner(config: FakeRunnerConfig, port: int) -> web.AppRunner:
+    """
+    Serve the fake runner on 127.0.0.1:port, returns the runner to clean up
+    """
+    runner = web.AppRunner(FakeRunner(config).app(), access_log=None)
+    await runner.setup()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return runner
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=8200)
+    parser.add_argument("--latency", choices=LATENCY_DISTRIBUTIONS, default="lognormal")
+    parser.add_argument("--median", type=float, default=0.3, help="seconds")
+    parser.add_argument("--low", type=float, default=0.1, help="seconds, uniform only")
+    parser.add_argument("--high", type=float, default=0.5, help="seconds, uniform only")
+    parser.add_argument("--sigma", type=float, default=0.5, help="lognormal only")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--max-concurrency", type=int, default=8)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    config = FakeRunnerConfig(
+        latency=args.latency,
+        median=args.median,
+        low=args.low,
+        high=args.high,
+        sigma=args.sigma,
+        rate_limit_rate=args.rate_limit_rate,
+        error_rate=args.error_rate,
+        max_concurrency=args.max_concurrency,
+        seed=args.seed,
+    )
+    web.run_app(FakeRunner(config).app(), host="127.0.0.1", port=args.port, access_log=None)
+
+
+if __name__ == "__main__":
+    main()
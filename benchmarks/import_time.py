@@ -0,0 +1,107 @@
+"""
+Import-time breakdown of the application.
+
+Imports `src.main` in fresh interpreters, reports the wall time and, from
+`python -X importtime`, the cumulative import time of the heaviest modules
+and the self time grouped by top-level package.
+
+    python -m benchmarks.import_time [--runs 5] [--top 25]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+_TIMED_IMPORT = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+
+def import_seconds(module: str = "src.main") -> float:
+    """
+    Wall time of importing the module in a fresh interpreter
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", _TIMED_IMPORT.format(module=module)],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def loaded_modules(module: str = "src.main") -> set[str]:
+    """
+    Modules present in sys.modules after importing the module
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", f"import sys, {module}; print('\\n'.join(sys.modules))"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return set(result.stdout.split())
+
+
+def import_profile(module: str = "src.main") -> list[tuple[str, int, int]]:
+    """
+    (module, self µs, cumulative µs) for every import, from -X importtime
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+
+    rows = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:") :].split("|")
+        rows.append((name.strip(), int(self_us), int(cumulative_us)))
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time breakdown of src.main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=25)
+    args = parser.parse_args()
+
+    times = [import_seconds() for _ in range(args.runs)]
+    print(
+        f"import src.main: median {statistics.median(times):.3f}s, "
+        f"min {min(times):.3f}s over {args.runs} runs"
+    )
+
+    profile = import_profile()
+
+    print(f"\nTop {args.top} modules by cumulative import time")
+    for name, _, cumulative in sorted(profile, key=lambda row: -row[2])[: args.top]:
+        print(f"{cumulative / 1000:>10.1f} ms  {name}")
+
+    packages: dict[str, int] = defaultdict(int)
+    for name, self_us, _ in profile:
+        top_level = name.split(".")[0]
+        # Our own code is broken down by layer
+        if top_level == "src":
+            top_level = ".".join(name.split(".")[:2])
+        packages[top_level] += self_us
+
+    print(f"\nTop {args.top} packages by self import time")
+    for name, self_us in sorted(packages.items(), key=lambda item: -item[1])[: args.top]:
+        print(f"{self_us / 1000:>10.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    main()
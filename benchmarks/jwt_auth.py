@@ -0,0 +1,83 @@
+"""
+Per-request cost of room token authentication.
+
+Signs an ES256 room token with a throwaway key and times verification
+through python-jose (the previous backend), through `cryptography` directly
+(a cache miss) and through the verified-token cache (a hit), plus the route
+allowlist check.
+
+    python -m benchmarks.jwt_auth [--iterations 2000]
+"""
+
+import argparse
+import time
+import timeit
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from jose import jwt
+
+from src.presentation.fast_api.middlewares.jwt import PUBLIC_ROUTES, JWTManager
+
+
+def signed_token() -> tuple[str, str]:
+    """
+    (token, public key PEM) of a fresh ES256 key pair
+    """
+    private_key = ec.generate_private_key(ec.SECP256R1())
+    private_pem = private_key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    public_pem = private_key.public_key().public_bytes(
+        serialization.Encoding.PEM,
+        serialization.PublicFormat.SubjectPublicKeyInfo,
+    ).decode()
+
+    token = jwt.encode(
+        {"room_id": "3f1c9a52-6d3e-4c1b-9a57-6f0d3b2a1e44", "exp": int(time.time()) + 3600},
+        private_pem,
+        algorithm="ES256",
+    )
+    return token, public_pem
+
+
+def per_call_us(func, iterations: int) -> float:
+    """
+    Mean microseconds per call
+    """
+    return timeit.timeit(func, number=iterations) / iterations * 1e6
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    token, public_pem = signed_token()
+    manager = JWTManager(public_pem)
+    manager.verify_token(token)
+
+    substrings = lambda path: "/api/v1/room" in path or "docs" in path or "openapi.json" in path
+    rows = [
+        (
+            "python-jose decode",
+            lambda: jwt.decode(token, manager.jwt_private_key, algorithms=["ES256"]),
+        ),
+        ("cryptography verify (miss)", lambda: manager.verify_signature(token)),
+        ("cached verify (hit)", lambda: manager.verify_token(token)),
+        ("route substring checks", lambda: substrings("/api/v1/room/question/response/sse")),
+        (
+            "route allowlist regex",
+            lambda: PUBLIC_ROUTES.fullmatch("GET /api/v1/room/question/response/sse"),
+        ),
+    ]
+
+    print(f"{'path':<30} {'µs/request':>12}")
+    for name, func in rows:
+        print(f"{name:<30} {per_call_us(func, args.iterations):>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,365 @@
+"""
+Load test of full interview sessions against the fake backends.
+
+Starts the fake LLM / vacancy service (benchmarks.fake_llm) in-process and
+the interview service in a subprocess pointed at it, then runs N concurrent
+candidates through the real routes:
+
+    create room -> welcome (SSE) -> task (SSE) -> [run code] ->
+    question + response (SSE) -> solution + response (SSE) -> stop
+
+and reports session throughput, p50/p99 latency per step (time to the first
+streamed chunk for SSE steps as well), and memory per room as accounted by
+the room store and as seen in the service's RSS.
+
+    python -m benchmarks.load_test [--candidates 20] [--ttft 0.3] [--tps 40] [--failure-rate 0]
+        [--run-code]
+
+With --run-code the fake code runner (benchmarks.fake_runner) is started as
+well and the visible tests are run once per candidate.
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from uuid import uuid4
+
+import aiohttp
+
+from benchmarks.fake_llm import FakeLLMConfig, start_fake_llm
+from benchmarks.fake_runner import FakeRunnerConfig, start_fake_runner
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SOLUTION = "a, b = map(int, input().split())\nprint(a + b)\n"
+
+
+def free_port() -> int:
+    """
+    Port nobody listens on right now
+    """
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values: list[float], q: float) -> float:
+    """
+    Nearest-rank percentile, q in [0, 100]
+    """
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def rss_bytes(pid: int) -> int:
+    """
+    Resident set size of a process, 0 where /proc is not available
+    """
+    try:
+        for line in Path(f"/proc/{pid}/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+@dataclass
+class Results:
+    """
+    Latencies per step and failures of a load test run
+    """
+
+    latencies: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    first_chunk: dict[str, list[float]] = field(default_factory=lambda: defaultdict(list))
+    errors: dict[str, int] = field(default_factory=lambda: defaultdict(int))
+    sessions: int = 0
+
+
+class Candidate:
+    """
+    One simulated candidate going through a whole interview
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        results: Results,
+        run_code: bool,
+        session: aiohttp.ClientSession | None = None,
+    ):
+        self.base_url = base_url
+        self.results = results
+        self.run_code = run_code
+        # Set by run(), or given when the steps are called one by one
+        self.session = session
+
+    async def run(self) -> None:
+        # Each candidate has its own room_id cookie
+        async with aiohttp.ClientSession(
+            cookie_jar=aiohttp.CookieJar(unsafe=True),
+            timeout=aiohttp.ClientTimeout(total=300),
+        ) as session:
+            self.session = session
+            steps = [
+                ("create_room", self.create_room),
+                ("welcome", lambda: self.stream("welcome", "/api/v1/room/welcome/sse")),
+                ("task", lambda: self.stream("task", "/api/v1/room/task/sse")),
+            ]
+            if self.run_code:
+                steps.append(("run", self.wait_for_tests))
+            steps += [
+                ("question", self.question),
+                ("solution", self.solution),
+                ("stop", self.stop),
+            ]
+
+            for name, step in steps:
+                started = time.perf_counter()
+                try:
+                    await step()
+                except Exception as e:
+                    self.results.errors[f"{name}: {type(e).__name__}"] += 1
+                    if name == "create_room":
+                        return
+                    continue
+                self.results.latencies[name].append(time.perf_counter() - started)
+            self.results.sessions += 1
+
+    async def _request(self, method: str, path: str, **kwargs) -> None:
+        async with self.session.request(method, self.base_url + path, **kwargs) as response:
+            response.raise_for_status()
+            await response.read()
+
+    async def stream(self, name: str, path: str) -> None:
+        started = time.perf_counter()
+        first = None
+        async with self.session.get(self.base_url + path) as response:
+            response.raise_for_status()
+            async for line in response.content:
+                if first is None and line.startswith(b"data:") and b"message_chunk" in line:
+                    first = time.perf_counter() - started
+                if b'"type":"error"' in line:
+                    raise RuntimeError(line.decode(errors="replace"))
+        if first is not None:
+            self.results.first_chunk[name].append(first)
+
+    async def create_room(self) -> None:
+        await self._request(
+            "POST",
+            "/api/v1/room",
+            json={
+                "vacancy_id": str(uuid4()),
+                "name": "Load",
+                "surname": "Test",
+                "resume_link": "https://example.com/cv.pdf",
+            },
+        )
+
+    async def wait_for_tests(self) -> None:
+        # Visible tests stream in after the task, wait until some are there
+        for _ in range(50):
+            try:
+                if await self.run_tests():
+                    return
+            except aiohttp.ClientResponseError:
+                pass
+            await asyncio.sleep(0.2)
+        raise RuntimeError("No visible tests")
+
+    async def run_tests(self) -> list[dict]:
+        """
+        Run the solution against the visible tests, [] while there are none yet
+        """
+        async with self.session.post(
+            self.base_url + "/api/v1/room/run",
+            json={"code": SOLUTION, "language": "python"},
+        ) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def question(self) -> None:
+        await self._request(
+            "POST", "/api/v1/room/question", json={"question": "Can I use the standard library?"}
+        )
+        await self.stream("question", "/api/v1/room/question/response/sse")
+
+    async def solution(self) -> None:
+        await self._request(
+            "POST",
+            "/api/v1/room/solution",
+            json={
+                "solution": SOLUTION,
+                "copy_paste_count": 0,
+                "language": "python",
+                "solution_type": "code",
+            },
+        )
+        await self.stream("solution", "/api/v1/room/solution/response/sse")
+
+    async def stop(self) -> None:
+        await self._request("DELETE", "/api/v1/room")
+
+
+def start_service(port: int, env: dict[str, str]) -> subprocess.Popen:
+    """
+    Run the interview service in a subprocess
+    """
+    return subprocess.Popen(
+        [
+            sys.executable,
+            "-m",
+            "uvicorn",
+            "src.main:app",
+            "--host",
+            "127.0.0.1",
+            "--port",
+            str(port),
+            "--log-level",
+            "warning",
+        ],
+        cwd=ROOT,
+        env={**os.environ, "LOG_LEVEL": "WARNING", **env},
+    )
+
+
+def fake_env(llm_port: int, runner_port: int) -> dict[str, str]:
+    """
+    Environment pointing the service at the fake backends
+    """
+    return {
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{llm_port}/v1",
+        "OPENAI_API_KEY": "fake",
+        "VACANCY_SERVICE_URL": f"http://127.0.0.1:{llm_port}/vacancy",
+        "CODE_RUN_SERVICE_URL": f"http://127.0.0.1:{runner_port}",
+    }
+
+
+async def wait_ready(base_url: str, timeout: float = 60.0) -> None:
+    """
+    Wait until the service answers /ready with 200
+    """
+    deadline = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline:
+            try:
+                async with session.get(base_url + "/ready") as response:
+                    if response.status == 200:
+                        return
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    raise TimeoutError("Service did not become ready")
+
+
+async def room_stats(base_url: str) -> dict:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(base_url + "/api/v1/admin/rooms") as response:
+            return await response.json()
+
+
+def report(results: Results, elapsed: float, candidates: int, memory: dict[str, float]) -> None:
+    print(f"candidates: {candidates}, completed sessions: {results.sessions}, {elapsed:.1f}s")
+    print(f"throughput: {results.sessions / elapsed:.2f} sessions/s")
+    print()
+    print(f"{'step':<12} {'n':>5} {'p50 s':>8} {'p99 s':>8} {'first chunk p50':>16} {'p99':>8}")
+    for name, values in results.latencies.items():
+        first = results.first_chunk.get(name)
+        first_cols = (
+            f"{percentile(first, 50):>16.3f} {percentile(first, 99):>8.3f}" if first else ""
+        )
+        print(
+            f"{name:<12} {len(values):>5} {percentile(values, 50):>8.3f} "
+            f"{percentile(values, 99):>8.3f} {first_cols}"
+        )
+    if results.errors:
+        print()
+        for error, count in sorted(results.errors.items()):
+            print(f"error {error}: {count}")
+    print()
+    for name, value in memory.items():
+        print(f"{name}: {value / 1024:.1f} KiB per room")
+
+
+async def run_load_test(args: argparse.Namespace) -> None:
+    fake_port, runner_port, service_port = free_port(), free_port(), free_port()
+    fake = await start_fake_llm(
+        FakeLLMConfig(
+            ttft=args.ttft,
+            tokens_per_second=args.tps,
+            failure_rate=args.failure_rate,
+            seed=args.seed,
+        ),
+        fake_port,
+    )
+    runner = await start_fake_runner(FakeRunnerConfig(seed=args.seed), runner_port)
+    service = start_service(service_port, fake_env(fake_port, runner_port))
+    base_url = f"http://127.0.0.1:{service_port}"
+
+    try:
+        await wait_ready(base_url)
+        rss_before = rss_bytes(service.pid)
+
+        results = Results()
+        candidates = [
+            Candidate(base_url, results, run_code=args.run_code) for _ in range(args.candidates)
+        ]
+        # Rooms stay resident until stopped; sample memory at the peak, before stopping
+        peak: dict[str, float] = {}
+
+        async def sample_peak() -> None:
+            while True:
+                stats = await room_stats(base_url)
+                if stats["resident"] and stats["resident"] >= peak.get("rooms", 0):
+                    peak["rooms"] = stats["resident"]
+                    peak["accounted"] = stats["resident_bytes"] / stats["resident"]
+                    peak["rss"] = max(0, rss_bytes(service.pid) - rss_before) / stats["resident"]
+                await asyncio.sleep(0.5)
+
+        sampler = asyncio.create_task(sample_peak())
+        started = time.perf_counter()
+        await asyncio.gather(*(candidate.run() for candidate in candidates))
+        elapsed = time.perf_counter() - started
+        sampler.cancel()
+
+        memory = {}
+        if peak:
+            memory = {"accounted room size": peak["accounted"], "service RSS growth": peak["rss"]}
+        report(results, elapsed, args.candidates, memory)
+    finally:
+        service.terminate()
+        service.wait(timeout=30)
+        await runner.cleanup()
+        await fake.cleanup()
+
+
+def parser() -> argparse.ArgumentParser:
+    """
+    Command-line options of the load test
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--candidates", type=int, default=20)
+    parser.add_argument("--ttft", type=float, default=0.3)
+    parser.add_argument("--tps", type=float, default=40.0)
+    parser.add_argument("--failure-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--run-code", action="store_true", help="include /room/run against the fake runner"
+    )
+    return parser
+
+
+def main() -> None:
+    asyncio.run(run_load_test(parser().parse_args()))
+
+
+if __name__ == "__main__":
+    main()
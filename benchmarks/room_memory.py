@@ -0,0 +1,191 @@
+"""
+Memory footprint of resident rooms.
+
+Builds rooms with 10, 100 and 1000 chat messages from the slotted domain
+models and from dict-backed copies of the same dataclasses (the previous
+representation), and reports bytes per room measured with tracemalloc.
+
+    python -m benchmarks.room_memory
+"""
+
+import tracemalloc
+from dataclasses import MISSING, dataclass, field, fields, make_dataclass
+from datetime import datetime, timedelta
+from typing import Any
+from uuid import uuid4
+
+from src.domain.message.message import Message, RoleEnum, TypeEnum
+from src.domain.metrics.metrics import MetricsBlock1
+from src.domain.room.room import Interviewee, Room, Solution, SolutionType
+from src.domain.task.task import Task, TaskLanguage, TaskType
+from src.domain.test.test import CodeTestCase, CodeTestSuite
+from src.domain.vacancy.vacancy import VacancyInfo
+
+MESSAGE_COUNTS = (10, 100, 1000)
+# Enough rooms per size to average out allocator noise
+MESSAGES_PER_RUN = 20_000
+
+
+@dataclass(frozen=True)
+class Models:
+    name: str
+    room: Any
+    message: Any
+    task: Any
+    solution: Any
+    test_case: Any
+    test_suite: Any
+    interviewee: Any
+    metrics: Any
+    vacancy: Any
+
+
+def _dict_backed(cls: type) -> type:
+    """
+    Plain @dataclass copy of a domain class, with a per-instance __dict__
+    """
+    spec = []
+    for f in fields(cls):
+        if f.default is not MISSING:
+            spec.append((f.name, f.type, field(default=f.default)))
+        elif f.default_factory is not MISSING:
+            spec.append((f.name, f.type, field(default_factory=f.default_factory)))
+        else:
+            spec.append((f.name, f.type))
+    return make_dataclass(cls.__name__, spec)
+
+
+SLOTTED = Models(
+    "slotted",
+    Room,
+    Message,
+    Task,
+    Solution,
+    CodeTestCase,
+    CodeTestSuite,
+    Interviewee,
+    MetricsBlock1,
+    VacancyInfo,
+)
+
+DICT_BACKED = Models(
+    "dict",
+    *(
+        _dict_backed(cls)
+        for cls in (
+            Room,
+            Message,
+            Task,
+            Solution,
+            CodeTestCase,
+            CodeTestSuite,
+            Interviewee,
+            MetricsBlock1,
+            VacancyInfo,
+        )
+    ),
+)
+
+
+def build_room(models: Models, message_count: int) -> Any:
+    """
+    Room shaped like a real session: a task, a solution and an AI reply
+    for every few candidate messages
+    """
+    tasks = []
+    solutions = []
+    chat_history = []
+
+    for i in range(message_count):
+        if i % 10 == 0:
+            task = models.task(
+                type=TaskType.CODE,
+                language=TaskLanguage.PYTHON,
+                description=f"Task {i}: implement a function that returns the sum of a list",
+            )
+            tasks.append(task)
+            solutions.append(
+                models.solution(
+                    content=f"def solve(xs):\n    return sum(xs)  # {i}",
+                    solution_type=SolutionType.CODE,
+                    language="python",
+                )
+            )
+
+        role = RoleEnum.USER if i % 2 else RoleEnum.AI
+        message_type = TypeEnum.QUESTION if i % 2 else TypeEnum.RESPONSE
+        chat_history.append(
+            models.message(
+                role=role,
+                type=message_type,
+                content=f"Message {i} of the interview, a sentence of typical length here.",
+            )
+        )
+
+    return models.room(
+        id=uuid4(),
+        vacancy_id=uuid4(),
+        vacancy_info=models.vacancy(
+            profession="Backend developer",
+            position="Middle",
+            requirements="Python, asyncio, SQL",
+            questions="",
+            tasks=[],
+            task_ides=[],
+            interview_plan="",
+            duration=timedelta(hours=1),
+        ),
+        interviewee=models.interviewee("Ivan", "Ivanov", "https://example.com/cv"),
+        chat_history=chat_history,
+        tasks=tasks,
+        solutions=solutions,
+        metrics=[],
+        created_at=datetime.now(),
+        last_task_time=datetime.now(),
+        metrics_block1=models.metrics(
+            time_spent=timedelta(0),
+            time_per_task=timedelta(0),
+            answers_count=0,
+            copy_paste_suspicion=0,
+        ),
+        current_test_suite=models.test_suite(
+            task_id="task",
+            tests=[
+                models.test_case(id=f"t{j}", input_data=f"{j}\n", expected_output=f"{j}\n")
+                for j in range(10)
+            ],
+        ),
+    )
+
+
+def bytes_per_room(models: Models, message_count: int) -> float:
+    """
+    Average traced allocation of a single room
+    """
+    room_count = max(1, MESSAGES_PER_RUN // message_count)
+
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        rooms = [build_room(models, message_count) for _ in range(room_count)]
+        after = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    del rooms
+    return (after - before) / room_count
+
+
+def main() -> None:
+    print(f"{'messages':>8} {'dict, B/room':>14} {'slotted, B/room':>16} {'saved':>7}")
+    for message_count in MESSAGE_COUNTS:
+        before = bytes_per_room(DICT_BACKED, message_count)
+        after = bytes_per_room(SLOTTED, message_count)
+        print(
+            f"{message_count:>8} {before:>14,.0f} {after:>16,.0f} "
+            f"{(before - after) / before:>7.1%}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,8 @@
 import os
 import asyncio
-from typing import AsyncGenerator
-import dotenv
-from openai import AsyncOpenAI
+from typing import Any, AsyncGenerator, Awaitable, Callable, Collection, TypeVar
+from uuid import UUID
+from loguru import logger
 
 from src.adapters.ai_chat.ai_utils.map_enum import (
     map_user_type,
@@ -11,7 +11,9 @@ from src.adapters.ai_chat.ai_utils.map_enum import (
     map_task_type,
 )
 from src.core.setting import settings
+from src.adapters.ai_chat.ai_utils.client_pool import llm_client_pool
 from src.adapters.ai_chat.ai_utils.misc import (
+    get_chat_completion,
     get_chat_completion_stream,
     remove_thinking_part,
 )
@@ -32,29 +34,56 @@ from src.adapters.ai_chat.ai_utils.prompt_builders import (
     build_check_solution_system_prompt,
     build_check_solution_user_prompt,
 )
+from src.adapters.ai_chat.ai_utils.scheduler import LLMPriority
 from src.adapters.ai_chat.ai_utils.streams import strip_think_and_ctrl, filter_thinking_chunks
 from src.domain.message.message import Message, RoleEnum, TypeEnum
 from src.domain.metrics.metrics import MetricsBlock1, MetricsBlock2, MetricsBlock3
 from src.domain.task.task import Task
-from src.domain.test.test import CodeTestSuite
+from src.domain.test.test import CodeTestCase, CodeTestSuite
 from src.domain.vacancy.vacancy import VacancyInfo
 from src.usecases.interfaces.ai_chat import AIChatBase
 from src.adapters.ai_chat.ai_utils.json_parsers import (
+    TestCaseStreamParser,
+    load_json_object,
     parse_metrics_block2,
     parse_metrics_block3,
-    parse_test_suite_json,
+    parse_test_case,
 )
+from src.adapters.ai_chat.ai_utils.json_schemas import (
+    METRICS_BLOCK2_SCHEMA,
+    METRICS_BLOCK3_SCHEMA,
+    Validator,
+    build_test_suite_schema,
+    compile_schema,
+    response_format,
+    validate_metrics_block2,
+    validate_metrics_block3,
+)
+from src.core.metrics import registry
+from src.core.tracing import traced
+
+T = TypeVar("T")
 
-dotenv.load_dotenv()
+_json_parse_total = registry.counter(
+    "llm_json_parse_total",
+    "Outcomes of parsing JSON produced by the LLM (ok, repaired, failed)",
+    labels=("call_type", "outcome"),
+)
 
 
 class AIChat(AIChatBase):
-    def __init__(self):
-        self.client = AsyncOpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_base_url,
+    def __init__(self, checker_names: Collection[str]):
+        """
+        :param checker_names: output checkers the generated tests may name
+        """
+        self.client = llm_client_pool
+        self.checker_names = frozenset(checker_names)
+        self.test_suite_schema = build_test_suite_schema(sorted(self.checker_names))
+        self.validate_test_case = compile_schema(
+            self.test_suite_schema["properties"]["tests"]["items"], "$.tests[]"
         )
 
+    @traced("AIChat.create_chat")
     async def create_chat(
         self,
         vacancy_info: VacancyInfo,
@@ -76,6 +105,8 @@ class AIChat(AIChatBase):
             self.client,
             settings.llm_model,
             messages,
+            LLMPriority.BACKGROUND,
+            call_type="plan",
         )
 
         chunks: list[str] = []
@@ -90,6 +121,7 @@ class AIChat(AIChatBase):
         updated_vacancy.interview_plan = interview_plan
         return updated_vacancy
 
+    @traced("AIChat.generate_welcome_message")
     async def generate_welcome_message(
         self,
         vacancy_info: VacancyInfo,
@@ -107,11 +139,14 @@ class AIChat(AIChatBase):
             self.client,
             settings.llm_model,
             messages,
+            LLMPriority.CHAT,
+            call_type="welcome",
         )
 
         stream = await filter_thinking_chunks(raw_stream)
         return stream
 
+    @traced("AIChat.create_response")
     async def create_response(
         self,
         vacancy_info: VacancyInfo,
@@ -133,6 +168,8 @@ class AIChat(AIChatBase):
             self.client,
             settings.llm_model,
             messages,
+            LLMPriority.CHAT,
+            call_type="response",
         )
 
         control, body_stream = await strip_think_and_ctrl(raw_stream)
@@ -154,6 +191,7 @@ class AIChat(AIChatBase):
 
         return body_stream, user_message, ai_message
 
+    @traced("AIChat.create_task")
     async def create_task(
         self,
         vacancy_info: VacancyInfo,
@@ -171,6 +209,8 @@ class AIChat(AIChatBase):
             self.client,
             settings.llm_model,
             messages,
+            LLMPriority.TASK,
+            call_type="task",
         )
 
         control, body_stream = await strip_think_and_ctrl(raw_stream)
@@ -186,6 +226,7 @@ class AIChat(AIChatBase):
 
         return body_stream, task
 
+    @traced("AIChat.create_metrics")
     async def create_metrics(
         self,
         vacancy_info: VacancyInfo,
@@ -204,12 +245,23 @@ class AIChat(AIChatBase):
             {"role": "user", "content": user_prompt_b2},
         ]
 
-        completion_b2 = await self.client.chat.completions.create(
-            model=settings.llm_model,
-            messages=messages_b2,
+        async def generate_b2(fmt: dict[str, Any] | None) -> str:
+            return await get_chat_completion(
+                self.client,
+                settings.llm_model,
+                messages_b2,
+                LLMPriority.BACKGROUND,
+                fmt,
+                call_type="metrics_block2",
+            )
+
+        metrics_block2 = await self._generate_json(
+            "metrics_block2",
+            generate_b2,
+            METRICS_BLOCK2_SCHEMA,
+            validate_metrics_block2,
+            parse_metrics_block2,
         )
-        raw_json_b2 = completion_b2.choices[0].message.content
-        metrics_block2 = parse_metrics_block2(raw_json_b2)
 
         system_prompt_b3 = build_metrics_block3_system_prompt()
         user_prompt_b3 = build_metrics_block3_user_prompt(
@@ -224,21 +276,60 @@ class AIChat(AIChatBase):
             {"role": "user", "content": user_prompt_b3},
         ]
 
-        completion_b3 = await self.client.chat.completions.create(
-            model=settings.llm_model,
-            messages=messages_b3,
+        async def generate_b3(fmt: dict[str, Any] | None) -> str:
+            return await get_chat_completion(
+                self.client,
+                settings.llm_model,
+                messages_b3,
+                LLMPriority.BACKGROUND,
+                fmt,
+                call_type="metrics_block3",
+            )
+
+        metrics_block3 = await self._generate_json(
+            "metrics_block3",
+            generate_b3,
+            METRICS_BLOCK3_SCHEMA,
+            validate_metrics_block3,
+            parse_metrics_block3,
         )
-        raw_json_b3 = completion_b3.choices[0].message.content
-        metrics_block3 = parse_metrics_block3(raw_json_b3)
 
         return metrics_block1, metrics_block2, metrics_block3
 
+    @traced("AIChat.create_test_suite")
     async def create_test_suite(
         self,
         vacancy_info: VacancyInfo,
         chat_history: list[Message],
         task: Task,
+        attempts: int | None = None,
     ) -> CodeTestSuite:
+        attempts = max(1, attempts or settings.llm_json_max_attempts)
+
+        for attempt in range(1, attempts + 1):
+            tests = [
+                case
+                async for case in self.stream_test_suite(vacancy_info, chat_history, task)
+            ]
+            if tests:
+                _json_parse_total.labels("test_suite", "ok").inc()
+                return CodeTestSuite(
+                    task_id=getattr(task, "id", "task_without_id"),
+                    tests=tests,
+                )
+
+            _json_parse_total.labels("test_suite", "failed").inc()
+            logger.warning(f"No valid tests in generated test suite (attempt {attempt}/{attempts})")
+
+        raise ValueError("Test suite JSON contains no valid tests")
+
+    @traced("AIChat.stream_test_suite")
+    async def stream_test_suite(  # type: ignore
+        self,
+        vacancy_info: VacancyInfo,
+        chat_history: list[Message],
+        task: Task,
+    ) -> AsyncGenerator[CodeTestCase, None]:
         total_tests = settings.tests_per_task
 
         system_prompt = build_test_suite_system_prompt()
@@ -254,26 +345,27 @@ class AIChat(AIChatBase):
             {"role": "user", "content": user_prompt},
         ]
 
+        structured = settings.llm_structured_output
         raw_stream = await get_chat_completion_stream(
             self.client,
             settings.llm_model,
             messages,
+            LLMPriority.TEST_SUITE,
+            response_format("test_suite", self.test_suite_schema) if structured else None,
+            call_type="test_suite",
         )
+        stream = await filter_thinking_chunks(raw_stream)
 
-        chunks: list[str] = []
-        async for chunk in raw_stream:
-            if chunk:
-                chunks.append(chunk)
-
-        response_text = remove_thinking_part("".join(chunks))
-
-        suite = parse_test_suite_json(
-            response_text,
-            task_id=getattr(task, "id", "task_without_id"),
-        )
-
-        return suite
+        parser = TestCaseStreamParser()
+        index = 0
+        async for chunk in stream:
+            for raw in parser.feed(chunk):
+                case = self._parse_streamed_test_case(raw, index, structured)
+                index += 1
+                if case is not None:
+                    yield case
 
+    @traced("AIChat.check_solution")
     async def check_solution(
         self,
         vacancy_info: VacancyInfo,
@@ -300,6 +392,8 @@ class AIChat(AIChatBase):
             self.client,
             settings.llm_model,
             messages,
+            LLMPriority.CHAT,
+            call_type="check_solution",
         )
 
         stream = await filter_thinking_chunks(raw_stream)
@@ -311,3 +405,74 @@ class AIChat(AIChatBase):
         )
 
         return stream, ai_message
+
+    async def _generate_json(
+        self,
+        call_type: str,
+        generate: Callable[[dict[str, Any] | None], Awaitable[str]],
+        schema: dict[str, Any],
+        validate: Validator,
+        parse: Callable[[dict[str, Any]], T],
+    ) -> T:
+        """
+        Run a JSON-producing LLM call.
+
+        In structured mode the backend is asked for schema-constrained output and
+        the result is checked with the compiled schema. Unparsable output first
+        goes through the cheap repair pass and is only re-generated when that
+        fails, up to LLM_JSON_MAX_ATTEMPTS generations in total.
+
+        :param call_type: call name used for metrics and the response_format name
+        :param generate: coroutine producing raw model text for a response_format
+        :param schema: JSON schema of the expected object
+        :param validate: compiled validator of the schema
+        :param parse: conversion of the loaded object into the domain value
+        """
+        structured = settings.llm_structured_output
+        fmt = response_format(call_type, schema) if structured else None
+        attempts = max(1, settings.llm_json_max_attempts)
+
+        for attempt in range(1, attempts + 1):
+            text = await generate(fmt)
+            try:
+                data, repaired = load_json_object(remove_thinking_part(text))
+                if structured:
+                    errors = validate(data)
+                    if errors:
+                        raise ValueError(f"Schema validation failed: {'; '.join(errors[:5])}")
+                result = parse(data)
+            except (ValueError, IndexError) as e:
+                _json_parse_total.labels(call_type, "failed").inc()
+                if attempt == attempts:
+                    raise
+                logger.warning(f"Unparsable {call_type} JSON (attempt {attempt}/{attempts}): {e}")
+                continue
+
+            _json_parse_total.labels(call_type, "repaired" if repaired else "ok").inc()
+            return result
+
+        raise RuntimeError("unreachable")
+
+    def forget_room(self, room_id: UUID) -> None:
+        self.client.forget(room_id)
+
+    def _parse_streamed_test_case(
+        self, raw: str, index: int, structured: bool
+    ) -> CodeTestCase | None:
+        """
+        Parse one test object from the test suite stream, None if it is malformed
+        """
+        try:
+            data, repaired = load_json_object(raw)
+            if structured:
+                errors = self.validate_test_case(data)
+                if errors:
+                    raise ValueError(f"Schema validation failed: {'; '.join(errors[:5])}")
+            case = parse_test_case(data, index, self.checker_names)
+        except ValueError as e:
+            _json_parse_total.labels("test_case", "failed").inc()
+            logger.warning(f"Skipping malformed test #{index}: {e}")
+            return None
+
+        _json_parse_total.labels("test_case", "repaired" if repaired else "ok").inc()
+        return case
@@ -0,0 +1,391 @@
+import asyncio
+import random
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Hashable
+from dataclasses import dataclass, field
+from functools import cache
+from typing import TYPE_CHECKING, Any
+
+from loguru import logger
+
+from src.core.context import current_room_id
+from src.core.log import sampled
+from src.core.resilience import CLOSED, OPEN, publish_breaker_state
+from src.core.setting import settings
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+
+@cache
+def retryable_errors() -> tuple[type[Exception], ...]:
+    """
+    Errors after which the same request may be sent to another replica
+    """
+    from openai import APIConnectionError, InternalServerError
+
+    return (APIConnectionError, InternalServerError)
+
+
+@cache
+def timeout_error() -> type[Exception]:
+    """
+    Error of a request that ran out of time, a subclass of the retryable ones
+    """
+    from openai import APITimeoutError
+
+    return APITimeoutError
+
+
+@dataclass(eq=False)
+class LLMEndpoint:
+    """
+    A single OpenAI-compatible inference replica.
+    The client, and with it the openai package, is created on first use.
+    """
+
+    base_url: str
+    api_key: str = field(repr=False)
+    max_retries: int = 0
+    timeout: float = 60.0
+    outstanding: int = 0
+    consecutive_failures: int = 0
+    unhealthy_until: float = 0.0
+    _client: "AsyncOpenAI | None" = field(default=None, repr=False)
+
+    @property
+    def client(self) -> "AsyncOpenAI":
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            self._client = AsyncOpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=self.max_retries,
+                timeout=self.timeout,
+            )
+        return self._client
+
+    def is_available(self, now: float) -> bool:
+        """
+        Whether the endpoint can take requests, an expired cooldown counts as half-open
+        """
+        return self.unhealthy_until <= now
+
+
+class LLMClientPool:
+    """
+    Client pool over several LLM replicas.
+
+    - Routes to the endpoint with the fewest outstanding requests.
+    - Keeps a room on the same endpoint to reuse its KV cache, unless that
+      endpoint is unhealthy or much busier than the least loaded one.
+    - Passive health checks: consecutive request failures put an endpoint
+      into cooldown. Active health checks: a background task probes `/models`.
+      The cooldown works as a per-endpoint circuit breaker and its state is
+      exported like the breakers of the other dependencies.
+    - Fails over to another endpoint when a request fails before the first
+      token; once every endpoint was tried, retries after a jittered backoff
+      until `retries + 1` attempts were made. The clients do not retry by
+      themselves, the pool is the only retry layer.
+    - Streams wait at most `request_timeout` for the next bytes, non-streaming
+      completions (metrics) have `completion_timeout` for the whole answer.
+    """
+
+    def __init__(
+        self,
+        base_urls: list[str],
+        api_key: str,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        health_check_interval: float = 15.0,
+        health_check_timeout: float = 5.0,
+        request_timeout: float = 60.0,
+        completion_timeout: float = 600.0,
+        retries: int = 2,
+        sticky_imbalance: int = 8,
+        max_sticky_rooms: int = 10_000,
+    ):
+        if not base_urls:
+            raise ValueError("At least one LLM base URL is required")
+
+        self.endpoints = [
+            LLMEndpoint(base_url=url, api_key=api_key, timeout=request_timeout)
+            for url in base_urls
+        ]
+        self.completion_timeout = completion_timeout
+        self.attempts = max(len(self.endpoints), retries + 1)
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self.sticky_imbalance = sticky_imbalance
+        self.max_sticky_rooms = max_sticky_rooms
+
+        self._sticky: OrderedDict[Hashable, LLMEndpoint] = OrderedDict()
+        self._next = 0
+        self._health_task: asyncio.Task | None = None
+
+    def pick(
+        self,
+        room_key: Hashable | None = None,
+        exclude: set[LLMEndpoint] | None = None,
+    ) -> LLMEndpoint:
+        """
+        Pick an endpoint for the next request of the given room
+        """
+
+        now = time.monotonic()
+        candidates = [
+            e for e in self.endpoints if e.is_available(now) and (not exclude or e not in exclude)
+        ]
+        if not candidates:
+            # Everything is down or already tried, better to try than to fail fast
+            candidates = [e for e in self.endpoints if not exclude or e not in exclude]
+        if not candidates:
+            candidates = self.endpoints
+
+        least = min(candidates, key=lambda e: e.outstanding)
+        if least.outstanding > 0 or len(candidates) == 1:
+            chosen = least
+        else:
+            # Rotate between idle endpoints so new rooms spread evenly
+            idle = [e for e in candidates if e.outstanding == 0]
+            self._next = (self._next + 1) % len(idle)
+            chosen = idle[self._next]
+
+        if room_key is None:
+            return chosen
+
+        sticky = self._sticky.get(room_key)
+        if (
+            sticky is not None
+            and sticky in candidates
+            and sticky.outstanding - least.outstanding <= self.sticky_imbalance
+        ):
+            self._sticky.move_to_end(room_key)
+            return sticky
+
+        if sticky is not None:
+            logger.info(f"Moving room {room_key} from {sticky.base_url} to {chosen.base_url}")
+
+        self._sticky[room_key] = chosen
+        self._sticky.move_to_end(room_key)
+        if len(self._sticky) > self.max_sticky_rooms:
+            self._sticky.popitem(last=False)
+        return chosen
+
+    def forget(self, room_key: Hashable) -> None:
+        """
+        Drop the sticky endpoint of a finished room
+        """
+        self._sticky.pop(room_key, None)
+
+    def report_success(self, endpoint: LLMEndpoint) -> None:
+        """
+        Passive health check: a request to the endpoint succeeded
+        """
+        if endpoint.unhealthy_until:
+            publish_breaker_state(f"llm {endpoint.base_url}", CLOSED)
+        endpoint.consecutive_failures = 0
+        endpoint.unhealthy_until = 0.0
+
+    def report_failure(self, endpoint: LLMEndpoint) -> None:
+        """
+        Passive health check: a request to the endpoint failed
+        """
+        endpoint.consecutive_failures += 1
+        if endpoint.consecutive_failures >= self.failure_threshold:
+            if not endpoint.unhealthy_until:
+                publish_breaker_state(f"llm {endpoint.base_url}", OPEN)
+            endpoint.unhealthy_until = time.monotonic() + self.cooldown
+            logger.warning(
+                f"LLM endpoint {endpoint.base_url} marked unhealthy "
+                f"after {endpoint.consecutive_failures} failures"
+            )
+
+    async def stream_chat_completion(self, **kwargs: Any) -> AsyncGenerator[str, None]:
+        """
+        Stream text deltas of a chat completion, failing over to another
+        endpoint while no text has been produced yet
+        """
+
+        room_key = current_room_id.get()
+        tried: list[LLMEndpoint] = []
+
+        while True:
+            endpoint = self.pick(room_key, exclude=set(tried))
+            endpoint.outstanding += 1
+            started = False
+            stream = None
+            try:
+                stream = await endpoint.client.chat.completions.create(stream=True, **kwargs)
+                async for event in stream:
+                    delta = event.choices[0].delta.content
+                    if delta:
+                        started = True
+                        yield delta
+                self.report_success(endpoint)
+                return
+            except retryable_errors() as e:
+                self.report_failure(endpoint)
+                if started:
+                    raise
+                error = e
+            finally:
+                endpoint.outstanding -= 1
+                if stream is not None:
+                    # Closing the connection of a stream that was not read to the end
+                    # (cancelled, closed by the consumer) stops the generation upstream
+                    await stream.close()
+
+            if not await self._before_retry(endpoint, tried, error):
+                raise error
+
+    async def create_chat_completion(self, **kwargs: Any) -> str:
+        """
+        Get the text of a non-streaming chat completion with failover
+        """
+
+        room_key = current_room_id.get()
+        tried: list[LLMEndpoint] = []
+
+        while True:
+            endpoint = self.pick(room_key, exclude=set(tried))
+            endpoint.outstanding += 1
+            try:
+                resp = await endpoint.client.chat.completions.create(
+                    timeout=self.completion_timeout, **kwargs
+                )
+                self.report_success(endpoint)
+                return resp.choices[0].message.content
+            except retryable_errors() as e:
+                self.report_failure(endpoint)
+                # A completion that used its whole deadline would likely time out again
+                if isinstance(e, timeout_error()):
+                    raise
+                error = e
+            finally:
+                endpoint.outstanding -= 1
+
+            if not await self._before_retry(endpoint, tried, error):
+                raise error
+
+    async def _before_retry(
+        self, endpoint: LLMEndpoint, tried: list[LLMEndpoint], error: Exception
+    ) -> bool:
+        """
+        After a failed attempt: False if it was the last one, otherwise fail
+        over, or wait before trying the same endpoints again
+        """
+        tried.append(endpoint)
+        if len(tried) >= self.attempts:
+            return False
+        retry = len(tried) - len(self.endpoints)
+        if retry < 0:
+            logger.warning(f"LLM endpoint {endpoint.base_url} failed, failing over: {error}")
+            return True
+
+        delay = random.uniform(
+            0, min(settings.retry_backoff_max, settings.retry_backoff_base * 2**retry)
+        )
+        logger.warning(
+            f"LLM endpoint {endpoint.base_url} failed, retrying in {delay:.2f}s: {error}"
+        )
+        await asyncio.sleep(delay)
+        return True
+
+    async def check_health(self, endpoint: LLMEndpoint) -> bool:
+        """
+        Active health check of a single endpoint
+        """
+        try:
+            await asyncio.wait_for(endpoint.client.models.list(), self.health_check_timeout)
+        except Exception as e:
+            # Repeats every interval while the endpoint is down
+            sampled("llm_health_check_failed", 10).warning(
+                f"LLM endpoint {endpoint.base_url} health check failed: {e}"
+            )
+            endpoint.consecutive_failures = max(
+                endpoint.consecutive_failures + 1, self.failure_threshold
+            )
+            if not endpoint.unhealthy_until:
+                publish_breaker_state(f"llm {endpoint.base_url}", OPEN)
+            endpoint.unhealthy_until = time.monotonic() + self.cooldown
+            return False
+
+        if endpoint.unhealthy_until:
+            logger.info(f"LLM endpoint {endpoint.base_url} is healthy again")
+        self.report_success(endpoint)
+        return True
+
+    async def warm_up(self) -> int:
+        """
+        Open connections to every endpoint ahead of the first request,
+        returns the number of healthy endpoints
+        """
+        results = await asyncio.gather(*(self.check_health(e) for e in self.endpoints))
+        return sum(results)
+
+    async def prime(self, **kwargs: Any) -> None:
+        """
+        Send the same small completion to every available endpoint, so shared
+        prompt prefixes are in each replica's cache before real traffic
+        """
+        now = time.monotonic()
+
+        async def prime_endpoint(endpoint: LLMEndpoint) -> None:
+            try:
+                await endpoint.client.chat.completions.create(**kwargs)
+            except Exception as e:
+                logger.warning(f"Priming LLM endpoint {endpoint.base_url} failed: {e}")
+
+        await asyncio.gather(
+            *(prime_endpoint(e) for e in self.endpoints if e.is_available(now))
+        )
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check_health(e) for e in self.endpoints))
+            await asyncio.sleep(self.health_check_interval)
+
+    def start(self) -> None:
+        """
+        Start active health checks, a no-op for a single endpoint
+        """
+        if len(self.endpoints) > 1 and self._health_task is None:
+            self._health_task = asyncio.create_task(self._health_loop())
+
+    async def close(self) -> None:
+        """
+        Stop health checks and close the underlying HTTP clients
+        """
+        if self._health_task is not None:
+            self._health_task.cancel()
+            try:
+                await self._health_task
+            except asyncio.CancelledError:
+                pass
+            self._health_task = None
+
+        for endpoint in self.endpoints:
+            if endpoint._client is not None:
+                await endpoint._client.close()
+
+
+def _base_urls() -> list[str]:
+    urls = [url.strip() for url in settings.openai_base_urls.split(",") if url.strip()]
+    return urls or [settings.openai_base_url]
+
+
+llm_client_pool = LLMClientPool(
+    base_urls=_base_urls(),
+    api_key=settings.openai_api_key,
+    failure_threshold=settings.llm_endpoint_failure_threshold,
+    cooldown=settings.llm_endpoint_cooldown,
+    health_check_interval=settings.llm_health_check_interval,
+    request_timeout=settings.llm_request_timeout,
+    completion_timeout=settings.llm_completion_timeout,
+    retries=settings.llm_request_retries,
+)
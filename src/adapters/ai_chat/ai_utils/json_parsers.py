@@ -1,6 +1,6 @@
 import json
 import re
-from typing import Any
+from typing import Any, Collection
 
 from src.domain.metrics.metrics import (
     MetricsBlock2,
@@ -28,17 +28,118 @@ def _strip_markdown_fences(s: str) -> str:
     return s.strip()
 
 
-def _load_json(obj: str | dict[str, Any]) -> dict[str, Any]:
+def repair_json(s: str) -> str:
+    """
+    Cheap single-pass repair of almost-valid JSON from the model:
+    - cuts the text down to the first top-level {...} object,
+    - escapes raw newlines / tabs inside strings,
+    - drops trailing commas before } and ],
+    - closes objects and arrays left open by a truncated generation,
+      dropping the last member if it was cut in the middle and an object
+      array element that was not closed.
+    """
+    start = s.find("{")
+    if start == -1:
+        return s
+
+    out: list[str] = []
+    stack: list[str] = []
+    # Length of `out` where the last complete member of each open container ends
+    member_ends: list[int] = []
+    in_string = False
+    escape = False
+
+    for ch in s[start:]:
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+            elif ch == "\n":
+                ch = "\\n"
+            elif ch == "\r":
+                ch = "\\r"
+            elif ch == "\t":
+                ch = "\\t"
+            out.append(ch)
+            continue
+
+        if ch == '"':
+            in_string = True
+        elif ch in "{[":
+            stack.append("}" if ch == "{" else "]")
+            out.append(ch)
+            member_ends.append(len(out))
+            continue
+        elif ch == "," and member_ends:
+            member_ends[-1] = len(out)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if not stack:
+                break
+            stack.pop()
+            member_ends.pop()
+            out.append(ch)
+            if not stack:
+                break
+            continue
+        out.append(ch)
+
+    if not stack:
+        return "".join(out)
+
+    # Truncated generation. An open object inside an array is a record that
+    # may be missing members, e.g. a test without its expected output: dropped
+    for level in range(1, len(stack)):
+        if stack[level] == "}" and stack[level - 1] == "]":
+            return _close_containers(out[: member_ends[level - 1]], stack[:level])
+
+    # A cut string or scalar may be missing characters ("36288" of "362880"),
+    # so only a member that ended with a closing quote or bracket is kept as-is
+    last = "".join(out).rstrip()[-1:]
+    if not in_string and last in ('"', "}", "]"):
+        closed = _close_containers(out, stack)
+        try:
+            json.loads(closed)
+            return closed
+        except json.JSONDecodeError:
+            pass
+
+    # Otherwise drop the member that was cut in the middle
+    return _close_containers(out[: member_ends[-1]], stack)
+
+
+def _close_containers(out: list[str], stack: list[str]) -> str:
+    out = list(out)
+    for closing in reversed(stack):
+        _drop_trailing_comma(out)
+        out.append(closing)
+    return "".join(out)
+
+
+def _drop_trailing_comma(out: list[str]) -> None:
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i:]
+
+
+def load_json_object(obj: str | dict[str, Any]) -> tuple[dict[str, Any], bool]:
     """
     Robust JSON loader:
     - Accepts dict and returns it as-is.
     - For str:
       * strips markdown fences,
       * first tries json.loads directly,
-      * if that fails, extracts the first {...} block with regex and parses it.
+      * if that fails, runs repair_json and parses the result.
+
+    :return: parsed object and whether the repair pass was needed
     """
     if isinstance(obj, dict):
-        return obj
+        return obj, False
     if not isinstance(obj, str):
         raise TypeError(f"Expected str or dict, got {type(obj)}")
 
@@ -47,22 +148,30 @@ def _load_json(obj: str | dict[str, Any]) -> dict[str, Any]:
     if not s:
         raise ValueError("Invalid JSON: empty string from model")
 
+    repaired = False
+
     # First attempt: parse as-is
     try:
         data = json.loads(s)
     except json.JSONDecodeError:
-        # Fallback: extract first { ... } block
-        match = re.search(r"\{.*\}", s, re.S)
-        if not match:
+        # Fallback: repair the first { ... } block
+        if "{" not in s:
             preview = s[:120].replace("\n", "\\n")
             raise ValueError(f"Invalid JSON: could not find JSON object in: '{preview}...'")
-        inner = match.group(0)
-        data = json.loads(inner)
+        data = json.loads(repair_json(s))
+        repaired = True
 
     if not isinstance(data, dict):
         raise ValueError("JSON root must be an object")
 
-    return data
+    return data, repaired
+
+
+def _load_json(obj: str | dict[str, Any]) -> dict[str, Any]:
+    """
+    Load a JSON object, see load_json_object
+    """
+    return load_json_object(obj)[0]
 
 
 def parse_metrics_block2(json_obj: str | dict[str, Any]) -> MetricsBlock2:
@@ -149,6 +258,7 @@ def parse_metrics_block3(json_obj: str | dict[str, Any]) -> MetricsBlock3:
 def parse_test_suite_json(
     json_obj: str | dict[str, Any],
     task_id: str,
+    checker_names: Collection[str],
 ) -> CodeTestSuite:
     """
     Parse LLM JSON into CodeTestSuite.
@@ -161,7 +271,8 @@ def parse_test_suite_json(
             "id": "t1",
             "input_data": "stdin string",
             "expected_output": "stdout string",
-            "is_hidden": false
+            "is_hidden": false,
+            "checker": "tokens"
           },
           ...
         ]
@@ -169,8 +280,10 @@ def parse_test_suite_json(
 
     Notes:
     - "id" is required, but if missing we auto-generate "t1", "t2", ...
+    - "expected_output" is required.
     - "is_hidden" defaults to False if missing, and is normalized to bool
       (accepts true/false/1/0/yes/no as strings).
+    - "checker" is optional and must name one of `checker_names`.
     """
 
     data = _load_json(json_obj)
@@ -183,42 +296,136 @@ def parse_test_suite_json(
     if not raw_tests:
         raise ValueError("Test suite JSON contains an empty 'tests' list")
 
-    tests: list[CodeTestCase] = []
-
-    for i, t in enumerate(raw_tests):
-        if not isinstance(t, dict):
-            raise ValueError(f"Test #{i} must be a JSON object, got {type(t)}")
-
-        # id
-        test_id = t.get("id")
-        if not test_id:
-            test_id = f"t{i + 1}"
-        test_id = str(test_id)
-
-        # input / output as strings
-        input_data = str(t.get("input_data", ""))
-        expected_output = str(t.get("expected_output", ""))
-
-        # is_hidden normalization
-        raw_hidden = t.get("is_hidden", False)
-        if isinstance(raw_hidden, str):
-            val = raw_hidden.strip().lower()
-            if val in {"true", "1", "yes"}:
-                is_hidden = True
-            elif val in {"false", "0", "no"}:
-                is_hidden = False
-            else:
-                raise ValueError(f"Invalid is_hidden value in test '{test_id}': {raw_hidden}")
+    tests = [parse_test_case(t, i, checker_names) for i, t in enumerate(raw_tests)]
+
+    return CodeTestSuite(task_id=task_id, tests=tests)
+
+
+def parse_test_case(t: Any, index: int, checker_names: Collection[str]) -> CodeTestCase:
+    """
+    Parse a single test object of the test suite JSON into CodeTestCase.
+
+    :param t: test object
+    :param index: position of the test in the suite, used for the default id
+    :param checker_names: output checkers a test may name
+    """
+    if not isinstance(t, dict):
+        raise ValueError(f"Test #{index} must be a JSON object, got {type(t)}")
+
+    # id
+    test_id = t.get("id")
+    if not test_id:
+        test_id = f"t{index + 1}"
+    test_id = str(test_id)
+
+    # input / output as strings
+    if "expected_output" not in t:
+        raise ValueError(f"Test '{test_id}' has no expected_output")
+    input_data = str(t.get("input_data", ""))
+    expected_output = str(t["expected_output"])
+
+    # is_hidden normalization
+    raw_hidden = t.get("is_hidden", False)
+    if isinstance(raw_hidden, str):
+        val = raw_hidden.strip().lower()
+        if val in {"true", "1", "yes"}:
+            is_hidden = True
+        elif val in {"false", "0", "no"}:
+            is_hidden = False
         else:
-            is_hidden = bool(raw_hidden)
-
-        tests.append(
-            CodeTestCase(
-                id=test_id,
-                input_data=input_data,
-                expected_output=expected_output,
-                is_hidden=is_hidden,
-            )
-        )
-
-    return CodeTestSuite(task_id=task_id, tests=tests)
\ No newline at end of file
+            raise ValueError(f"Invalid is_hidden value in test '{test_id}': {raw_hidden}")
+    else:
+        is_hidden = bool(raw_hidden)
+
+    # Optional, the default checker applies without it
+    checker = t.get("checker")
+    if checker:
+        checker = str(checker).strip()
+        name = checker.partition(":")[0]
+        if name not in checker_names:
+            raise ValueError(f"Invalid checker in test '{test_id}': unknown checker {name}")
+
+    return CodeTestCase(
+        id=test_id,
+        input_data=input_data,
+        expected_output=expected_output,
+        is_hidden=is_hidden,
+        checker=checker or None,
+    )
+
+
+_SIGNIFICANT = re.compile(r'[{}\[\]"\\]')
+_STRING_SIGNIFICANT = re.compile(r'["\\]')
+
+
+class TestCaseStreamParser:
+    """
+    Incremental parser of the test suite JSON.
+
+    Feed it model text chunks as they arrive; it returns the raw text of every
+    object of the top-level array (the "tests" array) as soon as the object
+    closes. Braces inside strings are ignored and text around the root object
+    (markdown fences, stray words) is skipped.
+    """
+
+    __test__ = False  # not a pytest test class
+
+    def __init__(self):
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escape = False
+        self._capture: list[str] | None = None
+
+    def feed(self, chunk: str) -> list[str]:
+        """
+        Consume a chunk and return raw texts of test objects completed by it
+        """
+        completed: list[str] = []
+        capture_from = 0
+        pos = 0
+        n = len(chunk)
+
+        while pos < n:
+            if self._escape:
+                self._escape = False
+                pos += 1
+                continue
+
+            if self._in_string:
+                match = _STRING_SIGNIFICANT.search(chunk, pos)
+                if match is None:
+                    break
+                pos = match.end()
+                if match.group() == "\\":
+                    self._escape = True
+                else:
+                    self._in_string = False
+                continue
+
+            match = _SIGNIFICANT.search(chunk, pos)
+            if match is None:
+                break
+            ch = match.group()
+            pos = match.end()
+
+            if ch == '"':
+                if self._stack:
+                    self._in_string = True
+            elif ch == "\\":
+                continue
+            elif ch in "{[":
+                if ch == "{" and self._stack == ["{", "["]:
+                    self._capture = []
+                    capture_from = pos - 1
+                self._stack.append(ch)
+            elif self._stack:
+                self._stack.pop()
+                if ch == "}" and self._capture is not None and self._stack == ["{", "["]:
+                    self._capture.append(chunk[capture_from:pos])
+                    completed.append("".join(self._capture))
+                    self._capture = None
+
+        if self._capture is not None:
+            self._capture.append(chunk[capture_from:])
+
+        return completed
@@ -0,0 +1,212 @@
+import re
+from typing import Any, Callable, Iterable
+
+# Validator returns a list of human-readable errors, empty when the value is valid
+Validator = Callable[[Any], list[str]]
+
+
+METRICS_BLOCK2_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "summary": {"type": "string"},
+        "clarity_score": {"type": "integer", "minimum": 0, "maximum": 5},
+        "completeness_score": {"type": "integer", "minimum": 0, "maximum": 5},
+        "feedback_response": {"type": "string"},
+        "tech_fit_level": {"type": "string", "enum": ["low", "medium", "high"]},
+        "tech_fit_comment": {"type": "string"},
+    },
+    "required": [
+        "summary",
+        "clarity_score",
+        "completeness_score",
+        "feedback_response",
+        "tech_fit_level",
+        "tech_fit_comment",
+    ],
+    "additionalProperties": False,
+}
+
+METRICS_BLOCK3_SCHEMA: dict[str, Any] = {
+    "type": "object",
+    "properties": {
+        "strengths": {"type": "string"},
+        "weaknesses": {"type": "string"},
+        "cheating_summary": {"type": "string"},
+        "seniority_guess": {"type": "string", "enum": ["junior", "middle", "senior"]},
+        "recommendation": {
+            "type": "string",
+            "enum": ["reject", "doubt", "hire", "strong_hire"],
+        },
+    },
+    "required": [
+        "strengths",
+        "weaknesses",
+        "cheating_summary",
+        "seniority_guess",
+        "recommendation",
+    ],
+    "additionalProperties": False,
+}
+
+
+def checker_spec_pattern(checker_names: Iterable[str]) -> str:
+    """
+    Pattern of a checker spec: one of the names, optionally followed by an
+    argument, e.g. "numeric:1e-6"
+    """
+    return rf"^({'|'.join(map(re.escape, checker_names))})(:[0-9A-Za-z.+-]+)?$"
+
+
+def build_test_suite_schema(checker_names: Iterable[str]) -> dict[str, Any]:
+    """
+    Schema of the test suite JSON, tests may name one of the given checkers
+    """
+    checker_spec = {"type": "string", "pattern": checker_spec_pattern(checker_names)}
+    return {
+        "type": "object",
+        "properties": {
+            "tests": {
+                "type": "array",
+                "minItems": 1,
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "id": {"type": "string"},
+                        "input_data": {"type": "string"},
+                        "expected_output": {"type": "string"},
+                        "is_hidden": {"type": "boolean"},
+                        "checker": checker_spec,
+                    },
+                    "required": ["id", "input_data", "expected_output", "is_hidden"],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["tests"],
+        "additionalProperties": False,
+    }
+
+
+_TYPE_CHECKS: dict[str, Callable[[Any], bool]] = {
+    "object": lambda v: isinstance(v, dict),
+    "array": lambda v: isinstance(v, list),
+    "string": lambda v: isinstance(v, str),
+    "integer": lambda v: isinstance(v, int) and not isinstance(v, bool),
+    "number": lambda v: isinstance(v, (int, float)) and not isinstance(v, bool),
+    "boolean": lambda v: isinstance(v, bool),
+}
+
+
+def compile_schema(schema: dict[str, Any], path: str = "$") -> Validator:
+    """
+    Compile a JSON schema into a validator function.
+
+    Supports the subset used for LLM outputs: type, enum, pattern, minimum,
+    maximum, properties, required, additionalProperties (false only), items,
+    minItems.
+    The schema is walked once here, validation only runs the prepared checks.
+    """
+
+    checks: list[Callable[[Any, list[str]], None]] = []
+
+    schema_type = schema.get("type")
+    if schema_type is not None:
+        type_check = _TYPE_CHECKS[schema_type]
+
+        def check_type(value: Any, errors: list[str]) -> None:
+            if not type_check(value):
+                errors.append(f"{path}: expected {schema_type}, got {type(value).__name__}")
+
+        checks.append(check_type)
+
+    if "enum" in schema:
+        allowed = frozenset(schema["enum"])
+
+        def check_enum(value: Any, errors: list[str]) -> None:
+            if isinstance(value, (str, int, float, bool)) and value not in allowed:
+                errors.append(f"{path}: {value!r} is not one of {sorted(allowed)}")
+
+        checks.append(check_enum)
+
+    if "pattern" in schema:
+        pattern = re.compile(schema["pattern"])
+
+        def check_pattern(value: Any, errors: list[str]) -> None:
+            if isinstance(value, str) and not pattern.search(value):
+                errors.append(f"{path}: {value!r} does not match {pattern.pattern}")
+
+        checks.append(check_pattern)
+
+    minimum = schema.get("minimum")
+    maximum = schema.get("maximum")
+    if minimum is not None or maximum is not None:
+
+        def check_range(value: Any, errors: list[str]) -> None:
+            if not isinstance(value, (int, float)) or isinstance(value, bool):
+                return
+            if minimum is not None and value < minimum:
+                errors.append(f"{path}: {value} is less than {minimum}")
+            if maximum is not None and value > maximum:
+                errors.append(f"{path}: {value} is greater than {maximum}")
+
+        checks.append(check_range)
+
+    if schema_type == "object":
+        properties = {
+            key: compile_schema(sub, f"{path}.{key}")
+            for key, sub in schema.get("properties", {}).items()
+        }
+        required = tuple(schema.get("required", ()))
+        closed = schema.get("additionalProperties") is False
+
+        def check_object(value: Any, errors: list[str]) -> None:
+            if not isinstance(value, dict):
+                return
+            for key in required:
+                if key not in value:
+                    errors.append(f"{path}: missing key '{key}'")
+            for key, item in value.items():
+                validator = properties.get(key)
+                if validator is not None:
+                    errors.extend(validator(item))
+                elif closed:
+                    errors.append(f"{path}: unexpected key '{key}'")
+
+        checks.append(check_object)
+
+    if schema_type == "array":
+        items = compile_schema(schema["items"], f"{path}[]") if "items" in schema else None
+        min_items = schema.get("minItems")
+
+        def check_array(value: Any, errors: list[str]) -> None:
+            if not isinstance(value, list):
+                return
+            if min_items is not None and len(value) < min_items:
+                errors.append(f"{path}: expected at least {min_items} items")
+            if items is not None:
+                for item in value:
+                    errors.extend(items(item))
+
+        checks.append(check_array)
+
+    def validate(value: Any) -> list[str]:
+        errors: list[str] = []
+        for check in checks:
+            check(value, errors)
+        return errors
+
+    return validate
+
+
+def response_format(name: str, schema: dict[str, Any]) -> dict[str, Any]:
+    """
+    Build the OpenAI `response_format` payload requesting schema-constrained output
+    """
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": name, "schema": schema, "strict": True},
+    }
+
+
+validate_metrics_block2 = compile_schema(METRICS_BLOCK2_SCHEMA)
+validate_metrics_block3 = compile_schema(METRICS_BLOCK3_SCHEMA)
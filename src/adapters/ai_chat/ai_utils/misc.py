@@ -2,49 +2,121 @@ from typing import Generator, List, Dict, Any
 from src.core.setting import settings
 from collections.abc import AsyncGenerator
 from typing import Dict, List
-from openai import AsyncOpenAI
+from src.adapters.ai_chat.ai_utils.client_pool import LLMClientPool
+from src.adapters.ai_chat.ai_utils.scheduler import LLMPriority, llm_scheduler
+from src.core.metrics import registry
+from src.core.tracing import span
+import time
+
+_call_seconds = registry.histogram(
+    "llm_call_seconds",
+    "Duration of LLM calls until the last token, including scheduler wait",
+    labels=("call_type",),
+)
+_first_token_seconds = registry.histogram(
+    "llm_time_to_first_token_seconds",
+    "Time from starting a streamed LLM call to its first text delta",
+    labels=("call_type",),
+)
+_tokens_per_second = registry.histogram(
+    "llm_tokens_per_second",
+    "Streamed text deltas (about one token each) per second after the first one",
+    labels=("call_type",),
+    buckets=(1, 5, 10, 20, 30, 50, 75, 100, 150, 250, 500),
+)
+_prompt_chars = registry.histogram(
+    "llm_prompt_chars",
+    "Size of LLM prompts in characters",
+    labels=("call_type",),
+    buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000, 64000, 128000),
+)
+
+
+def _prompt_size(messages: List[Dict[str, str]]) -> int:
+    return sum(len(message["content"]) for message in messages)
 
 async def get_chat_completion_stream(
-    client: AsyncOpenAI,
+    client: LLMClientPool,
     model: str,
     messages: List[Dict[str, str]],
+    priority: LLMPriority = LLMPriority.CHAT,
+    response_format: dict[str, Any] | None = None,
+    call_type: str = "chat",
 ) -> AsyncGenerator[str, None]:
     """
     Call OpenAI Chat Completions in streaming mode and yield *text chunks*.
 
+    The request is started on first iteration and holds an LLM scheduler slot
+    of the given priority until the stream is exhausted or closed. The pool
+    picks the replica and fails over before the first token.
+
+    response_format, if given, is passed to the backend to constrain the output.
+    call_type labels the latency, first token and throughput metrics of the call.
+
     Usage:
         raw_stream = await get_chat_completion_stream(client, model, messages)
         async for chunk in raw_stream:
             ...
     """
-    stream = await client.chat.completions.create(
-        model=model,
-        messages=messages,
-        stream=True,
-    )
+
+    _prompt_chars.labels(call_type).observe(_prompt_size(messages))
 
     async def gen() -> AsyncGenerator[str, None]:
-        async for event in stream:
-            delta = event.choices[0].delta.content
-            if delta:
-                yield delta
+        started = time.perf_counter()
+        first_token = None
+        deltas = 0
+
+        with span("llm.stream", call_type=call_type, priority=priority.name) as llm_span:
+            async with llm_scheduler.slot(priority):
+                llm_span.add_event("scheduled")
+                async for delta in client.stream_chat_completion(
+                    model=model,
+                    messages=messages,
+                    **_response_format_kwargs(response_format),
+                ):
+                    if first_token is None:
+                        first_token = time.perf_counter()
+                        _first_token_seconds.labels(call_type).observe(first_token - started)
+                        llm_span.add_event("first_token")
+                    deltas += 1
+                    yield delta
+            llm_span.set_attribute("deltas", deltas)
+
+        finished = time.perf_counter()
+        _call_seconds.labels(call_type).observe(finished - started)
+        if first_token is not None and deltas > 1 and finished > first_token:
+            _tokens_per_second.labels(call_type).observe((deltas - 1) / (finished - first_token))
 
     return gen()
 
-def get_chat_completion(
-    client: Any,
+async def get_chat_completion(
+    client: LLMClientPool,
     model: str,
     messages: List[Dict[str, str]],
+    priority: LLMPriority = LLMPriority.CHAT,
+    response_format: dict[str, Any] | None = None,
+    call_type: str = "chat",
 ) -> str:
     """
-    Get chat completion
+    Get chat completion, holding an LLM scheduler slot of the given priority
     """
-    resp = client.chat.completions.create(
-        model=model,
-        messages=messages,
-    )
-    
-    return resp.choices[0].message.content
+    _prompt_chars.labels(call_type).observe(_prompt_size(messages))
+    started = time.perf_counter()
+
+    with span("llm.completion", call_type=call_type, priority=priority.name) as llm_span:
+        async with llm_scheduler.slot(priority):
+            llm_span.add_event("scheduled")
+            text = await client.create_chat_completion(
+                model=model,
+                messages=messages,
+                **_response_format_kwargs(response_format),
+            )
+
+    _call_seconds.labels(call_type).observe(time.perf_counter() - started)
+    return text
+
+def _response_format_kwargs(response_format: dict[str, Any] | None) -> dict[str, Any]:
+    return {"response_format": response_format} if response_format else {}
 
 def remove_thinking_part(message: str) -> str:
     """
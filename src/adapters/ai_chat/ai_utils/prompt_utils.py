@@ -1,12 +1,15 @@
+from functools import lru_cache
 from pathlib import Path
 
 PROMPT_DIR = Path(__file__).resolve().parent.parent / "prompts"
 
 
+@lru_cache(maxsize=None)
 def load_prompt(relative_path: str) -> str:
     """
     Load a prompt by relative path inside the prompts directory,
     e.g. 'system/response_system_prompt.txt' or 'user/response_prompt.txt'.
+    Prompts are read from disk once and cached.
     """
     path = PROMPT_DIR / relative_path
     if not path.exists():
@@ -14,6 +17,16 @@ def load_prompt(relative_path: str) -> str:
     return path.read_text(encoding="utf-8")
 
 
+def preload_prompts() -> int:
+    """
+    Read every prompt into the cache, returns the number of prompts
+    """
+    paths = sorted(PROMPT_DIR.rglob("*.txt"))
+    for path in paths:
+        load_prompt(path.relative_to(PROMPT_DIR).as_posix())
+    return len(paths)
+
+
 if __name__ == "__main__":
     print(load_prompt("system/response_system_prompt.txt"))
     print(load_prompt("user/response_prompt.txt"))
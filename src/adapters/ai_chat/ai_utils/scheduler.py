@@ -0,0 +1,150 @@
+import asyncio
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from enum import IntEnum
+
+from src.core.metrics import registry
+from src.core.setting import settings
+
+
+class LLMPriority(IntEnum):
+    """
+    Priority classes of LLM calls, lower value is served first
+    """
+
+    CHAT = 0  # live candidate-facing streams
+    TASK = 1  # task generation
+    TEST_SUITE = 2  # test suite generation
+    BACKGROUND = 3  # interview plans and metrics
+
+    def __str__(self):
+        return self.name.lower()
+
+
+class LLMScheduler:
+    """
+    Global concurrency cap in front of the LLM backend.
+
+    Requests over the cap wait in per-priority FIFO queues. A released slot is
+    handed directly to the oldest waiter of the highest non-empty priority,
+    unless a waiter has waited longer than `aging` seconds: aged waiters are
+    served first, oldest first, so a steady stream of chat calls cannot
+    starve background work.
+    """
+
+    def __init__(self, max_concurrency: int, aging: float = 0.0):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1")
+
+        self.max_concurrency = max_concurrency
+        self.aging = aging
+        self._active = 0
+        # (enqueue time, waiter) in FIFO order
+        self._queues: dict[LLMPriority, deque[tuple[float, asyncio.Future[None]]]] = {
+            priority: deque() for priority in LLMPriority
+        }
+        self._queue_wait = registry.histogram(
+            "llm_queue_wait_seconds",
+            "Time LLM calls spend waiting for a scheduler slot",
+            labels=("priority",),
+        )
+
+    @property
+    def active(self) -> int:
+        """
+        Number of LLM calls currently holding a slot
+        """
+        return self._active
+
+    def queued(self, priority: LLMPriority) -> int:
+        """
+        Number of LLM calls waiting in the given priority class
+        """
+        return sum(1 for _, waiter in self._queues[priority] if not waiter.done())
+
+    async def acquire(self, priority: LLMPriority) -> None:
+        """
+        Wait for a slot in the given priority class
+        """
+
+        if self._active < self.max_concurrency:
+            self._active += 1
+            self._queue_wait.labels(str(priority)).observe(0.0)
+            return
+
+        start = time.perf_counter()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        queue = self._queues[priority]
+        entry = (time.monotonic(), waiter)
+        queue.append(entry)
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over right before cancellation
+                self.release()
+            else:
+                try:
+                    queue.remove(entry)
+                except ValueError:
+                    pass
+            raise
+
+        self._queue_wait.labels(str(priority)).observe(time.perf_counter() - start)
+
+    def release(self) -> None:
+        """
+        Release a slot, handing it over to the next waiter if any
+        """
+
+        queue = self._next_queue()
+        while queue is not None:
+            _, waiter = queue.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+            queue = self._next_queue()
+
+        self._active -= 1
+
+    def _next_queue(self) -> deque[tuple[float, asyncio.Future[None]]] | None:
+        """
+        Queue whose head is served next: the oldest aged waiter, otherwise
+        the highest non-empty priority
+        """
+
+        first: deque[tuple[float, asyncio.Future[None]]] | None = None
+        aged: deque[tuple[float, asyncio.Future[None]]] | None = None
+        aged_since = time.monotonic() - self.aging
+
+        for priority in LLMPriority:
+            queue = self._queues[priority]
+            if not queue:
+                continue
+            if first is None:
+                first = queue
+            if self.aging > 0 and queue[0][0] <= aged_since and (
+                aged is None or queue[0][0] < aged[0][0]
+            ):
+                aged = queue
+
+        return aged or first
+
+    @asynccontextmanager
+    async def slot(self, priority: LLMPriority) -> AsyncIterator[None]:
+        """
+        Hold a slot for the duration of the context
+        """
+        await self.acquire(priority)
+        try:
+            yield
+        finally:
+            self.release()
+
+
+llm_scheduler = LLMScheduler(
+    settings.llm_max_concurrency, aging=settings.llm_priority_aging_seconds
+)
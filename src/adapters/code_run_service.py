@@ -1,15 +1,47 @@
+import time
+from typing import TYPE_CHECKING
+
+from src.core.metrics import registry
+from src.core.resilience import Dependency, TransientError
+from src.core.setting import settings
+from src.core.tracing import current_span, traced
 from src.usecases.interfaces.code_run_service import CodeRunServiceBase
 from src.domain.test.run_result import RunResult
 
-import aiohttp
 from loguru import logger
 
+if TYPE_CHECKING:
+    import aiohttp
+
+_run_seconds = registry.histogram(
+    "code_run_seconds",
+    "Duration of code runner requests",
+    labels=("language",),
+)
+_run_total = registry.counter(
+    "code_run_requests_total",
+    "Code runner requests by HTTP status, \"error\" when no response arrived",
+    labels=("status",),
+)
+
+# Runs are pure functions of code and stdin, so they are safe to retry and hedge;
+# every run is billed, the hedge and the retries share CODE_RUN_RETRIES + 1 requests
+code_runner = Dependency(
+    "code_runner",
+    timeout=settings.code_run_timeout,
+    retries=settings.code_run_retries,
+    hedge_after=settings.code_run_hedge_after,
+)
+
 
 class CodeRunService(CodeRunServiceBase):
     """
     Run code in a language
     """
 
+    # Shared by all instances so connections to the runner are reused
+    _shared_session: "aiohttp.ClientSession | None" = None
+
     def __init__(self, base_url: str, api_key: str):
         """
         Initializes the code run service
@@ -17,52 +49,105 @@ class CodeRunService(CodeRunServiceBase):
         self.base_url = base_url.rstrip("/")
         self.api_key = api_key
 
+    @traced("CodeRunService.run_code")
     async def run_code(self, language: str, stdin: str, code: str) -> RunResult:
         """
         Run code in a language
         """
 
-        logger.info(f"Running code in {language}")
+        import aiohttp
+
+        logger.debug(f"Running code in {language}")
+        try:
+            return await code_runner.hedged(
+                lambda: self._request(language, stdin, code),
+                retry_on=(aiohttp.ClientError,),
+            )
+        except Exception as e:
+            logger.error(f"Failed to run code in {language}, error {e!r}")
+            raise e
+
+    async def _request(self, language: str, stdin: str, code: str) -> RunResult:
+        """
+        Send a single run request to the runner
+        """
+
         url = f"{self.base_url}/api/v1/run"
+        started = time.perf_counter()
+        status = "error"
 
-        async with aiohttp.ClientSession(
-            headers={
-                "x-rapidapi-host": self.base_url,
-                "x-rapidapi-key": self.api_key,
-            }
-        ) as session:
-            try:
-                async with session.post(
-                    url,
-                    json={
-                        "language": language,
-                        "stdin": stdin,
-                        "files": {
-                            "name": "index" + self._parse_language(language),
-                            "content": code,
-                        },
+        try:
+            async with self._session().post(
+                url,
+                headers={
+                    "x-rapidapi-host": self.base_url,
+                    "x-rapidapi-key": self.api_key,
+                },
+                json={
+                    "language": language,
+                    "stdin": stdin,
+                    "files": {
+                        "name": "index" + self._parse_language(language),
+                        "content": code,
                     },
-                ) as response:
-                    if response.status == 200:
-                        json_response = await response.json()
-
-                        return RunResult(
-                            status=json_response["status"],
-                            exception=json_response["exception"],
-                            stdout=json_response["stdout"],
-                            stderr=json_response["stderr"],
-                            execution_time=json_response["executionTime"],
-                            stdin=json_response["stdin"],
-                        )
-                    else:
-                        logger.error(
-                            f"Failed to run code in {language}, status {response.status}, reason {response.reason}"
-                        )
-                        raise Exception("Failed to run code")
-
-            except Exception as e:
-                logger.error(f"Failed to run code in {language}, error {e}")
-                raise e
+                },
+            ) as response:
+                status = str(response.status)
+                current_span().set_attribute("http.status", response.status)
+                if response.status == 200:
+                    json_response = await response.json()
+
+                    return RunResult(
+                        status=json_response["status"],
+                        exception=json_response["exception"],
+                        stdout=json_response["stdout"],
+                        stderr=json_response["stderr"],
+                        execution_time=json_response["executionTime"],
+                        stdin=json_response["stdin"],
+                    )
+
+                logger.warning(
+                    f"Code runner answered {response.status} for {language}, reason {response.reason}"
+                )
+                if response.status == 429 or response.status >= 500:
+                    retry_after = response.headers.get("Retry-After", "")
+                    raise TransientError(
+                        f"Code runner answered {response.status}",
+                        retry_after=float(retry_after) if retry_after.isdigit() else None,
+                    )
+                raise Exception(f"Failed to run code, status {response.status}")
+        finally:
+            _run_seconds.labels(language).observe(time.perf_counter() - started)
+            _run_total.labels(status).inc()
+
+    def _session(self) -> "aiohttp.ClientSession":
+        session = CodeRunService._shared_session
+        if session is None or session.closed:
+            # Imported on first use to keep it out of the startup path
+            import aiohttp
+
+            session = CodeRunService._shared_session = aiohttp.ClientSession()
+        return session
+
+    async def warm_up(self) -> None:
+        """
+        Open the shared session and a connection to the runner
+        """
+        import aiohttp
+
+        async with self._session().head(
+            self.base_url, timeout=aiohttp.ClientTimeout(total=5)
+        ) as response:
+            logger.info(f"Code runner {self.base_url} answered {response.status}")
+
+    @classmethod
+    async def close(cls) -> None:
+        """
+        Close the shared session
+        """
+        if cls._shared_session is not None:
+            await cls._shared_session.close()
+            cls._shared_session = None
 
     def _parse_language(self, language: str) -> str:
         """
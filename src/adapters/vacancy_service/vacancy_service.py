@@ -11,13 +11,31 @@ from src.domain.task.task import TaskType, Task
 from uuid import UUID
 from src.domain.room.room import Room
 from loguru import logger
-import aiohttp
+from src.core.resilience import Dependency, TransientError
+from src.core.setting import settings
+from src.core.tracing import traced
 from datetime import timedelta
 from typing import Any
 
 import asyncio
 
 
+vacancy_service = Dependency(
+    "vacancy_service",
+    timeout=settings.vacancy_service_timeout,
+    retries=settings.vacancy_service_retries,
+)
+
+
+def _raise_for_status(response: Any, message: str) -> None:
+    """
+    Raise TransientError for answers worth retrying, Exception for the rest
+    """
+    if response.status == 429 or response.status >= 500:
+        raise TransientError(f"{message}, status {response.status}")
+    raise Exception(message)
+
+
 class VacancyService(VacancyServiceBase):
     """
     Vacancy service implementation
@@ -29,6 +47,7 @@ class VacancyService(VacancyServiceBase):
         """
         self.base_url = base_url.rstrip("/")
 
+    @traced("VacancyService.get_vacancy")
     async def get_vacancy(self, vacancy_id: UUID) -> VacancyInfo:
         """
         Gets the vacancy with the given id
@@ -37,8 +56,11 @@ class VacancyService(VacancyServiceBase):
         logger.info(f"Getting vacancy {vacancy_id}")
         url = f"{self.base_url}/vacancies/{vacancy_id}"
 
+        import aiohttp
+
         async with aiohttp.ClientSession() as session:
-            try:
+
+            async def request() -> VacancyInfo:
                 async with session.get(url) as response:
                     if response.status == 200:
                         json_response = await response.json()
@@ -57,12 +79,15 @@ class VacancyService(VacancyServiceBase):
                         logger.error(
                             f"Failed to get vacancy {vacancy_id}, status {response.status}, reason {response.reason}"
                         )
-                        raise Exception("Failed to get vacancy")
+                        _raise_for_status(response, "Failed to get vacancy")
 
+            try:
+                return await vacancy_service.call(request, retry_on=(aiohttp.ClientError,))
             except Exception as e:
-                logger.error(f"Failed to get vacancy {vacancy_id}, error {e}")
+                logger.error(f"Failed to get vacancy {vacancy_id}, error {e!r}")
                 raise e
 
+    @traced("VacancyService.add_interview_results")
     async def add_interview_results(self, room: Room) -> None:
         """
         Adds the interview results to the vacancy with the given id
@@ -82,8 +107,11 @@ class VacancyService(VacancyServiceBase):
             "metrics": room.metrics,
         }
 
+        import aiohttp
+
         async with aiohttp.ClientSession() as session:
-            try:
+
+            async def request() -> None:
                 async with session.post(url, json=data) as response:
                     if response.status == 200:
                         logger.info(
@@ -93,8 +121,11 @@ class VacancyService(VacancyServiceBase):
                         logger.error(
                             f"Failed to add interview results to vacancy {room.vacancy_id}, status {response.status}, reason {response.reason}"
                         )
-                        raise Exception("Failed to add interview results")
+                        _raise_for_status(response, "Failed to add interview results")
 
+            try:
+                # Not idempotent: a retry after a lost answer would store the results twice
+                await vacancy_service.call(request, idempotent=False)
             except Exception as e:
                 logger.error(
                     f"Failed to add interview results to vacancy {room.vacancy_id}, error {e}"
@@ -0,0 +1,6 @@
+from contextvars import ContextVar
+from uuid import UUID
+
+# Room the current request or background job works on. Set by the interview
+# service so adapters can route and label calls without extra arguments.
+current_room_id: ContextVar[UUID | None] = ContextVar("current_room_id", default=None)
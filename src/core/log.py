@@ -0,0 +1,87 @@
+"""
+Logging setup.
+
+Records go through an enqueued loguru sink, so writing to stderr happens in a
+background thread rather than on the request or streaming path. Every record
+gets the current room id in `extra`, messages longer than LOG_MAX_MESSAGE_CHARS
+are truncated, and records bound with `event` and `sample_every` (see
+`sampled`) pass only once per `sample_every` occurrences.
+
+Discipline for hot paths: log sizes and ids at INFO, never whole payloads.
+Payloads go to DEBUG through `logger.opt(lazy=True)`, so they are not even
+formatted unless DEBUG is enabled:
+
+    logger.opt(lazy=True).debug("Solution: {}", lambda: truncate(solution.content))
+"""
+
+import sys
+from collections import defaultdict
+from typing import Any
+
+from loguru import logger
+
+from src.core.context import current_room_id
+from src.core.setting import settings
+
+_TEXT_FORMAT = (
+    "<green>{time:YYYY-MM-DD HH:mm:ss.SSS}</green> | <level>{level: <8}</level> | "
+    "<cyan>{name}:{function}:{line}</cyan> | {extra[room_id]} - <level>{message}</level>"
+)
+
+_sample_counts: defaultdict[str, int] = defaultdict(int)
+
+
+def truncate(text: Any, limit: int | None = None) -> str:
+    """
+    Shorten a payload for logging, keeping its length visible
+    """
+    text = str(text)
+    limit = settings.log_max_message_chars if limit is None else limit
+    if len(text) <= limit:
+        return text
+    return f"{text[:limit]}... [{len(text)} chars]"
+
+
+def sampled(event: str, every: int) -> Any:
+    """
+    Logger whose records of the event pass once per `every` occurrences
+    """
+    return logger.bind(event=event, sample_every=every)
+
+
+def _patch(record: Any) -> None:
+    room_id = current_room_id.get()
+    record["extra"].setdefault("room_id", str(room_id) if room_id is not None else "-")
+
+    message = record["message"]
+    if len(message) > settings.log_max_message_chars:
+        record["message"] = truncate(message)
+
+
+def _filter(record: Any) -> bool:
+    every = record["extra"].get("sample_every")
+    if not every or every <= 1:
+        return True
+
+    event = record["extra"].get("event", record["name"])
+    count = _sample_counts[event]
+    _sample_counts[event] = count + 1
+    return count % every == 0
+
+
+def setup_logging() -> None:
+    """
+    Replace the default synchronous stderr sink with the configured one
+    """
+    logger.remove()
+    logger.configure(patcher=_patch)
+    logger.add(
+        sys.stderr,
+        level=settings.log_level.upper(),
+        format=_TEXT_FORMAT,
+        serialize=settings.log_json,
+        enqueue=settings.log_enqueue,
+        filter=_filter,
+        backtrace=False,
+        diagnose=False,
+    )
@@ -0,0 +1,343 @@
+from bisect import bisect_left
+from typing import Callable, Sequence
+
+
+DEFAULT_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+
+class _HistogramChild:
+    """
+    Histogram values for a single label set
+    """
+
+    __slots__ = ("_buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...]):
+        self._buckets = buckets
+        # Last slot is the +Inf bucket
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        """
+        Record a single observation
+        """
+        self.counts[bisect_left(self._buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class Histogram:
+    """
+    Bucketed histogram with optional labels
+    """
+
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        self._children: dict[tuple[str, ...], _HistogramChild] = {}
+        if not self.label_names:
+            self.labels()
+
+    def labels(self, *values: str) -> _HistogramChild:
+        """
+        Get the child histogram for the given label values
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"Histogram {self.name} expects labels {self.label_names}, got {values}"
+                )
+            child = self._children[values] = _HistogramChild(self.buckets)
+        return child
+
+    def observe(self, value: float) -> None:
+        """
+        Record an observation for a histogram without labels
+        """
+        self.labels().observe(value)
+
+    def children(self) -> dict[tuple[str, ...], _HistogramChild]:
+        """
+        Get all label sets recorded so far
+        """
+        return self._children
+
+
+class _CounterChild:
+    """
+    Counter value for a single label set
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase the counter
+        """
+        self.value += amount
+
+
+class Counter:
+    """
+    Monotonic counter with optional labels
+    """
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._children: dict[tuple[str, ...], _CounterChild] = {}
+        if not self.label_names:
+            self.labels()
+
+    def labels(self, *values: str) -> _CounterChild:
+        """
+        Get the child counter for the given label values
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"Counter {self.name} expects labels {self.label_names}, got {values}"
+                )
+            child = self._children[values] = _CounterChild()
+        return child
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase a counter without labels
+        """
+        self.labels().inc(amount)
+
+    def children(self) -> dict[tuple[str, ...], _CounterChild]:
+        """
+        Get all label sets recorded so far
+        """
+        return self._children
+
+
+class _GaugeChild:
+    """
+    Gauge value for a single label set
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value: float) -> None:
+        """
+        Set the gauge
+        """
+        self.value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase the gauge
+        """
+        self.value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        """
+        Decrease the gauge
+        """
+        self.value -= amount
+
+
+class Gauge:
+    """
+    Value that goes up and down, with optional labels.
+
+    A gauge without labels can instead be backed by a function that is only
+    called when metrics are collected, so tracking costs nothing per event.
+    """
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._children: dict[tuple[str, ...], _GaugeChild] = {}
+        self._function: Callable[[], float] | None = None
+        if not self.label_names:
+            self.labels()
+
+    def labels(self, *values: str) -> _GaugeChild:
+        """
+        Get the child gauge for the given label values
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.label_names):
+                raise ValueError(
+                    f"Gauge {self.name} expects labels {self.label_names}, got {values}"
+                )
+            child = self._children[values] = _GaugeChild()
+        return child
+
+    def set(self, value: float) -> None:
+        """
+        Set a gauge without labels
+        """
+        self.labels().set(value)
+
+    def inc(self, amount: float = 1.0) -> None:
+        """
+        Increase a gauge without labels
+        """
+        self.labels().inc(amount)
+
+    def dec(self, amount: float = 1.0) -> None:
+        """
+        Decrease a gauge without labels
+        """
+        self.labels().dec(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """
+        Compute the value of a gauge without labels on collection
+        """
+        self._function = function
+
+    def children(self) -> dict[tuple[str, ...], _GaugeChild]:
+        """
+        Get all label sets recorded so far
+        """
+        if self._function is not None:
+            self.labels().set(self._function())
+        return self._children
+
+
+Metric = Histogram | Counter | Gauge
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_pairs(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class MetricsRegistry:
+    """
+    Process-wide registry of metrics
+    """
+
+    def __init__(self):
+        self._metrics: dict[str, Metric] = {}
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        """
+        Get or create a histogram
+        """
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Histogram(name, description, labels, buckets)
+        if not isinstance(metric, Histogram):
+            raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+        return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        """
+        Get or create a counter
+        """
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Counter(name, description, labels)
+        if not isinstance(metric, Counter):
+            raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+        return metric
+
+    def gauge(self, name: str, description: str, labels: Sequence[str] = ()) -> Gauge:
+        """
+        Get or create a gauge
+        """
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Gauge(name, description, labels)
+        if not isinstance(metric, Gauge):
+            raise ValueError(f"Metric {name} is already registered as {type(metric).__name__}")
+        return metric
+
+    def metrics(self) -> list[Metric]:
+        """
+        Get all registered metrics
+        """
+        return list(self._metrics.values())
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format
+        """
+        lines: list[str] = []
+
+        for metric in self._metrics.values():
+            kind = type(metric).__name__.lower()
+            lines.append(f"# HELP {metric.name} {metric.description}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+
+            if isinstance(metric, Histogram):
+                for values, child in list(metric.children().items()):
+                    cumulative = 0
+                    for bound, count in zip((*metric.buckets, float("inf")), child.counts):
+                        cumulative += count
+                        labels = _label_pairs(
+                            metric.label_names, values, f'le="{_format_value(bound)}"'
+                        )
+                        lines.append(f"{metric.name}_bucket{labels} {cumulative}")
+                    labels = _label_pairs(metric.label_names, values)
+                    lines.append(f"{metric.name}_sum{labels} {_format_value(child.sum)}")
+                    lines.append(f"{metric.name}_count{labels} {child.count}")
+            else:
+                for values, child in list(metric.children().items()):
+                    labels = _label_pairs(metric.label_names, values)
+                    lines.append(f"{metric.name}{labels} {_format_value(child.value)}")
+
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
@@ -0,0 +1,314 @@
+"""
+Resilience of outbound calls.
+
+Every external dependency gets a `Dependency` policy:
+
+- each attempt runs under the dependency's deadline;
+- idempotent calls are retried on transient errors (timeouts, connection
+  errors, 429 and 5xx answers) with full-jitter exponential backoff, waiting
+  at least as long as a Retry-After asks;
+- `hedged` sends a second identical request when the first is slower than
+  `hedge_after` and takes whichever succeeds first; the hedge spends one of
+  the retries, so a call never sends more than `retries + 1` requests;
+- a circuit breaker opens after `failure_threshold` consecutive failures,
+  rejects calls for `recovery_time`, then lets one probe through (half-open)
+  and closes again once the probe succeeds.
+
+    result = await code_runner.hedged(send_request, retry_on=(aiohttp.ClientError,))
+
+Outcomes, retries, hedges and breaker states are exported as metrics.
+"""
+
+import asyncio
+import random
+import time
+from collections.abc import Awaitable, Callable
+from typing import TypeVar
+
+from loguru import logger
+
+from src.core.metrics import registry
+from src.core.setting import settings
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+_calls_total = registry.counter(
+    "outbound_calls_total",
+    "Attempts of outbound calls by outcome: success, error, transient, timeout or rejected",
+    labels=("dependency", "outcome"),
+)
+_retries_total = registry.counter(
+    "outbound_retries_total",
+    "Retries of outbound calls after a transient failure",
+    labels=("dependency",),
+)
+_hedges_total = registry.counter(
+    "outbound_hedges_total",
+    "Hedged outbound calls by the request that won: primary, hedge or none",
+    labels=("dependency", "winner"),
+)
+_breaker_state = registry.gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state: 0 closed, 1 half-open, 2 open",
+    labels=("dependency",),
+)
+_breaker_transitions_total = registry.counter(
+    "circuit_breaker_transitions_total",
+    "Circuit breaker state changes by the state entered",
+    labels=("dependency", "state"),
+)
+
+
+class TransientError(Exception):
+    """
+    Failure worth retrying, e.g. a 429 or 5xx answer
+    """
+
+    def __init__(self, message: str, retry_after: float | None = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AttemptBudget:
+    """
+    Requests a call may still send, shared by its retries and its hedge
+    """
+
+    def __init__(self, attempts: int):
+        self.remaining = attempts
+
+    def take(self) -> bool:
+        """
+        Take one request, False once none is left
+        """
+        if self.remaining <= 0:
+            return False
+        self.remaining -= 1
+        return True
+
+
+class CircuitOpenError(Exception):
+    """
+    Call rejected because the dependency's circuit breaker is open
+    """
+
+
+def publish_breaker_state(dependency: str, state: str) -> None:
+    """
+    Export the state of a breaker, also used by breakers kept elsewhere
+    """
+    _breaker_state.labels(dependency).set(_STATE_VALUES[state])
+    _breaker_transitions_total.labels(dependency, state).inc()
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker with a single half-open probe
+    """
+
+    def __init__(self, name: str, failure_threshold: int, recovery_time: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.recovery_time = recovery_time
+
+        self.state = CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        _breaker_state.labels(name).set(_STATE_VALUES[CLOSED])
+
+    def allow(self) -> bool:
+        """
+        Whether a call may go out now; in half-open state only the probe may
+        """
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN:
+            if time.monotonic() - self._opened_at < self.recovery_time:
+                return False
+            self._transition(HALF_OPEN)
+        if self._probing:
+            return False
+        self._probing = True
+        return True
+
+    def release(self) -> None:
+        """
+        Give back the half-open probe of a call that ended without a verdict
+        """
+        self._probing = False
+
+    def record_success(self) -> None:
+        """
+        The dependency answered, whatever the answer was
+        """
+        self.consecutive_failures = 0
+        self._probing = False
+        if self.state != CLOSED:
+            logger.info(f"Circuit breaker {self.name} closed")
+            self._transition(CLOSED)
+
+    def record_failure(self) -> None:
+        """
+        The dependency failed or did not answer in time
+        """
+        self.consecutive_failures += 1
+        self._probing = False
+        if self.state == HALF_OPEN or (
+            self.state == CLOSED and self.consecutive_failures >= self.failure_threshold
+        ):
+            logger.warning(
+                f"Circuit breaker {self.name} opened after "
+                f"{self.consecutive_failures} consecutive failures"
+            )
+            self._opened_at = time.monotonic()
+            self._transition(OPEN)
+
+    def _transition(self, state: str) -> None:
+        self.state = state
+        publish_breaker_state(self.name, state)
+
+
+class Dependency:
+    """
+    Deadline, retry, hedging and circuit breaker policy of one dependency
+    """
+
+    def __init__(
+        self,
+        name: str,
+        timeout: float,
+        retries: int = 0,
+        hedge_after: float | None = None,
+        backoff_base: float | None = None,
+        backoff_max: float | None = None,
+        failure_threshold: int | None = None,
+        recovery_time: float | None = None,
+    ):
+        self.name = name
+        self.timeout = timeout
+        self.retries = retries
+        self.hedge_after = hedge_after or None
+        self.backoff_base = settings.retry_backoff_base if backoff_base is None else backoff_base
+        self.backoff_max = settings.retry_backoff_max if backoff_max is None else backoff_max
+        self.breaker = CircuitBreaker(
+            name,
+            failure_threshold=failure_threshold or settings.breaker_failure_threshold,
+            recovery_time=recovery_time or settings.breaker_recovery_time,
+        )
+
+    def backoff(self, attempt: int, retry_after: float | None = None) -> float:
+        """
+        Full-jitter delay before the given retry, at least `retry_after`
+        """
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2**attempt))
+        return max(delay, retry_after or 0.0)
+
+    async def call(
+        self,
+        func: Callable[[], Awaitable[T]],
+        idempotent: bool = True,
+        retry_on: tuple[type[BaseException], ...] = (),
+        budget: AttemptBudget | None = None,
+    ) -> T:
+        """
+        Await `func()` under the deadline and breaker, retrying idempotent calls.
+        Retries are taken from `budget` when given, its first request already taken
+        """
+        if budget is None:
+            budget = AttemptBudget(self.retries + 1 if idempotent else 1)
+            budget.take()
+
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                _calls_total.labels(self.name, "rejected").inc()
+                raise CircuitOpenError(f"Circuit breaker of {self.name} is open")
+            probe = self.breaker.state == HALF_OPEN
+
+            retry_after = None
+            try:
+                async with asyncio.timeout(self.timeout):
+                    result = await func()
+            except TimeoutError as e:
+                outcome, error = "timeout", e
+            except TransientError as e:
+                outcome, error, retry_after = "transient", e, e.retry_after
+            except retry_on as e:
+                outcome, error = "transient", e
+            except asyncio.CancelledError:
+                # Lost a hedge race or the caller gave up, says nothing about the dependency
+                if probe:
+                    self.breaker.release()
+                raise
+            except Exception:
+                # An answer, just not a good one: the dependency itself is up
+                _calls_total.labels(self.name, "error").inc()
+                self.breaker.record_success()
+                raise
+            else:
+                _calls_total.labels(self.name, "success").inc()
+                self.breaker.record_success()
+                return result
+
+            _calls_total.labels(self.name, outcome).inc()
+            self.breaker.record_failure()
+            if not budget.take():
+                if outcome == "timeout":
+                    raise TimeoutError(f"{self.name} did not answer within {self.timeout}s")
+                raise error
+
+            delay = self.backoff(attempt, retry_after)
+            attempt += 1
+            logger.warning(
+                f"{self.name} call failed ({outcome}: {error!r}), "
+                f"retry {attempt}/{self.retries} in {delay:.2f}s"
+            )
+            _retries_total.labels(self.name).inc()
+            await asyncio.sleep(delay)
+
+    async def hedged(
+        self,
+        func: Callable[[], Awaitable[T]],
+        retry_on: tuple[type[BaseException], ...] = (),
+    ) -> T:
+        """
+        Idempotent `call` that is sent once more if the first is slower than
+        `hedge_after`; the first success wins and the other is cancelled.
+        The hedge and the retries of both requests share `retries + 1` requests
+        """
+        budget = AttemptBudget(self.retries + 1)
+        budget.take()
+        primary = asyncio.ensure_future(self.call(func, retry_on=retry_on, budget=budget))
+        if self.hedge_after is None:
+            return await primary
+
+        pending: set[asyncio.Future] = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=self.hedge_after)
+            if done or not budget.take():
+                # Answered in time, or retrying already spent the requests a hedge would use
+                return await primary
+
+            hedge = asyncio.ensure_future(self.call(func, retry_on=retry_on, budget=budget))
+            pending.add(hedge)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        winner = "primary" if task is primary else "hedge"
+                        _hedges_total.labels(self.name, winner).inc()
+                        return task.result()
+                    error = task.exception()
+            _hedges_total.labels(self.name, "none").inc()
+            raise error  # type: ignore[misc]
+        finally:
+            for task in pending:
+                task.cancel()
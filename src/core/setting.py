@@ -28,12 +28,72 @@ class Settings(BaseSettings):
         alias="PROJECT_DESCRIPTION",
         validation_alias="PROJECT_DESCRIPTION",
     )
+    log_level: str = Field(
+        default="INFO",
+        description="Minimum level of logged records",
+        alias="LOG_LEVEL",
+        validation_alias="LOG_LEVEL",
+    )
+    log_json: bool = Field(
+        default=False,
+        description="Write log records as JSON lines",
+        alias="LOG_JSON",
+        validation_alias="LOG_JSON",
+    )
+    log_enqueue: bool = Field(
+        default=True,
+        description="Write log records from a background thread instead of the caller",
+        alias="LOG_ENQUEUE",
+        validation_alias="LOG_ENQUEUE",
+    )
+    log_max_message_chars: int = Field(
+        default=2000,
+        description="Log messages longer than this are truncated",
+        alias="LOG_MAX_MESSAGE_CHARS",
+        validation_alias="LOG_MAX_MESSAGE_CHARS",
+    )
+    tracing_exporter: str = Field(
+        default="none",
+        description="Span exporter: none, stdout or file",
+        alias="TRACING_EXPORTER",
+        validation_alias="TRACING_EXPORTER",
+    )
+    tracing_file: str = Field(
+        default="traces.jsonl",
+        description="File the file span exporter appends JSON lines to",
+        alias="TRACING_FILE",
+        validation_alias="TRACING_FILE",
+    )
+    tracing_batch_size: int = Field(
+        default=512,
+        description="Spans exported together",
+        alias="TRACING_BATCH_SIZE",
+        validation_alias="TRACING_BATCH_SIZE",
+    )
+    tracing_queue_size: int = Field(
+        default=8192,
+        description="Finished spans waiting for export before new ones are dropped",
+        alias="TRACING_QUEUE_SIZE",
+        validation_alias="TRACING_QUEUE_SIZE",
+    )
+    tracing_flush_interval: float = Field(
+        default=5.0,
+        description="Seconds between exports of incomplete batches",
+        alias="TRACING_FLUSH_INTERVAL",
+        validation_alias="TRACING_FLUSH_INTERVAL",
+    )
     public_key: str = Field(
         default="public_key",
         description="Public key",
         alias="PUBLIC_KEY",
         validation_alias="PUBLIC_KEY",
     )
+    jwt_cache_size: int = Field(
+        default=4096,
+        description="Verified room tokens remembered to skip signature checks, 0 disables",
+        alias="JWT_CACHE_SIZE",
+        validation_alias="JWT_CACHE_SIZE",
+    )
 
     llm_max_tokens: int = Field(
         default=25_000,
@@ -49,6 +109,35 @@ class Settings(BaseSettings):
         validation_alias="LLM_MODEL_NAME",
     )
 
+    llm_max_concurrency: int = Field(
+        default=16,
+        description="Maximum number of concurrent LLM calls",
+        alias="LLM_MAX_CONCURRENCY",
+        validation_alias="LLM_MAX_CONCURRENCY",
+    )
+
+    llm_priority_aging_seconds: float = Field(
+        default=30.0,
+        description="Seconds after which a waiting LLM call is served before newer calls "
+        "of higher priority, so background work is not starved; 0 disables aging",
+        alias="LLM_PRIORITY_AGING_SECONDS",
+        validation_alias="LLM_PRIORITY_AGING_SECONDS",
+    )
+
+    llm_structured_output: bool = Field(
+        default=False,
+        description="Request JSON-schema-constrained output for metrics and test suites",
+        alias="LLM_STRUCTURED_OUTPUT",
+        validation_alias="LLM_STRUCTURED_OUTPUT",
+    )
+
+    llm_json_max_attempts: int = Field(
+        default=2,
+        description="Generations per JSON call before giving up on unparsable output",
+        alias="LLM_JSON_MAX_ATTEMPTS",
+        validation_alias="LLM_JSON_MAX_ATTEMPTS",
+    )
+
     openai_base_url: str = Field(
         default="https://llm.t1v.scibox.tech/v1",
         description="OpenAI base URL",
@@ -56,6 +145,69 @@ class Settings(BaseSettings):
         validation_alias="OPENAI_BASE_URL",
     )
 
+    openai_base_urls: str = Field(
+        default="",
+        description="Comma-separated OpenAI-compatible base URLs of LLM replicas, "
+        "falls back to OPENAI_BASE_URL when empty",
+        alias="OPENAI_BASE_URLS",
+        validation_alias="OPENAI_BASE_URLS",
+    )
+
+    llm_health_check_interval: float = Field(
+        default=15.0,
+        description="Seconds between active health checks of LLM endpoints",
+        alias="LLM_HEALTH_CHECK_INTERVAL",
+        validation_alias="LLM_HEALTH_CHECK_INTERVAL",
+    )
+
+    llm_endpoint_failure_threshold: int = Field(
+        default=3,
+        description="Consecutive failures after which an LLM endpoint is taken out of rotation",
+        alias="LLM_ENDPOINT_FAILURE_THRESHOLD",
+        validation_alias="LLM_ENDPOINT_FAILURE_THRESHOLD",
+    )
+
+    llm_endpoint_cooldown: float = Field(
+        default=30.0,
+        description="Seconds an unhealthy LLM endpoint stays out of rotation",
+        alias="LLM_ENDPOINT_COOLDOWN",
+        validation_alias="LLM_ENDPOINT_COOLDOWN",
+    )
+
+    llm_request_timeout: float = Field(
+        default=60.0,
+        description="Seconds an LLM request may wait to connect or for the next bytes of a response",
+        alias="LLM_REQUEST_TIMEOUT",
+        validation_alias="LLM_REQUEST_TIMEOUT",
+    )
+    llm_completion_timeout: float = Field(
+        default=600.0,
+        description="Seconds a non-streaming LLM completion, e.g. a metrics report, may take as a whole",
+        alias="LLM_COMPLETION_TIMEOUT",
+        validation_alias="LLM_COMPLETION_TIMEOUT",
+    )
+    llm_request_retries: int = Field(
+        default=2,
+        description="Retries of an LLM request that failed before its first token, "
+        "failovers to other endpoints included",
+        alias="LLM_REQUEST_RETRIES",
+        validation_alias="LLM_REQUEST_RETRIES",
+    )
+
+    llm_prime_on_startup: bool = Field(
+        default=False,
+        description="Send a one-token completion with the shared system prompts during warm-up",
+        alias="LLM_PRIME_ON_STARTUP",
+        validation_alias="LLM_PRIME_ON_STARTUP",
+    )
+
+    warmup_timeout: float = Field(
+        default=30.0,
+        description="Seconds the startup warm-up may take before the service reports ready anyway",
+        alias="WARMUP_TIMEOUT",
+        validation_alias="WARMUP_TIMEOUT",
+    )
+
     openai_api_key: str = Field(
         default="",
         description="OpenAI API key",
@@ -68,12 +220,147 @@ class Settings(BaseSettings):
         alias="VACANCY_SERVICE_URL",
         validation_alias="VACANCY_SERVICE_URL",
     )
+    vacancy_service_timeout: float = Field(
+        default=10.0,
+        description="Seconds a vacancy service request may take",
+        alias="VACANCY_SERVICE_TIMEOUT",
+        validation_alias="VACANCY_SERVICE_TIMEOUT",
+    )
+    vacancy_service_retries: int = Field(
+        default=2,
+        description="Retries of failed vacancy reads, results are never resent",
+        alias="VACANCY_SERVICE_RETRIES",
+        validation_alias="VACANCY_SERVICE_RETRIES",
+    )
     tests_per_task: int = Field(
         default=10,
         description="Tests per task",
         alias="TESTS_PER_TASK",
         validation_alias="TESTS_PER_TASK",
     )
+    test_checker: str = Field(
+        default="lines",
+        description="Default comparison of stdout with expected output: exact, lines, tokens, "
+        "numeric[:eps] or unordered_lines",
+        alias="TEST_CHECKER",
+        validation_alias="TEST_CHECKER",
+    )
+    sse_coalesce_ms: float = Field(
+        default=20.0,
+        description="Time window in milliseconds for merging small stream chunks into one event",
+        alias="SSE_COALESCE_MS",
+        validation_alias="SSE_COALESCE_MS",
+    )
+    sse_coalesce_size: int = Field(
+        default=256,
+        description="Buffered characters after which merged stream chunks are flushed early",
+        alias="SSE_COALESCE_SIZE",
+        validation_alias="SSE_COALESCE_SIZE",
+    )
+    sse_heartbeat_seconds: float = Field(
+        default=15.0,
+        description="Idle seconds after which an SSE heartbeat comment is sent, 0 disables",
+        alias="SSE_HEARTBEAT_SECONDS",
+        validation_alias="SSE_HEARTBEAT_SECONDS",
+    )
+    ws_send_queue_size: int = Field(
+        default=64,
+        description="Outgoing WebSocket frames buffered before streams wait for the client",
+        alias="WS_SEND_QUEUE_SIZE",
+        validation_alias="WS_SEND_QUEUE_SIZE",
+    )
+    ws_max_inflight: int = Field(
+        default=4,
+        description="Client requests of a WebSocket session processed concurrently",
+        alias="WS_MAX_INFLIGHT",
+        validation_alias="WS_MAX_INFLIGHT",
+    )
+    observer_queue_size: int = Field(
+        default=1024,
+        description="Room events queued per observer before the oldest are dropped",
+        alias="OBSERVER_QUEUE_SIZE",
+        validation_alias="OBSERVER_QUEUE_SIZE",
+    )
+    room_memory_limit_mb: int = Field(
+        default=512,
+        description="Memory ceiling for resident rooms, least recently used rooms are spilled to disk above it",
+        alias="ROOM_MEMORY_LIMIT_MB",
+        validation_alias="ROOM_MEMORY_LIMIT_MB",
+    )
+    room_spill_dir: str = Field(
+        default="",
+        description="Directory for spilled rooms, private to the service user (mode 0700), a per-user temporary directory when empty",
+        alias="ROOM_SPILL_DIR",
+        validation_alias="ROOM_SPILL_DIR",
+    )
+    room_spill_on_shutdown: bool = Field(
+        default=False,
+        description="Spill every room on shutdown for the next process to resume, "
+        "always done with several server workers",
+        alias="ROOM_SPILL_ON_SHUTDOWN",
+        validation_alias="ROOM_SPILL_ON_SHUTDOWN",
+    )
+    stream_replay_chunks: int = Field(
+        default=4096,
+        description="Chunks of a generation kept for replay to reconnecting clients",
+        alias="STREAM_REPLAY_CHUNKS",
+        validation_alias="STREAM_REPLAY_CHUNKS",
+    )
+    stream_abandon_grace_seconds: float = Field(
+        default=10.0,
+        description="Seconds a generation keeps running after its last reader disconnected, "
+        "so a reconnecting client can resume it, before the LLM call is cancelled",
+        alias="STREAM_ABANDON_GRACE_SECONDS",
+        validation_alias="STREAM_ABANDON_GRACE_SECONDS",
+    )
+    server_host: str = Field(
+        default="0.0.0.0",
+        description="Address the production server listens on",
+        alias="SERVER_HOST",
+        validation_alias="SERVER_HOST",
+    )
+    server_port: int = Field(
+        default=8000,
+        description="Port the production server listens on",
+        alias="SERVER_PORT",
+        validation_alias="SERVER_PORT",
+    )
+    server_workers: int = Field(
+        default=1,
+        description="Worker processes of the production server",
+        alias="SERVER_WORKERS",
+        validation_alias="SERVER_WORKERS",
+    )
+    server_worker_index: int = Field(
+        default=0,
+        description="Index of this worker process, set by the server supervisor",
+        alias="SERVER_WORKER_INDEX",
+        validation_alias="SERVER_WORKER_INDEX",
+    )
+    server_max_requests: int = Field(
+        default=0,
+        description="Requests after which a worker is recycled, 0 disables recycling",
+        alias="SERVER_MAX_REQUESTS",
+        validation_alias="SERVER_MAX_REQUESTS",
+    )
+    server_max_requests_jitter: int = Field(
+        default=0,
+        description="Random extra requests per worker, so workers are not recycled together",
+        alias="SERVER_MAX_REQUESTS_JITTER",
+        validation_alias="SERVER_MAX_REQUESTS_JITTER",
+    )
+    server_graceful_timeout: float = Field(
+        default=30.0,
+        description="Seconds a stopping worker waits for in-flight requests and streams",
+        alias="SERVER_GRACEFUL_TIMEOUT",
+        validation_alias="SERVER_GRACEFUL_TIMEOUT",
+    )
+    server_runtime_dir: str = Field(
+        default="",
+        description="Directory for worker sockets, a temporary directory when empty",
+        alias="SERVER_RUNTIME_DIR",
+        validation_alias="SERVER_RUNTIME_DIR",
+    )
     code_run_service_url: str = Field(
         default="onecompiler-apis.p.rapidapi.com",
         description="Code run service URL",
@@ -86,6 +373,49 @@ class Settings(BaseSettings):
         alias="CODE_RUN_SERVICE_API_KEY",
         validation_alias="CODE_RUN_SERVICE_API_KEY",
     )
+    code_run_timeout: float = Field(
+        default=15.0,
+        description="Seconds a single code run request may take",
+        alias="CODE_RUN_TIMEOUT",
+        validation_alias="CODE_RUN_TIMEOUT",
+    )
+    code_run_retries: int = Field(
+        default=2,
+        description="Retries of a code run after a timeout, connection error, 429 or 5xx",
+        alias="CODE_RUN_RETRIES",
+        validation_alias="CODE_RUN_RETRIES",
+    )
+    code_run_hedge_after: float = Field(
+        default=4.0,
+        description="Seconds after which a slow code run is sent a second time, 0 disables hedging. "
+        "The hedge spends one of CODE_RUN_RETRIES, a run sends at most CODE_RUN_RETRIES + 1 requests",
+        alias="CODE_RUN_HEDGE_AFTER",
+        validation_alias="CODE_RUN_HEDGE_AFTER",
+    )
+    retry_backoff_base: float = Field(
+        default=0.2,
+        description="Upper bound in seconds of the jittered delay before the first retry, doubling per retry",
+        alias="RETRY_BACKOFF_BASE",
+        validation_alias="RETRY_BACKOFF_BASE",
+    )
+    retry_backoff_max: float = Field(
+        default=5.0,
+        description="Upper bound in seconds of any retry delay",
+        alias="RETRY_BACKOFF_MAX",
+        validation_alias="RETRY_BACKOFF_MAX",
+    )
+    breaker_failure_threshold: int = Field(
+        default=5,
+        description="Consecutive failures that open a dependency's circuit breaker",
+        alias="BREAKER_FAILURE_THRESHOLD",
+        validation_alias="BREAKER_FAILURE_THRESHOLD",
+    )
+    breaker_recovery_time: float = Field(
+        default=30.0,
+        description="Seconds an open circuit breaker rejects calls before letting a probe through",
+        alias="BREAKER_RECOVERY_TIME",
+        validation_alias="BREAKER_RECOVERY_TIME",
+    )
 
 
 settings = Settings()
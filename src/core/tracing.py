@@ -0,0 +1,375 @@
+"""
+Lightweight tracing.
+
+Spans nest through a ContextVar and are handed to a batching processor,
+which exports them from a background task through a pluggable exporter
+(TRACING_EXPORTER: none, stdout or file). Spans of a room share a trace:
+a root span started while a room is current takes the room id as trace id,
+so a whole interview can be pulled out of the export by its room id.
+
+    with span("ai_chat.create_task", call_type="task") as s:
+        ...
+        s.add_event("first_token")
+
+    @traced("InterviewService.run_code")
+    async def run_code(...): ...
+"""
+
+import asyncio
+import functools
+import inspect
+import os
+import sys
+import time
+from collections import deque
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Callable, Protocol, TextIO
+
+import orjson
+from loguru import logger
+
+from src.core.context import current_room_id
+from src.core.metrics import registry
+from src.core.setting import settings
+
+_dropped_spans_total = registry.counter(
+    "tracing_spans_dropped_total",
+    "Finished spans dropped because the export queue was full",
+)
+
+
+@dataclass(slots=True)
+class Span:
+    """
+    Timed operation of a trace
+    """
+
+    name: str
+    trace_id: str
+    span_id: str
+    parent_id: str | None
+    start_ns: int
+    end_ns: int | None = None
+    status: str = "ok"
+    attributes: dict[str, Any] = field(default_factory=dict)
+    events: list[dict[str, Any]] = field(default_factory=list)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Attach an attribute to the span
+        """
+        self.attributes[key] = value
+
+    def set_status(self, status: str) -> None:
+        """
+        Mark the outcome of the span, e.g. "error"
+        """
+        self.status = status
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """
+        Record a point in time within the span
+        """
+        self.events.append({"name": name, "time_ns": time.time_ns(), **attributes})
+
+    def to_dict(self) -> dict[str, Any]:
+        """
+        Span as a JSON-serializable dict
+        """
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": (self.end_ns - self.start_ns) / 1e6 if self.end_ns else None,
+            "status": self.status,
+            "attributes": self.attributes,
+            "events": self.events,
+        }
+
+
+class SpanExporter(Protocol):
+    """
+    Destination of finished spans
+    """
+
+    def export(self, spans: list[Span]) -> None:
+        """
+        Export a batch of spans, called from a worker thread
+        """
+        ...
+
+    def shutdown(self) -> None:
+        """
+        Release resources of the exporter
+        """
+        ...
+
+
+class JsonLinesExporter:
+    """
+    Writes spans as JSON lines to a file, or to stdout when no path is given
+    """
+
+    def __init__(self, path: str | None = None):
+        self.path = path
+        self._file: TextIO | None = None
+
+    def export(self, spans: list[Span]) -> None:
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8") if self.path else sys.stdout
+        self._file.write(
+            "".join(orjson.dumps(s.to_dict(), default=str).decode() + "\n" for s in spans)
+        )
+        self._file.flush()
+
+    def shutdown(self) -> None:
+        if self._file is not None and self._file is not sys.stdout:
+            self._file.close()
+        self._file = None
+
+
+class BatchSpanProcessor:
+    """
+    Queues finished spans and exports them in batches off the event loop.
+
+    Spans are exported when a batch is full or every `flush_interval` seconds;
+    once `max_queue` spans are waiting, new ones are dropped.
+    """
+
+    def __init__(
+        self,
+        exporter: SpanExporter,
+        max_batch: int,
+        max_queue: int,
+        flush_interval: float,
+    ):
+        self.exporter = exporter
+        self.max_batch = max_batch
+        self.max_queue = max_queue
+        self.flush_interval = flush_interval
+
+        self._queue: deque[Span] = deque()
+        self._batch_ready = asyncio.Event()
+        self._task: asyncio.Task | None = None
+
+    def on_end(self, span: Span) -> None:
+        """
+        Queue a finished span
+        """
+        if len(self._queue) >= self.max_queue:
+            _dropped_spans_total.inc()
+            return
+        self._queue.append(span)
+        if len(self._queue) >= self.max_batch:
+            self._batch_ready.set()
+
+    def start(self) -> None:
+        """
+        Start the background export loop
+        """
+        if self._task is None:
+            self._task = asyncio.create_task(self._export_loop())
+
+    async def flush(self) -> None:
+        """
+        Export everything queued so far
+        """
+        while self._queue:
+            batch = [self._queue.popleft() for _ in range(min(self.max_batch, len(self._queue)))]
+            try:
+                await asyncio.to_thread(self.exporter.export, batch)
+            except Exception as e:
+                logger.warning(f"Exporting {len(batch)} spans failed: {e}")
+
+    async def shutdown(self) -> None:
+        """
+        Stop the export loop, export the remaining spans and close the exporter
+        """
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await self.flush()
+        self.exporter.shutdown()
+
+    async def _export_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._batch_ready.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._batch_ready.clear()
+            await self.flush()
+
+
+class _NoopSpan:
+    """
+    Stand-in span used while tracing is disabled
+    """
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        pass
+
+    def set_status(self, status: str) -> None:
+        pass
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+_current_span: ContextVar[Span | None] = ContextVar("current_span", default=None)
+
+
+class _SpanScope:
+    """
+    Context manager that starts a span and makes it current
+    """
+
+    __slots__ = ("_span", "_previous")
+
+    def __init__(self, name: str, attributes: dict[str, Any]):
+        parent = _current_span.get()
+        room_id = current_room_id.get()
+
+        if parent is not None:
+            trace_id = parent.trace_id
+        elif room_id is not None:
+            trace_id = room_id.hex
+        else:
+            trace_id = os.urandom(16).hex()
+        if room_id is not None:
+            attributes.setdefault("room_id", str(room_id))
+
+        self._span = Span(
+            name=name,
+            trace_id=trace_id,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            start_ns=time.time_ns(),
+            attributes=attributes,
+        )
+        self._previous = parent
+
+    def __enter__(self) -> Span:
+        _current_span.set(self._span)
+        return self._span
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        span = self._span
+        span.end_ns = time.time_ns()
+        if exc_type is not None:
+            span.set_status("cancelled" if exc_type is asyncio.CancelledError else "error")
+            span.set_attribute("error", repr(exc))
+        # Restored rather than reset: async generators may finish in another context
+        _current_span.set(self._previous)
+        if _processor is not None:
+            _processor.on_end(span)
+
+
+class _NoopScope:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopSpan:
+        return _NOOP_SPAN
+
+    def __exit__(self, exc_type: Any, exc: BaseException | None, tb: Any) -> None:
+        pass
+
+
+_NOOP_SCOPE = _NoopScope()
+
+_processor: BatchSpanProcessor | None = None
+
+
+def span(name: str, **attributes: Any) -> Any:
+    """
+    Context manager timing the block as a child of the current span
+    """
+    if _processor is None:
+        return _NOOP_SCOPE
+    return _SpanScope(name, attributes)
+
+
+def current_span() -> Span | _NoopSpan:
+    """
+    Innermost active span, a no-op span when there is none
+    """
+    return _current_span.get() or _NOOP_SPAN
+
+
+def traced(name: str) -> Callable[[Callable], Callable]:
+    """
+    Decorator wrapping every call of a coroutine or async generator function in a span
+    """
+
+    def decorator(func: Callable) -> Callable:
+        if inspect.isasyncgenfunction(func):
+
+            @functools.wraps(func)
+            async def agen_wrapper(*args: Any, **kwargs: Any) -> Any:
+                with span(name):
+                    async for item in func(*args, **kwargs):
+                        yield item
+
+            return agen_wrapper
+
+        @functools.wraps(func)
+        async def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with span(name):
+                return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def _create_exporter() -> SpanExporter | None:
+    exporter = settings.tracing_exporter.lower()
+    if exporter == "stdout":
+        return JsonLinesExporter()
+    if exporter == "file":
+        return JsonLinesExporter(settings.tracing_file)
+    if exporter not in ("", "none"):
+        logger.warning(f"Unknown tracing exporter {exporter}, tracing is disabled")
+    return None
+
+
+def setup_tracing(exporter: SpanExporter | None = None) -> None:
+    """
+    Enable tracing with the given or configured exporter and start exporting
+    """
+    global _processor
+
+    exporter = exporter or _create_exporter()
+    if exporter is None:
+        return
+    _processor = BatchSpanProcessor(
+        exporter,
+        max_batch=settings.tracing_batch_size,
+        max_queue=settings.tracing_queue_size,
+        flush_interval=settings.tracing_flush_interval,
+    )
+    _processor.start()
+    logger.info(f"Tracing enabled with {type(exporter).__name__}")
+
+
+async def shutdown_tracing() -> None:
+    """
+    Export the remaining spans and disable tracing
+    """
+    global _processor
+
+    if _processor is not None:
+        processor, _processor = _processor, None
+        await processor.shutdown()
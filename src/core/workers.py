@@ -0,0 +1,65 @@
+import tempfile
+from pathlib import Path
+from uuid import UUID, uuid4
+
+from src.core.setting import settings
+
+# Set when the process starts shutting down, long-lived streams end early
+_draining = False
+
+
+def begin_drain() -> None:
+    """
+    Mark the process as shutting down
+    """
+    global _draining
+    _draining = True
+
+
+def is_draining() -> bool:
+    """
+    Whether the process is shutting down
+    """
+    return _draining
+
+
+def room_owner(room_id: UUID, workers: int) -> int:
+    """
+    Index of the worker process that keeps the room in memory
+    """
+    return room_id.int % workers
+
+
+def owns_room(room_id: UUID) -> bool:
+    """
+    Whether this worker process keeps the room in memory
+    """
+    return (
+        settings.server_workers <= 1
+        or room_owner(room_id, settings.server_workers) == settings.server_worker_index
+    )
+
+
+def new_room_id() -> UUID:
+    """
+    Random room id owned by this worker
+    """
+    room_id = uuid4()
+    if settings.server_workers > 1:
+        while room_owner(room_id, settings.server_workers) != settings.server_worker_index:
+            room_id = uuid4()
+    return room_id
+
+
+def runtime_dir() -> Path:
+    """
+    Directory for worker sockets
+    """
+    return Path(settings.server_runtime_dir or Path(tempfile.gettempdir()) / "interview-service")
+
+
+def worker_socket_path(index: int) -> Path:
+    """
+    Unix socket on which a worker accepts requests forwarded by its siblings
+    """
+    return runtime_dir() / f"worker-{index}.sock"
@@ -0,0 +1,118 @@
+import asyncio
+import importlib
+import time
+from dataclasses import dataclass, field
+
+from loguru import logger
+
+from src.adapters.ai_chat.ai_utils.client_pool import llm_client_pool
+from src.adapters.ai_chat.ai_utils.prompt_builders import (
+    build_chat_system_prompt,
+    build_check_solution_system_prompt,
+    build_create_task_system_prompt,
+    build_response_system_prompt,
+)
+from src.adapters.ai_chat.ai_utils.prompt_utils import preload_prompts
+from src.adapters.code_run_service import CodeRunService
+from src.core.setting import settings
+
+
+@dataclass
+class Readiness:
+    """
+    Warm-up state reported by the readiness probe
+    """
+
+    ready: bool = False
+    # Seconds spent in each warm-up step
+    steps: dict[str, float] = field(default_factory=dict)
+
+
+readiness = Readiness()
+
+
+async def _step(name: str, coro) -> None:
+    started = time.perf_counter()
+    try:
+        await coro
+    except Exception as e:
+        logger.warning(f"Warm-up step {name} failed: {e}")
+    finally:
+        readiness.steps[name] = time.perf_counter() - started
+        logger.info(f"Warm-up step {name} took {readiness.steps[name]:.3f}s")
+
+
+# Imported lazily by the adapters, loaded here off the event loop
+LAZY_MODULES = ("openai", "aiohttp")
+
+
+async def _import_lazy_modules() -> None:
+    for name in LAZY_MODULES:
+        await asyncio.to_thread(importlib.import_module, name)
+
+
+async def _preload_prompts() -> None:
+    count = await asyncio.to_thread(preload_prompts)
+    logger.info(f"Preloaded {count} prompts")
+
+
+async def _open_llm_connections() -> None:
+    healthy = await llm_client_pool.warm_up()
+    logger.info(f"{healthy}/{len(llm_client_pool.endpoints)} LLM endpoints healthy")
+
+
+async def _open_runner_connection() -> None:
+    await CodeRunService(
+        settings.code_run_service_url, settings.code_run_service_api_key
+    ).warm_up()
+
+
+async def _prime_llm() -> None:
+    # The system prompts shared by every room, so their prefix is cached
+    for system_prompt in (
+        build_chat_system_prompt(),
+        build_response_system_prompt(),
+        build_create_task_system_prompt(),
+        build_check_solution_system_prompt(),
+    ):
+        await llm_client_pool.prime(
+            model=settings.llm_model,
+            messages=[
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": "."},
+            ],
+            max_tokens=1,
+        )
+
+
+async def warm_up() -> None:
+    """
+    Prepare the process for the first room, then mark it ready.
+    Failed steps are logged and do not block readiness.
+    """
+    started = time.perf_counter()
+
+    await asyncio.gather(
+        _step("imports", _import_lazy_modules()),
+        _step("prompts", _preload_prompts()),
+    )
+    await asyncio.gather(
+        _step("llm_connections", _open_llm_connections()),
+        _step("runner_connection", _open_runner_connection()),
+    )
+    if settings.llm_prime_on_startup:
+        await _step("llm_priming", _prime_llm())
+
+    readiness.ready = True
+    logger.info(f"Warm-up finished in {time.perf_counter() - started:.3f}s, ready")
+
+
+async def run_warm_up() -> None:
+    """
+    Warm up within the configured timeout, marking the process ready either way
+    """
+    try:
+        await asyncio.wait_for(warm_up(), settings.warmup_timeout)
+    except asyncio.TimeoutError:
+        logger.warning(f"Warm-up did not finish in {settings.warmup_timeout}s, ready anyway")
+        readiness.ready = True
@@ -0,0 +1,36 @@
+from dataclasses import dataclass
+from enum import Enum
+
+
+class GenerationKind(str, Enum):
+    """
+    Kinds of streamed LLM generations of a room
+    """
+
+    WELCOME = "welcome"
+    SOLUTION_RESPONSE = "solution_response"
+    RESPONSE = "response"
+    TASK = "task"
+
+    def __str__(self):
+        return self.value
+
+    def __repr__(self):
+        return self.value
+
+
+@dataclass(slots=True, frozen=True)
+class RoomEvent:
+    """
+    Event of a room broadcast to observers.
+
+    type is "message" for candidate messages, "start", "message_chunk",
+    "complete", "error" or "cancelled" for generations, "error" with kind
+    "test_suite" when no tests could be generated for a task and "lagged"
+    when an observer missed events.
+    """
+
+    type: str
+    kind: str | None = None
+    event_id: str | None = None
+    content: str = ""
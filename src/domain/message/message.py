@@ -18,9 +18,6 @@ class TypeEnum(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
 class RoleEnum(str, Enum):
     USER = "user"
@@ -32,11 +29,8 @@ class RoleEnum(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """
     Message class
@@ -18,9 +18,6 @@ class TechFitLevel(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
 class SeniorityGuess(str, Enum):
     """
@@ -37,9 +34,6 @@ class SeniorityGuess(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
 class Recommendation(str, Enum):
     """
@@ -57,11 +51,8 @@ class Recommendation(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
-@dataclass
+@dataclass(slots=True)
 class MetricsBlock1:
     """
     Metrics class
@@ -97,7 +88,7 @@ class MetricsBlock1:
         return f"Подозрение в копировании: {self.copy_paste_suspicion}"
 
 
-@dataclass
+@dataclass(slots=True)
 class MetricsBlock2:
     """
     Metrics class
@@ -147,7 +138,7 @@ class MetricsBlock2:
         return f"Комментарий к компетентности: {self.tech_fit_comment}"
 
 
-@dataclass
+@dataclass(slots=True)
 class MetricsBlock3:
     """
     Metrics class
@@ -190,7 +181,7 @@ class MetricsBlock3:
         return f"Рекомендация: {self.recommendation}"
 
 
-@dataclass
+@dataclass(slots=True)
 class CodeTestMetrics:
     """
     Metrics for code execution and test results during the interview.
@@ -11,14 +11,14 @@ from src.domain.test.test import CodeTestSuite
 from enum import Enum
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Interviewee:
     name: str
     surname: str
     resume_link: str
 
 
-class SolutionType(Enum):
+class SolutionType(str, Enum):
     CODE = "code"
     TEXT = "text"
 
@@ -28,11 +28,8 @@ class SolutionType(Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
 
-
-@dataclass
+@dataclass(slots=True)
 class Solution:
     content: str
     solution_type: SolutionType
@@ -47,7 +44,7 @@ class Solution:
         return f"{self.solution_type.value} [{self.language}]: {self.content}"
 
 
-@dataclass
+@dataclass(slots=True)
 class Room:
     id: UUID
     vacancy_id: UUID
@@ -64,3 +61,26 @@ class Room:
 
     metrics_block1: MetricsBlock1
     current_test_suite: CodeTestSuite | None
+
+    # Incremented on every change visible to clients, used for ETags
+    version: int = 0
+
+    def touch(self) -> None:
+        """
+        Mark the room as changed
+        """
+
+        self.version += 1
+
+
+@dataclass(slots=True, frozen=True)
+class RoomStats:
+    """
+    Rooms held by the service and their accounted memory
+    """
+
+    resident: int
+    spilled: int
+    pinned: int
+    resident_bytes: int
+    memory_limit: int
@@ -13,9 +13,6 @@ class TaskType(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
 class TaskLanguage(str, Enum):
     """
@@ -38,11 +35,8 @@ class TaskLanguage(str, Enum):
     def __repr__(self):
         return self.value
 
-    def __eq__(self, other):
-        return self.value == other
-
 
-@dataclass
+@dataclass(slots=True)
 class TaskMetadata:
     """
     Task metadata class
@@ -52,7 +46,7 @@ class TaskMetadata:
     language: TaskLanguage | None
 
 
-@dataclass
+@dataclass(slots=True)
 class Task(TaskMetadata):
     """
     Task class
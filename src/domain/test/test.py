@@ -1,7 +1,7 @@
 from dataclasses import dataclass
 from typing import Optional
 
-@dataclass
+@dataclass(slots=True)
 class CodeTestCase:
     """
     One test case for a coding task.
@@ -27,8 +27,11 @@ class CodeTestCase:
     # Visibility
     is_hidden: bool = False         # False = visible example, True = hidden evaluation test
 
+    # Output checker spec, e.g. "tokens" or "numeric:1e-6"; None = TEST_CHECKER
+    checker: Optional[str] = None
 
-@dataclass
+
+@dataclass(slots=True)
 class CodeTestSuite:
     """
     All tests for a single coding task.
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from datetime import timedelta
 
 
-@dataclass
+@dataclass(slots=True)
 class VacancyInfo:
     """
     Vacancy class
@@ -1,17 +1,59 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.responses import ORJSONResponse
+from src.core.log import setup_logging
 from src.core.setting import settings
+from src.core.tracing import setup_tracing, shutdown_tracing
 from src.presentation.fast_api.middlewares.jwt import JWTManager
+from src.presentation.fast_api.middlewares.tracing import TracingMiddleware
+from src.presentation.fast_api.middlewares.worker_router import (
+    WorkerRoutingMiddleware,
+    close_worker_sessions,
+)
+from src.presentation.fast_api.v1.admin import admin
 from src.presentation.fast_api.v1.interview import interview
 from src.dependencies.main import setup_dependencies
+from src.dependencies.services import create_interview_service
+from src.adapters.ai_chat.ai_utils.client_pool import llm_client_pool
+from src.adapters.code_run_service import CodeRunService
+from src.dependencies.warmup import run_warm_up
+from src.presentation.fast_api import metrics, probes
+from src.usecases.interview_service.service import InterviewService
 from loguru import logger
 import uvicorn
 
+
+setup_logging()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    setup_tracing()
+    llm_client_pool.start()
+    # Rooms a previous process of this worker left on disk get their stop timers back
+    create_interview_service().resume_spilled_rooms()
+    # Served while warming up, /ready answers 503 until it is done
+    warm_up_task = asyncio.create_task(run_warm_up())
+    yield
+    warm_up_task.cancel()
+    # A recycled or restarted worker picks its rooms up from the spill directory
+    if settings.server_workers > 1 or settings.room_spill_on_shutdown:
+        spilled = InterviewService._room_sessions.spill_all()
+        logger.info(f"Spilled {spilled} rooms on shutdown")
+    await close_worker_sessions()
+    await llm_client_pool.close()
+    await CodeRunService.close()
+    await shutdown_tracing()
+    await logger.complete()
+
+
 app = FastAPI(
     title=settings.project_name,
     description=settings.project_description,
     version=settings.project_version,
     default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 #
@@ -19,8 +61,16 @@ app = FastAPI(
 # async def jwt_middleware(request, call_next):
 #     return await JWTManager(settings.public_key)(request, call_next)
 
+if settings.tracing_exporter not in ("", "none"):
+    app.add_middleware(TracingMiddleware)
+# Added last, so requests of rooms owned by another worker skip the local stack
+if settings.server_workers > 1:
+    app.add_middleware(WorkerRoutingMiddleware)
 
 app.include_router(interview.router, prefix="/api/v1")
+app.include_router(admin.router, prefix="/api/v1")
+app.include_router(probes.router)
+app.include_router(metrics.router)
 setup_dependencies(app)
 
 if __name__ == "__main__":
@@ -0,0 +1,20 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.core.metrics import registry
+
+router = APIRouter()
+
+
+@router.get(
+    "/metrics",
+    description="Metrics of this process in the Prometheus text exposition format",
+    tags=["Probes"],
+    summary="Prometheus metrics",
+    response_class=PlainTextResponse,
+)
+async def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        registry.render(),
+        media_type="text/plain; version=0.0.4; charset=utf-8",
+    )
@@ -1,11 +1,29 @@
-from cryptography.hazmat.primitives import serialization
-from jose import jwt, JWTError
 from fastapi import HTTPException, Request, Response, status
 from fastapi.responses import ORJSONResponse
 from typing import Any
 from loguru import logger
+from collections import OrderedDict
+import base64
+import hashlib
+import re
 import time
 
+import orjson
+
+from src.core.setting import settings
+
+# Routes served without a token: every POST of the room API (creation and the
+# candidate's question, solution and run requests), API docs, probes and metrics
+PUBLIC_ROUTES = re.compile(
+    r"POST /api/v1/room.*"
+    r"|[A-Z]+ .*(docs|openapi\.json).*"
+    r"|GET /(ready|metrics)"
+)
+
+
+def _b64decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
 
 class JWTManager:
     """
@@ -21,6 +39,12 @@ class JWTManager:
         self.jwt_private_key = self.load_pubkey(jwt_public_key)
         self.algorithm = "ES256"
 
+        # sha256 of the token -> (payload, exp, nbf), only successfully verified tokens
+        self._verified: OrderedDict[
+            bytes, tuple[dict[str, Any], float | None, float | None]
+        ] = OrderedDict()
+        self._cache_size = settings.jwt_cache_size
+
     def load_pubkey(self, pubkey: str) -> Any:
         """
         Load public key
@@ -28,6 +52,8 @@ class JWTManager:
         :return: deserialized public key
         """
 
+        from cryptography.hazmat.primitives import serialization
+
         public_key = serialization.load_pem_public_key(
             pubkey.encode(),
         )
@@ -36,28 +62,111 @@ class JWTManager:
 
     def verify_token(self, token: str) -> dict[str, Any]:
         """
-        Verify token
+        Verify token, using the cache of already verified tokens
+        :param token: Token
+        :return: Token payload
+        """
+
+        digest = hashlib.sha256(token.encode()).digest()
+        cached = self._verified.get(digest)
+        if cached is not None:
+            self._verified.move_to_end(digest)
+            payload, exp, nbf = cached
+        else:
+            payload = self.verify_signature(token)
+            exp = self._time_claim(payload, "exp")
+            nbf = self._time_claim(payload, "nbf")
+            if self._cache_size > 0:
+                self._verified[digest] = (payload, exp, nbf)
+                if len(self._verified) > self._cache_size:
+                    self._verified.popitem(last=False)
+
+        now = int(time.time())
+        if exp is not None and exp < now:
+            self._verified.pop(digest, None)
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Token expired"
+            )
+        if nbf is not None and nbf > now:
+            # Stays cached, it becomes valid later
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Token not yet valid"
+            )
+        return payload
+
+    @staticmethod
+    def _time_claim(payload: dict[str, Any], name: str) -> float | None:
+        """
+        Read a NumericDate claim (exp, nbf) of the payload
+        :param payload: Token payload
+        :param name: Claim name
+        :return: Claim value, None if the token has none
+        """
+
+        if name not in payload:
+            return None
+        value = payload[name]
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail=f"Invalid token: {name} must be a number",
+            )
+        return value
+
+    def verify_signature(self, token: str) -> dict[str, Any]:
+        """
+        Verify the ES256 signature of the token and decode its payload
         :param token: Token
         :return: Token payload
         """
 
+        from cryptography.exceptions import InvalidSignature
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.hazmat.primitives.asymmetric.utils import encode_dss_signature
+
         try:
-            payload = jwt.decode(
-                token,
-                self.jwt_private_key,
-                algorithms=[self.algorithm],
+            header_segment, payload_segment, signature_segment = token.split(".")
+            header = orjson.loads(_b64decode(header_segment))
+            signature = _b64decode(signature_segment)
+        except Exception:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
-            return payload
-        except JWTError as e:
+
+        if header.get("alg") != self.algorithm or len(signature) != 64:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
             )
-        except Exception as e:
+
+        # JWS carries the raw r || s pair, cryptography expects DER
+        der_signature = encode_dss_signature(
+            int.from_bytes(signature[:32], "big"),
+            int.from_bytes(signature[32:], "big"),
+        )
+        try:
+            self.jwt_private_key.verify(
+                der_signature,
+                f"{header_segment}.{payload_segment}".encode(),
+                ec.ECDSA(hashes.SHA256()),
+            )
+            payload = orjson.loads(_b64decode(payload_segment))
+        except InvalidSignature:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+            )
+        except Exception:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token verification failed",
             )
 
+        if not isinstance(payload, dict):
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token"
+            )
+        return payload
+
     async def __call__(self, request: Request, call_next) -> Response:
         """
         Call the middleware
@@ -66,37 +175,22 @@ class JWTManager:
         :return: Response object
         """
 
-        logger.info("JWT Middleware")
-        logger.debug(f"Request: {request.url}")
-        logger.debug(f"Method: {request.method}")
-
-        if (
-            "/api/v1/room" in request.url.path
-            and request.method == "POST"
-            or "docs" in request.url.path
-            or "openapi.json" in request.url.path
-        ):
-            logger.debug("Room creation request")
+        if PUBLIC_ROUTES.fullmatch(f"{request.method} {request.url.path}"):
             return await call_next(request)
 
         token = request.cookies.get("room_token")
 
         if not token:
+            logger.opt(lazy=True).debug(
+                "No token for {} {}", lambda: request.method, lambda: request.url.path
+            )
             return ORJSONResponse(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 content={"detail": "No token provided"},
             )
 
         try:
-            payload = self.verify_token(token)
-            request.state.room = payload
-
-            if "exp" in payload and payload["exp"] < int(time.time()):
-                return ORJSONResponse(
-                    status_code=status.HTTP_401_UNAUTHORIZED,
-                    content={"detail": "Token expired"},
-                )
-
+            request.state.room = self.verify_token(token)
             return await call_next(request)
         except HTTPException as e:
             return ORJSONResponse(
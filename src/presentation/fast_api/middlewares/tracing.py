@@ -0,0 +1,43 @@
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.core.context import current_room_id
+from src.core.tracing import span
+from src.presentation.fast_api.middlewares.worker_router import room_id_from_scope
+
+
+class TracingMiddleware:
+    """
+    Wraps every HTTP request and WebSocket session in a span.
+
+    The room of the request (cookie or observe path) is made current first,
+    so the span and everything below it belong to the room's trace.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket"):
+            await self.app(scope, receive, send)
+            return
+
+        room_id = room_id_from_scope(scope)
+        if room_id is not None:
+            current_room_id.set(room_id)
+
+        method = scope.get("method", "WS")
+        with span(f"{method} {scope['path']}", path=scope["path"]) as request_span:
+
+            async def send_with_status(message: Message) -> None:
+                if message["type"] == "http.response.start":
+                    request_span.set_attribute("http.status", message["status"])
+                    if message["status"] >= 500:
+                        request_span.set_status("error")
+                await send(message)
+
+            await self.app(scope, receive, send_with_status)
+
+            # Named after the matched route template once routing is done
+            route = scope.get("route")
+            if route is not None and hasattr(request_span, "name"):
+                request_span.name = f"{method} {route.path}"
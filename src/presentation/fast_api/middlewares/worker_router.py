@@ -0,0 +1,261 @@
+import asyncio
+from typing import Any
+from uuid import UUID
+
+from loguru import logger
+from starlette.requests import cookie_parser
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.core.setting import settings
+from src.core.workers import room_owner, worker_socket_path
+
+# Set on forwarded requests, a worker never forwards them again
+FORWARDED_HEADER = b"x-forwarded-by-worker"
+
+# Not meaningful beyond a single connection
+_HOP_BY_HOP = {
+    "connection",
+    "keep-alive",
+    "proxy-connection",
+    "te",
+    "trailer",
+    "transfer-encoding",
+    "upgrade",
+}
+
+_sessions: dict[int, Any] = {}
+
+
+def _session(index: int) -> Any:
+    """
+    HTTP session over the unix socket of a sibling worker
+    """
+    session = _sessions.get(index)
+    if session is None or session.closed:
+        import aiohttp
+
+        session = _sessions[index] = aiohttp.ClientSession(
+            connector=aiohttp.UnixConnector(path=str(worker_socket_path(index))),
+            timeout=aiohttp.ClientTimeout(total=None, sock_connect=5),
+            auto_decompress=False,
+        )
+    return session
+
+
+async def close_worker_sessions() -> None:
+    """
+    Close sessions to sibling workers
+    """
+    for session in _sessions.values():
+        await session.close()
+    _sessions.clear()
+
+
+def room_id_from_scope(scope: Scope) -> UUID | None:
+    """
+    Room of a request: from the observe path or the room_id cookie
+    """
+    path: str = scope["path"]
+    if "/room/" in path and path.endswith("/observe/sse"):
+        # /room/{room_id}/observe/sse
+        candidate = path.rsplit("/", 3)[-3]
+    else:
+        candidate = None
+        for name, value in scope["headers"]:
+            if name == b"cookie":
+                candidate = cookie_parser(value.decode("latin-1")).get("room_id")
+                break
+
+    if not candidate:
+        return None
+    try:
+        return UUID(candidate)
+    except ValueError:
+        return None
+
+
+class WorkerRoutingMiddleware:
+    """
+    Sticky per-room routing between worker processes.
+
+    Rooms live in the memory of the worker that created them (room ids are
+    chosen so that `room_owner` is that worker). Requests of a room that reach
+    another worker are forwarded to the owner over its unix socket, streaming
+    both ways, so SSE and WebSocket sessions work through any worker.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] not in ("http", "websocket") or settings.server_workers < 2:
+            await self.app(scope, receive, send)
+            return
+
+        room_id = room_id_from_scope(scope)
+        if room_id is None or any(name == FORWARDED_HEADER for name, _ in scope["headers"]):
+            await self.app(scope, receive, send)
+            return
+
+        owner = room_owner(room_id, settings.server_workers)
+        if owner == settings.server_worker_index:
+            await self.app(scope, receive, send)
+            return
+
+        if scope["type"] == "http":
+            await self._forward_http(owner, scope, receive, send)
+        else:
+            await self._forward_websocket(owner, scope, receive, send)
+
+    @staticmethod
+    def _target(scope: Scope) -> str:
+        query = scope.get("query_string", b"").decode("latin-1")
+        return f"http://worker{scope['path']}" + (f"?{query}" if query else "")
+
+    @staticmethod
+    def _headers(scope: Scope) -> list[tuple[str, str]]:
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in scope["headers"]
+            if name.decode("latin-1") not in _HOP_BY_HOP
+        ]
+        headers.append((FORWARDED_HEADER.decode(), str(settings.server_worker_index)))
+        return headers
+
+    async def _forward_http(self, owner: int, scope: Scope, receive: Receive, send: Send) -> None:
+        import aiohttp
+
+        body_sent = asyncio.Event()
+        disconnected = asyncio.Event()
+
+        async def body():
+            try:
+                while True:
+                    message = await receive()
+                    if message["type"] == "http.disconnect":
+                        disconnected.set()
+                        return
+                    yield message.get("body", b"")
+                    if not message.get("more_body", False):
+                        return
+            finally:
+                body_sent.set()
+
+        async def client_gone() -> None:
+            # receive() is read by the body upload until it is complete
+            await body_sent.wait()
+            while not disconnected.is_set():
+                if (await receive())["type"] == "http.disconnect":
+                    disconnected.set()
+
+        started = False
+        try:
+            async with _session(owner).request(
+                scope["method"],
+                self._target(scope),
+                # The body is streamed chunked
+                headers=[(n, v) for n, v in self._headers(scope) if n != "content-length"],
+                data=body(),
+                allow_redirects=False,
+            ) as upstream:
+                await send(
+                    {
+                        "type": "http.response.start",
+                        "status": upstream.status,
+                        "headers": [
+                            (name, value)
+                            for name, value in upstream.raw_headers
+                            if name.decode("latin-1").lower() not in _HOP_BY_HOP
+                        ],
+                    }
+                )
+                started = True
+
+                # Sends to a client that went away are dropped silently, so the
+                # copy would go on until the owner ends its stream (never for
+                # observers). Closing the upstream connection instead lets the
+                # owner see the disconnect and detach its readers.
+                copy = asyncio.create_task(self._copy_body(upstream, send))
+                watch = asyncio.create_task(client_gone())
+                try:
+                    await asyncio.wait((copy, watch), return_when=asyncio.FIRST_COMPLETED)
+                finally:
+                    watch.cancel()
+                    if not copy.done():
+                        copy.cancel()
+                        upstream.close()
+                    await asyncio.gather(copy, watch, return_exceptions=True)
+                if not copy.cancelled():
+                    copy.result()
+        except aiohttp.ClientConnectionError as e:
+            logger.error(f"Worker {owner} is unavailable for {scope['path']}: {e}")
+            if started:
+                # Too late for a status, the client sees the stream end
+                return
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [(b"content-type", b"text/plain"), (b"retry-after", b"1")],
+                }
+            )
+            await send({"type": "http.response.body", "body": b"Room worker unavailable"})
+
+    @staticmethod
+    async def _copy_body(upstream: Any, send: Send) -> None:
+        async for chunk in upstream.content.iter_any():
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def _forward_websocket(self, owner: int, scope: Scope, receive: Receive, send: Send) -> None:
+        import aiohttp
+
+        message = await receive()
+        if message["type"] != "websocket.connect":
+            return
+
+        headers = [
+            (name, value)
+            for name, value in self._headers(scope)
+            if not name.startswith("sec-websocket-")
+        ]
+        try:
+            upstream = await _session(owner).ws_connect(
+                self._target(scope),
+                headers=headers,
+                protocols=scope.get("subprotocols", ()),
+            )
+        except (aiohttp.ClientConnectionError, aiohttp.WSServerHandshakeError) as e:
+            logger.error(f"Worker {owner} refused WebSocket of {scope['path']}: {e}")
+            await send({"type": "websocket.close", "code": 1013})
+            return
+
+        await send({"type": "websocket.accept", "subprotocol": upstream.protocol})
+
+        async def client_to_owner() -> None:
+            while True:
+                message = await receive()
+                if message["type"] == "websocket.disconnect":
+                    await upstream.close(code=message.get("code", 1000))
+                    return
+                if message.get("text") is not None:
+                    await upstream.send_str(message["text"])
+                elif message.get("bytes") is not None:
+                    await upstream.send_bytes(message["bytes"])
+
+        async def owner_to_client() -> None:
+            async for frame in upstream:
+                if frame.type == aiohttp.WSMsgType.TEXT:
+                    await send({"type": "websocket.send", "text": frame.data})
+                elif frame.type == aiohttp.WSMsgType.BINARY:
+                    await send({"type": "websocket.send", "bytes": frame.data})
+            await send({"type": "websocket.close", "code": upstream.close_code or 1000})
+
+        pumps = [asyncio.create_task(client_to_owner()), asyncio.create_task(owner_to_client())]
+        try:
+            await asyncio.wait(pumps, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for pump in pumps:
+                pump.cancel()
+            await asyncio.gather(*pumps, return_exceptions=True)
+            await upstream.close()
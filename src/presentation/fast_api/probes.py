@@ -0,0 +1,22 @@
+from fastapi import APIRouter
+from fastapi.responses import ORJSONResponse
+
+from src.core.workers import is_draining
+from src.dependencies.warmup import readiness
+
+router = APIRouter()
+
+
+@router.get(
+    "/ready",
+    description="Readiness probe, 503 until the startup warm-up has finished "
+    "and once the worker starts shutting down",
+    tags=["Probes"],
+    summary="Readiness probe",
+)
+async def ready() -> ORJSONResponse:
+    ready = readiness.ready and not is_draining()
+    return ORJSONResponse(
+        {"ready": ready, "draining": is_draining(), "warmup": readiness.steps},
+        status_code=200 if ready else 503,
+    )
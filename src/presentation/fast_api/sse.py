@@ -0,0 +1,270 @@
+import asyncio
+import time
+from collections.abc import AsyncIterable, AsyncGenerator
+from contextlib import aclosing
+from datetime import datetime, timezone
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi.responses import StreamingResponse
+
+from src.core.metrics import registry
+from src.core.setting import settings
+from src.domain.generation.generation import RoomEvent
+
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "X-Accel-Buffering": "no",  # Важно для nginx
+}
+
+HEARTBEAT = b": ping\n\n"
+
+_open_streams = registry.gauge(
+    "sse_open_streams",
+    "SSE streams currently open, by stream kind",
+    labels=("stream",),
+)
+_open_generation_streams = _open_streams.labels("generation")
+_open_observer_streams = _open_streams.labels("observer")
+
+_timestamp_second = -1
+_timestamp_value = ""
+
+
+def utc_timestamp() -> str:
+    """
+    Current UTC time in ISO 8601, formatted at most once per second
+    """
+    global _timestamp_second, _timestamp_value
+
+    now = int(time.time())
+    if now != _timestamp_second:
+        _timestamp_second = now
+        _timestamp_value = datetime.fromtimestamp(now, timezone.utc).strftime(
+            "%Y-%m-%dT%H:%M:%SZ"
+        )
+    return _timestamp_value
+
+
+def encode_event(data: dict[str, Any], event_id: str | None = None) -> bytes:
+    """
+    Encode a single SSE event with a JSON payload
+    """
+    if event_id is None:
+        return b"data: " + orjson.dumps(data) + b"\n\n"
+    return b"id: " + event_id.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+Event = tuple[str, str]
+"""(event id, chunk) pair produced by InterviewService.stream_generation"""
+
+
+async def coalesce_chunks(
+    chunks: AsyncIterable[Event],
+    window: float,
+    max_size: int,
+    heartbeat: float = 0.0,
+) -> AsyncGenerator[Event | None, None]:
+    """
+    Merge small chunks arriving within `window` seconds into one.
+
+    A merged chunk carries the event id of its last part and is flushed when
+    the window since its first part expires or when it reaches `max_size`
+    characters. If `heartbeat` is set and the source stays idle that long,
+    None is yielded so the caller can keep the connection alive.
+    """
+
+    it = chunks.__aiter__()
+    loop = asyncio.get_running_loop()
+    pending: asyncio.Future[Event] | None = None
+    buffer: list[str] = []
+    last_id = ""
+    size = 0
+    deadline = 0.0
+
+    try:
+        while True:
+            if pending is None:
+                pending = asyncio.ensure_future(it.__anext__())
+
+            if buffer:
+                timeout: float | None = max(0.0, deadline - loop.time())
+            else:
+                timeout = heartbeat or None
+
+            if not pending.done():
+                # The pending read survives a timeout, nothing is cancelled here
+                await asyncio.wait((pending,), timeout=timeout)
+
+            if not pending.done():
+                if buffer:
+                    yield last_id, "".join(buffer)
+                    buffer.clear()
+                    size = 0
+                else:
+                    yield None
+                continue
+
+            done, pending = pending, None
+            try:
+                event_id, chunk = done.result()
+            except StopAsyncIteration:
+                break
+            except Exception:
+                # Deliver what the source produced before failing
+                if buffer:
+                    yield last_id, "".join(buffer)
+                    buffer.clear()
+                raise
+
+            if not chunk:
+                continue
+            if not buffer:
+                deadline = loop.time() + window
+            buffer.append(chunk)
+            last_id = event_id
+            size += len(chunk)
+
+            if size >= max_size or window <= 0:
+                yield last_id, "".join(buffer)
+                buffer.clear()
+                size = 0
+
+        if buffer:
+            yield last_id, "".join(buffer)
+    finally:
+        if pending is not None and not pending.done():
+            # Cancelling the read ends the source as well
+            pending.cancel()
+        elif hasattr(it, "aclose"):
+            # Close the source right away, so it stops producing for nobody
+            await it.aclose()
+
+
+def _coalesce(chunks: AsyncIterable[Event], heartbeat: float) -> AsyncGenerator[Event | None, None]:
+    return coalesce_chunks(
+        chunks,
+        window=settings.sse_coalesce_ms / 1000,
+        max_size=settings.sse_coalesce_size,
+        heartbeat=heartbeat,
+    )
+
+
+async def sse_events(
+    chunks: AsyncIterable[Event],
+    room_id: UUID,
+    start_message: str,
+    complete_message: str,
+    error_message: str,
+) -> AsyncGenerator[bytes, None]:
+    """
+    Wrap text chunks into start / message_chunk / complete SSE events.
+    Chunk events carry ids, so a reconnecting client can send Last-Event-ID
+    and resume. Errors of the source are reported as an error event.
+    """
+    _open_generation_streams.inc()
+    try:
+        # Отправляем начальное событие
+        yield encode_event(
+            {"type": "start", "message": start_message, "room_id": str(room_id)}
+        )
+
+        # Closed even when the response is cancelled between two chunks
+        async with aclosing(_coalesce(chunks, settings.sse_heartbeat_seconds)) as events:
+            async for event in events:
+                if event is None:
+                    yield HEARTBEAT
+                    continue
+                event_id, content = event
+                yield encode_event(
+                    {"type": "message_chunk", "content": content, "timestamp": utc_timestamp()},
+                    event_id,
+                )
+
+        # Отправляем событие завершения
+        yield encode_event({"type": "complete", "message": complete_message})
+
+    except Exception as e:
+        # Отправляем событие ошибки
+        yield encode_event({"type": "error", "message": f"{error_message}: {str(e)}"})
+    finally:
+        _open_generation_streams.dec()
+
+
+def sse_response(
+    chunks: AsyncIterable[Event],
+    room_id: UUID,
+    start_message: str,
+    complete_message: str,
+    error_message: str,
+) -> StreamingResponse:
+    """
+    Stream text chunks to the client as server-sent events
+    """
+    return StreamingResponse(
+        sse_events(chunks, room_id, start_message, complete_message, error_message),
+        media_type="text/event-stream; charset=utf-8",
+        headers=SSE_HEADERS,
+    )
+
+
+async def observer_events(
+    events: AsyncIterable[RoomEvent | None], room_id: UUID
+) -> AsyncGenerator[bytes, None]:
+    """
+    Encode room events for an observer, None from the source becomes a heartbeat
+    """
+    _open_observer_streams.inc()
+    try:
+        yield encode_event({"type": "observe", "room_id": str(room_id)})
+
+        async for event in events:
+            if event is None:
+                yield HEARTBEAT
+                continue
+            yield encode_event(
+                {
+                    "type": event.type,
+                    "kind": event.kind,
+                    "content": event.content,
+                    "timestamp": utc_timestamp(),
+                },
+                event.event_id,
+            )
+
+        yield encode_event({"type": "closed", "message": "Room stopped"})
+
+    except Exception as e:
+        yield encode_event({"type": "error", "message": f"Error observing room: {str(e)}"})
+    finally:
+        _open_observer_streams.dec()
+
+
+def observer_response(events: AsyncIterable[RoomEvent | None], room_id: UUID) -> StreamingResponse:
+    """
+    Stream room events to an observer as server-sent events
+    """
+    return StreamingResponse(
+        observer_events(events, room_id),
+        media_type="text/event-stream; charset=utf-8",
+        headers=SSE_HEADERS,
+    )
+
+
+async def _text_stream(chunks: AsyncIterable[Event]) -> AsyncGenerator[bytes, None]:
+    async with aclosing(_coalesce(chunks, heartbeat=0.0)) as events:
+        async for event in events:
+            if event is not None:
+                yield event[1].encode("utf-8")
+
+
+def text_response(chunks: AsyncIterable[Event]) -> StreamingResponse:
+    """
+    Stream text chunks to the client as plain text
+    """
+    return StreamingResponse(
+        _text_stream(chunks),
+        media_type="text/plain",
+    )
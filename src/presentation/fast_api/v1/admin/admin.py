@@ -0,0 +1,33 @@
+from fastapi import APIRouter, Depends, HTTPException
+from loguru import logger
+
+from src.schemas.admin import RoomStatsResponse
+from src.usecases.interfaces.interview_service import InterviewServiceBase
+
+router = APIRouter()
+
+
+@router.get(
+    "/admin/rooms",
+    response_model=RoomStatsResponse,
+    description="Get resident and spilled room counts with accounted memory",
+    tags=["Admin"],
+    summary="Get room stats",
+)
+async def get_room_stats(
+    interview_service: InterviewServiceBase = Depends(),
+) -> RoomStatsResponse:
+    try:
+        logger.info("Getting room stats")
+
+        stats = await interview_service.get_room_stats()
+
+        return RoomStatsResponse(
+            resident=stats.resident,
+            spilled=stats.spilled,
+            pinned=stats.pinned,
+            resident_bytes=stats.resident_bytes,
+            memory_limit=stats.memory_limit,
+        )
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
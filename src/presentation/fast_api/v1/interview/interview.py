@@ -1,6 +1,9 @@
-from fastapi import APIRouter, Depends, Response, Request, HTTPException
+from fastapi import APIRouter, Depends, Query, Response, Request, HTTPException, WebSocket, status
 from fastapi.responses import StreamingResponse
-from src.domain.room.room import Interviewee, Solution, SolutionType
+from src.presentation.fast_api.sse import observer_response, sse_response, text_response
+from src.presentation.fast_api.websocket import InterviewSession
+from src.domain.generation.generation import GenerationKind
+from src.domain.room.room import Interviewee, Room as RoomModel, Solution, SolutionType
 from src.domain.test.test import CodeTestCase
 from src.schemas.room import (
     InterviewRoom,
@@ -16,14 +19,65 @@ from src.schemas.room import (
 )
 from src.schemas.interiewee import CreatedRoomRequest
 from src.usecases.interfaces.interview_service import InterviewServiceBase
+from src.core.log import truncate
 from loguru import logger
 from uuid import UUID
 from typing import Annotated
-import json
 
 router = APIRouter()
 
 
+def _room_etag(room: RoomModel) -> str:
+    return f'"{room.id.hex}.{room.version}"'
+
+
+def _etag_matches(etag: str, if_none_match: str) -> bool:
+    """
+    Whether an If-None-Match header matches the ETag, comparing weakly as
+    RFC 9110 asks for this header: W/ prefixes are ignored, * matches any
+    """
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _interview_room(room: RoomModel, since: int = 0, limit: int | None = None) -> InterviewRoom:
+    """
+    Build the room response, converting only the requested slice of the chat
+    """
+    total = len(room.chat_history)
+    since = min(since, total)
+    end = total if limit is None else min(total, since + limit)
+
+    return InterviewRoom(
+        vacancy=VacancyRoom(
+            profession=room.vacancy_info.profession,
+            position=room.vacancy_info.position,
+        ),
+        tasks=[
+            Task(
+                type=str(task.type),
+                condition=str(task.description),
+                language=task.language or "",
+            )
+            for task in room.tasks
+        ],
+        chat=[
+            Message(
+                sender=str(message.role),
+                content=message.content,
+            )
+            for message in room.chat_history[since:end]
+        ],
+        version=room.version,
+        chat_offset=since,
+        chat_total=total,
+        next_cursor=end if end < total else None,
+    )
+
+
 @router.post(
     "/room",
     response_model=InterviewRoom,
@@ -55,36 +109,12 @@ async def create_room(
             max_age=int(room.vacancy_info.duration.total_seconds()),
         )
 
-        logger.info(f"Room plan: {room.vacancy_info.interview_plan}")
-
-        tasks: list[Task] = []
-        for task in room.tasks:
-            tasks.append(
-                Task(
-                    type=str(task.type),
-                    condition=str(task.description),
-                    language=task.language or "",
-                )
-            )
-
-        messages: list[Message] = []
-        for message in room.chat_history:
-            messages.append(
-                Message(
-                    sender=str(message.role),
-                    content=message.content,
-                )
-            )
-
-        interview_room = InterviewRoom(
-            vacancy=VacancyRoom(
-                profession=room.vacancy_info.profession,
-                position=room.vacancy_info.position,
-            ),
-            tasks=tasks,
-            chat=messages,
+        logger.opt(lazy=True).debug(
+            "Room plan: {}", lambda: truncate(room.vacancy_info.interview_plan)
         )
 
+        interview_room = _interview_room(room)
+
         return interview_room
 
     except Exception as e:
@@ -106,13 +136,8 @@ async def get_welcome_message(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def sse_generator():
-            async for chunk in interview_service.generate_welcome_message(room_id):
-                yield chunk.encode("utf-8")
-
-        return StreamingResponse(
-            sse_generator(),
-            media_type="text/plain",
+        return text_response(
+            interview_service.stream_generation(room_id, GenerationKind.WELCOME)
         )
 
     except Exception as e:
@@ -134,61 +159,14 @@ async def get_welcome_message_sse(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def sse_generator():
-            try:
-                # Отправляем начальное событие
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "start",
-                            "message": "Starting welcome message generation",
-                            "room_id": str(room_id),
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-                # Генерируем welcome message и отправляем как SSE
-                async for chunk in interview_service.generate_welcome_message(room_id):
-                    yield "data: {}\n\n".format(
-                        json.dumps(
-                            {
-                                "type": "message_chunk",
-                                "content": chunk,
-                                "timestamp": "2024-01-01T00:00:00Z",  # добавьте реальный timestamp
-                            },
-                            ensure_ascii=False,
-                        )
-                    )
-
-                # Отправляем событие завершения
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {"type": "complete", "message": "Welcome message completed"},
-                        ensure_ascii=False,
-                    )
-                )
-
-            except Exception as e:
-                # Отправляем событие ошибки
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "error",
-                            "message": f"Error generating welcome message: {str(e)}",
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-        return StreamingResponse(
-            sse_generator(),
-            media_type="text/event-stream; charset=utf-8",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Важно для nginx
-            },
+        return sse_response(
+            interview_service.stream_generation(
+                room_id, GenerationKind.WELCOME, request.headers.get("last-event-id")
+            ),
+            room_id=room_id,
+            start_message="Starting welcome message generation",
+            complete_message="Welcome message completed",
+            error_message="Error generating welcome message",
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -197,12 +175,15 @@ async def get_welcome_message_sse(
 @router.get(
     "/room",
     response_model=InterviewRoom,
-    description="Get a room",
+    description="Get a room. Supports ETag / If-None-Match and chat deltas via `since` and `limit`",
     tags=["Interview"],
     summary="Get a room",
 )
 async def get_room(
     request: Request,
+    response: Response,
+    since: Annotated[int, Query(ge=0, description="Index of the first chat message to return")] = 0,
+    limit: Annotated[int | None, Query(ge=1, description="Maximum number of chat messages")] = None,
     interview_service: InterviewServiceBase = Depends(),
 ) -> InterviewRoom:
     try:
@@ -212,33 +193,12 @@ async def get_room(
 
         room = await interview_service.get_room(room_id)
 
-        tasks: list[Task] = []
-        for task in room.tasks:
-            tasks.append(
-                Task(
-                    type=str(task.type),
-                    condition=str(task.description),
-                    language=task.language or "",
-                )
-            )
+        etag = _room_etag(room)
+        if _etag_matches(etag, request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers={"ETag": etag})
 
-        messages: list[Message] = []
-        for message in room.chat_history:
-            messages.append(
-                Message(
-                    sender=str(message.role),
-                    content=message.content,
-                )
-            )
-
-        interview_room = InterviewRoom(
-            vacancy=VacancyRoom(
-                profession=room.vacancy_info.profession,
-                position=room.vacancy_info.position,
-            ),
-            tasks=tasks,
-            chat=messages,
-        )
+        response.headers["ETag"] = etag
+        interview_room = _interview_room(room, since, limit)
 
         return interview_room
     except Exception as e:
@@ -289,13 +249,8 @@ async def get_solution_response(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def generator():
-            async for chunk in interview_service.get_solution_response(room_id):
-                yield chunk.encode("utf-8")
-
-        return StreamingResponse(
-            generator(),
-            media_type="text/plain",
+        return text_response(
+            interview_service.stream_generation(room_id, GenerationKind.SOLUTION_RESPONSE)
         )
 
     except Exception as e:
@@ -317,61 +272,14 @@ async def get_solution_response_sse(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def sse_generator():
-            try:
-                # Отправляем начальное событие
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "start",
-                            "message": "Starting solution response generation",
-                            "room_id": str(room_id),
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-                # Генерируем solution response и отправляем как SSE
-                async for chunk in interview_service.get_solution_response(room_id):
-                    yield "data: {}\n\n".format(
-                        json.dumps(
-                            {
-                                "type": "message_chunk",
-                                "content": chunk,
-                                "timestamp": "2024-01-01T00:00:00Z",  # добавьте реальный timestamp
-                            },
-                            ensure_ascii=False,
-                        )
-                    )
-
-                # Отправляем событие завершения
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {"type": "complete", "message": "Solution response completed"},
-                        ensure_ascii=False,
-                    )
-                )
-
-            except Exception as e:
-                # Отправляем событие ошибки
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "error",
-                            "message": f"Error generating solution response: {str(e)}",
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-        return StreamingResponse(
-            sse_generator(),
-            media_type="text/event-stream; charset=utf-8",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Важно для nginx
-            },
+        return sse_response(
+            interview_service.stream_generation(
+                room_id, GenerationKind.SOLUTION_RESPONSE, request.headers.get("last-event-id")
+            ),
+            room_id=room_id,
+            start_message="Starting solution response generation",
+            complete_message="Solution response completed",
+            error_message="Error generating solution response",
         )
 
     except Exception as e:
@@ -414,13 +322,8 @@ async def get_question_response(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def generator():
-            async for chunk in interview_service.get_response(room_id):
-                yield chunk.encode("utf-8")
-
-        return StreamingResponse(
-            generator(),
-            media_type="text/plain",
+        return text_response(
+            interview_service.stream_generation(room_id, GenerationKind.RESPONSE)
         )
 
     except Exception as e:
@@ -442,61 +345,14 @@ async def get_question_response_sse(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def sse_generator():
-            try:
-                # Отправляем начальное событие
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "start",
-                            "message": "Starting question response generation",
-                            "room_id": str(room_id),
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-                # Генерируем question response и отправляем как SSE
-                async for chunk in interview_service.get_response(room_id):
-                    yield "data: {}\n\n".format(
-                        json.dumps(
-                            {
-                                "type": "message_chunk",
-                                "content": chunk,
-                                "timestamp": "2024-01-01T00:00:00Z",
-                            },
-                            ensure_ascii=False,
-                        )
-                    )
-
-                # Отправляем событие завершения
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {"type": "complete", "message": "Question response completed"},
-                        ensure_ascii=False,
-                    )
-                )
-
-            except Exception as e:
-                # Отправляем событие ошибки
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "error",
-                            "message": f"Error generating question response: {str(e)}",
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-        return StreamingResponse(
-            sse_generator(),
-            media_type="text/event-stream; charset=utf-8",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Важно для nginx
-            },
+        return sse_response(
+            interview_service.stream_generation(
+                room_id, GenerationKind.RESPONSE, request.headers.get("last-event-id")
+            ),
+            room_id=room_id,
+            start_message="Starting question response generation",
+            complete_message="Question response completed",
+            error_message="Error generating question response",
         )
 
     except Exception as e:
@@ -518,13 +374,8 @@ async def get_task(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def generator():
-            async for chunk in interview_service.new_task(room_id):
-                yield chunk.encode("utf-8")
-
-        return StreamingResponse(
-            generator(),
-            media_type="text/plain",
+        return text_response(
+            interview_service.stream_generation(room_id, GenerationKind.TASK)
         )
 
     except Exception as e:
@@ -546,61 +397,14 @@ async def get_task_sse(
 
         room_id: UUID = UUID(request.cookies.get("room_id"))
 
-        async def sse_generator():
-            try:
-                # Отправляем начальное событие
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "start",
-                            "message": "Starting task generation",
-                            "room_id": str(room_id),
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-                # Генерируем task и отправляем как SSE
-                async for chunk in interview_service.new_task(room_id):
-                    yield "data: {}\n\n".format(
-                        json.dumps(
-                            {
-                                "type": "message_chunk",
-                                "content": chunk,
-                                "timestamp": "2024-01-01T00:00:00Z",
-                            },
-                            ensure_ascii=False,
-                        )
-                    )
-
-                # Отправляем событие завершения
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {"type": "complete", "message": "Task completed"},
-                        ensure_ascii=False,
-                    )
-                )
-
-            except Exception as e:
-                # Отправляем событие ошибки
-                yield "data: {}\n\n".format(
-                    json.dumps(
-                        {
-                            "type": "error",
-                            "message": f"Error generating task: {str(e)}",
-                        },
-                        ensure_ascii=False,
-                    )
-                )
-
-        return StreamingResponse(
-            sse_generator(),
-            media_type="text/event-stream; charset=utf-8",
-            headers={
-                "Cache-Control": "no-cache",
-                "Connection": "keep-alive",
-                "X-Accel-Buffering": "no",  # Важно для nginx
-            },
+        return sse_response(
+            interview_service.stream_generation(
+                room_id, GenerationKind.TASK, request.headers.get("last-event-id")
+            ),
+            room_id=room_id,
+            start_message="Starting task generation",
+            complete_message="Task completed",
+            error_message="Error generating task",
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -670,6 +474,51 @@ async def run_code(
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.get(
+    "/room/{room_id}/observe/sse",
+    description="Watch a room live via SSE: candidate messages and every streamed chunk",
+    tags=["Interview"],
+    summary="Observe a room via SSE",
+)
+async def observe_room_sse(
+    room_id: UUID,
+    interview_service: InterviewServiceBase = Depends(),
+) -> StreamingResponse:
+    try:
+        logger.info(f"Observing room {room_id} via SSE")
+
+        # Unknown rooms raise KeyError before the stream starts
+        await interview_service.get_room(room_id)
+
+        return observer_response(interview_service.observe(room_id), room_id)
+
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Room not found")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.websocket("/room/ws")
+async def room_websocket(
+    websocket: WebSocket,
+    interview_service: InterviewServiceBase = Depends(),
+):
+    """
+    Multiplexed session: questions, solutions, code runs, task requests and
+    streamed responses over one connection
+    """
+    try:
+        room_id: UUID = UUID(websocket.cookies.get("room_id"))
+    except (TypeError, ValueError):
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    logger.info(f"WebSocket session opened for room {room_id}")
+
+    await InterviewSession(websocket, room_id, interview_service).run()
+
+
 @router.delete(
     "/room",
     description="Stop a room",
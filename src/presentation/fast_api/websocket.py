@@ -0,0 +1,211 @@
+import asyncio
+from collections.abc import AsyncIterable
+from contextlib import aclosing
+from typing import Any
+from uuid import UUID
+
+import orjson
+from fastapi import WebSocket, WebSocketDisconnect
+from loguru import logger
+from pydantic import ValidationError
+
+from src.core.setting import settings
+from src.domain.generation.generation import GenerationKind
+from src.domain.room.room import Solution, SolutionType
+from src.presentation.fast_api.sse import Event, coalesce_chunks, utc_timestamp
+from src.schemas.ws import (
+    ClientFrame,
+    QuestionFrame,
+    ResumeFrame,
+    RunFrame,
+    SolutionFrame,
+    TaskFrame,
+    WelcomeFrame,
+    client_frame_adapter,
+)
+from src.usecases.interfaces.interview_service import InterviewServiceBase
+
+
+class InterviewSession:
+    """
+    Multiplexed WebSocket session of a room.
+
+    Client frames are JSON objects with a `type` and an optional `ref` that is
+    echoed in every server frame answering it. Streamed generations are sent
+    as start / message_chunk / complete frames, like the SSE routes.
+
+    Backpressure works both ways: outgoing frames go through a bounded queue,
+    so streams wait while the client is not reading, and at most
+    `ws_max_inflight` client requests are processed before the session stops
+    reading new frames.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        room_id: UUID,
+        interview_service: InterviewServiceBase,
+    ):
+        self.websocket = websocket
+        self.room_id = room_id
+        self.interview_service = interview_service
+
+        self._outgoing: asyncio.Queue[bytes] = asyncio.Queue(
+            maxsize=settings.ws_send_queue_size
+        )
+        self._inflight = asyncio.Semaphore(settings.ws_max_inflight)
+        self._handlers: set[asyncio.Task] = set()
+
+    async def run(self) -> None:
+        """
+        Serve the session until the client disconnects
+        """
+        sender = asyncio.create_task(self._send_loop())
+        try:
+            await self._receive_loop()
+        except WebSocketDisconnect:
+            logger.info(f"WebSocket of room {self.room_id} disconnected")
+        finally:
+            for handler in self._handlers:
+                handler.cancel()
+            await asyncio.gather(*self._handlers, return_exceptions=True)
+            sender.cancel()
+            await asyncio.gather(sender, return_exceptions=True)
+
+    async def _receive_loop(self) -> None:
+        while True:
+            await self._inflight.acquire()
+            try:
+                message = await self.websocket.receive()
+            except BaseException:
+                self._inflight.release()
+                raise
+
+            if message["type"] == "websocket.disconnect":
+                self._inflight.release()
+                logger.info(
+                    f"WebSocket of room {self.room_id} disconnected with code {message.get('code')}"
+                )
+                return
+
+            raw = message.get("text")
+            if raw is None:
+                # Frames are JSON text, binary ones are answered and skipped
+                self._inflight.release()
+                await self._send(
+                    {"type": "error", "message": "Binary frames are not supported, send JSON text"}
+                )
+                continue
+
+            try:
+                frame = client_frame_adapter.validate_json(raw)
+            except ValidationError as e:
+                self._inflight.release()
+                await self._send({"type": "error", "message": f"Invalid frame: {e}"})
+                continue
+
+            handler = asyncio.create_task(self._handle(frame))
+            self._handlers.add(handler)
+            handler.add_done_callback(self._handlers.discard)
+
+    async def _send_loop(self) -> None:
+        while True:
+            data = await self._outgoing.get()
+            await self.websocket.send_text(data.decode("utf-8"))
+
+    async def _send(self, frame: dict[str, Any]) -> None:
+        # Waits while the queue is full, i.e. the client does not keep up
+        await self._outgoing.put(orjson.dumps(frame))
+
+    async def _handle(self, frame: ClientFrame) -> None:
+        try:
+            if isinstance(frame, WelcomeFrame):
+                await self._stream(frame.ref, GenerationKind.WELCOME)
+            elif isinstance(frame, QuestionFrame):
+                await self.interview_service.send_question(self.room_id, frame.question)
+                await self._stream(frame.ref, GenerationKind.RESPONSE)
+            elif isinstance(frame, SolutionFrame):
+                await self.interview_service.send_solution(
+                    self.room_id,
+                    Solution(
+                        content=frame.solution,
+                        language=frame.language,
+                        solution_type=SolutionType.CODE
+                        if frame.solution_type == "code"
+                        else SolutionType.TEXT,
+                        count_suspicious_copy_paste=frame.copy_paste_count,
+                    ),
+                )
+                await self._stream(frame.ref, GenerationKind.SOLUTION_RESPONSE)
+            elif isinstance(frame, TaskFrame):
+                await self._stream(frame.ref, GenerationKind.TASK)
+            elif isinstance(frame, ResumeFrame):
+                await self._stream(
+                    frame.ref, GenerationKind(frame.kind), frame.last_event_id
+                )
+            elif isinstance(frame, RunFrame):
+                await self._run(frame)
+        except Exception as e:
+            logger.error(f"WebSocket {frame.type} request of room {self.room_id} failed: {e}")
+            await self._send({"type": "error", "ref": frame.ref, "message": str(e)})
+        finally:
+            self._inflight.release()
+
+    async def _stream(
+        self,
+        ref: str | None,
+        kind: GenerationKind,
+        last_event_id: str | None = None,
+    ) -> None:
+        events: AsyncIterable[Event] = self.interview_service.stream_generation(
+            self.room_id, kind, last_event_id
+        )
+
+        await self._send({"type": "start", "ref": ref, "kind": str(kind)})
+        # Closed when the handler is cancelled on disconnect, detaching from the generation
+        async with aclosing(
+            coalesce_chunks(
+                events,
+                window=settings.sse_coalesce_ms / 1000,
+                max_size=settings.sse_coalesce_size,
+            )
+        ) as chunks:
+            async for event in chunks:
+                if event is None:
+                    continue
+                event_id, content = event
+                await self._send(
+                    {
+                        "type": "message_chunk",
+                        "ref": ref,
+                        "id": event_id,
+                        "content": content,
+                        "timestamp": utc_timestamp(),
+                    }
+                )
+        await self._send({"type": "complete", "ref": ref, "kind": str(kind)})
+
+    async def _run(self, frame: RunFrame) -> None:
+        results = await self.interview_service.run_code(
+            self.room_id, frame.language, frame.code
+        )
+        await self._send(
+            {
+                "type": "run_result",
+                "ref": frame.ref,
+                "results": [
+                    {
+                        "input_data": result.input_data,
+                        "expected_output": result.expected_output,
+                        "correct": result.correct or False,
+                        "status": result.status,
+                        "exception": result.exception,
+                        "stdin": result.stdin,
+                        "stdout": result.stdout,
+                        "stderr": result.stderr,
+                        "execution_time": result.execution_time,
+                    }
+                    for result in results
+                ],
+            }
+        )
@@ -0,0 +1,9 @@
+from pydantic import BaseModel
+
+
+class RoomStatsResponse(BaseModel):
+    resident: int
+    spilled: int
+    pinned: int
+    resident_bytes: int
+    memory_limit: int
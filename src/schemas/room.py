@@ -22,6 +22,13 @@ class InterviewRoom(BaseModel):
     tasks: list[Task]
     chat: list[Message]
 
+    version: int = 0
+    # Index of the first message in `chat` within the whole chat history
+    chat_offset: int = 0
+    chat_total: int = 0
+    # Pass as `since` to get the next page, None when `chat` reaches the end
+    next_cursor: int | None = None
+
 
 class SolutionSentResponse(BaseModel):
     new_task: Task
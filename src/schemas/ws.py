@@ -0,0 +1,50 @@
+from typing import Annotated, Literal, Union
+
+from pydantic import BaseModel, Field, TypeAdapter
+
+
+class WelcomeFrame(BaseModel):
+    type: Literal["welcome"]
+    ref: str | None = None
+
+
+class QuestionFrame(BaseModel):
+    type: Literal["question"]
+    ref: str | None = None
+    question: str
+
+
+class SolutionFrame(BaseModel):
+    type: Literal["solution"]
+    ref: str | None = None
+    solution: str
+    copy_paste_count: int
+    language: str
+    solution_type: str
+
+
+class RunFrame(BaseModel):
+    type: Literal["run"]
+    ref: str | None = None
+    code: str
+    language: str
+
+
+class TaskFrame(BaseModel):
+    type: Literal["task"]
+    ref: str | None = None
+
+
+class ResumeFrame(BaseModel):
+    type: Literal["resume"]
+    ref: str | None = None
+    kind: Literal["welcome", "solution_response", "response", "task"]
+    last_event_id: str
+
+
+ClientFrame = Annotated[
+    Union[WelcomeFrame, QuestionFrame, SolutionFrame, RunFrame, TaskFrame, ResumeFrame],
+    Field(discriminator="type"),
+]
+
+client_frame_adapter: TypeAdapter[ClientFrame] = TypeAdapter(ClientFrame)
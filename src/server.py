@@ -0,0 +1,132 @@
+"""
+Production server: `python -m src.server`.
+
+A supervisor binds the public socket and runs SERVER_WORKERS uvicorn worker
+processes on it (uvloop + httptools). Each worker also listens on a unix
+socket for requests of its rooms forwarded by siblings, see
+`WorkerRoutingMiddleware`. Workers are recycled after SERVER_MAX_REQUESTS
+(plus jitter) and restarted when they die; on SIGTERM they stop accepting
+connections, end observer streams and wait up to SERVER_GRACEFUL_TIMEOUT for
+in-flight requests before spilling their rooms to disk.
+"""
+
+import multiprocessing
+import os
+import random
+import signal
+import socket
+import time
+
+import uvicorn
+from loguru import logger
+
+from src.core.setting import settings
+from src.core.workers import begin_drain, worker_socket_path
+
+
+class WorkerServer(uvicorn.Server):
+    """
+    Uvicorn server that marks the process as draining once it starts stopping
+    """
+
+    async def on_tick(self, counter: int) -> bool:
+        should_exit = await super().on_tick(counter)
+        if should_exit:
+            begin_drain()
+        return should_exit
+
+
+def _bind_public() -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((settings.server_host, settings.server_port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _bind_internal(index: int) -> socket.socket:
+    path = worker_socket_path(index)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    sock.listen(2048)
+    return sock
+
+
+def _run_worker(public: socket.socket) -> None:
+    index = settings.server_worker_index
+    max_requests = None
+    if settings.server_max_requests:
+        max_requests = settings.server_max_requests + random.randint(
+            0, settings.server_max_requests_jitter
+        )
+
+    config = uvicorn.Config(
+        "src.main:app",
+        loop="uvloop",
+        http="httptools",
+        ws="websockets",
+        lifespan="on",
+        proxy_headers=True,
+        limit_max_requests=max_requests,
+        timeout_graceful_shutdown=settings.server_graceful_timeout,
+    )
+    logger.info(f"Worker {index} started (pid {os.getpid()}, max requests {max_requests})")
+    WorkerServer(config).run(sockets=[public, _bind_internal(index)])
+
+
+def _start_worker(
+    context: multiprocessing.context.SpawnContext,
+    index: int,
+    public: socket.socket,
+) -> multiprocessing.Process:
+    # Spawned workers read their settings from the environment at start
+    os.environ["SERVER_WORKER_INDEX"] = str(index)
+    process = context.Process(target=_run_worker, args=(public,), name=f"worker-{index}")
+    process.start()
+    return process
+
+
+def main() -> None:
+    context = multiprocessing.get_context("spawn")
+    public = _bind_public()
+    logger.info(
+        f"Serving on {settings.server_host}:{settings.server_port} "
+        f"with {settings.server_workers} workers"
+    )
+
+    stopping = False
+
+    def stop(signum: int, frame: object) -> None:
+        nonlocal stopping
+        stopping = True
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    workers = [_start_worker(context, index, public) for index in range(settings.server_workers)]
+
+    while not stopping:
+        time.sleep(0.5)
+        for index, process in enumerate(workers):
+            if not process.is_alive() and not stopping:
+                logger.info(f"Worker {index} exited with {process.exitcode}, restarting")
+                workers[index] = _start_worker(context, index, public)
+
+    logger.info("Stopping workers")
+    for process in workers:
+        if process.is_alive():
+            process.terminate()
+    deadline = time.monotonic() + settings.server_graceful_timeout + 5
+    for process in workers:
+        process.join(max(0.0, deadline - time.monotonic()))
+        if process.is_alive():
+            process.kill()
+    public.close()
+
+
+if __name__ == "__main__":
+    main()
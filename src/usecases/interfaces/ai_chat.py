@@ -1,8 +1,9 @@
 from typing import AsyncGenerator, Protocol
+from uuid import UUID
 from src.domain.message.message import Message
 from src.domain.metrics.metrics import MetricsBlock1, MetricsBlock2, MetricsBlock3
 from src.domain.task.task import Task
-from src.domain.test.test import CodeTestSuite
+from src.domain.test.test import CodeTestCase, CodeTestSuite
 from src.domain.vacancy.vacancy import VacancyInfo
 
 
@@ -110,9 +111,24 @@ class AIChatBase(Protocol):
         vacancy_info: VacancyInfo,
         chat_history: list[Message],
         task: Task,
+        attempts: int | None = None,
     ) -> CodeTestSuite:
         """
         Create a test suite for a coding task.
+
+        :param attempts: generations to try before failing, LLM_JSON_MAX_ATTEMPTS by default
+        """
+        ...
+
+    async def stream_test_suite(
+        self,
+        vacancy_info: VacancyInfo,
+        chat_history: list[Message],
+        task: Task,
+    ) -> AsyncGenerator[CodeTestCase, None]:
+        """
+        Stream the test suite for a coding task, yielding each test as soon as
+        the model finishes it. Malformed tests are skipped.
         """
         ...
 
@@ -127,4 +143,10 @@ class AIChatBase(Protocol):
         """
         Check the solution for a coding task.
         """
-        ...
\ No newline at end of file
+        ...
+
+    def forget_room(self, room_id: UUID) -> None:
+        """
+        Release what is kept for a finished room, e.g. its sticky LLM endpoint.
+        """
+        ...
@@ -1,6 +1,7 @@
 from typing import Any, Protocol
 from src.domain.vacancy.vacancy import VacancyInfo
-from src.domain.room.room import Room, Solution, Interviewee
+from src.domain.generation.generation import GenerationKind, RoomEvent
+from src.domain.room.room import Room, RoomStats, Solution, Interviewee
 from src.domain.task.task import Task, TaskMetadata
 from src.domain.test.test import CodeTestCase
 from uuid import UUID
@@ -68,6 +69,35 @@ class InterviewServiceBase(Protocol):
         """
         ...
 
+    async def stream_generation(
+        self,
+        room_id: UUID,
+        kind: GenerationKind,
+        last_event_id: str | None = None,
+    ) -> AsyncGenerator[tuple[str, str], None]:
+        """
+        Streams (event id, chunk) of a room generation, resuming after last_event_id
+        """
+        ...
+
+    async def observe(self, room_id: UUID) -> AsyncGenerator[RoomEvent | None, None]:
+        """
+        Streams events of the room to an observer, None when idle
+        """
+        ...
+
+    async def get_room_stats(self) -> RoomStats:
+        """
+        Gets resident and spilled room counts with accounted memory
+        """
+        ...
+
+    def resume_spilled_rooms(self) -> int:
+        """
+        Adopts the rooms of this worker left on disk by a previous process
+        """
+        ...
+
     async def stop_room(self, room_id: UUID) -> None:
         """
         Stops the room with the given id
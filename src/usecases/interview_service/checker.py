@@ -0,0 +1,233 @@
+"""
+Comparison of a program's stdout with the expected output of a test.
+
+Checkers are selected by a spec string, per test (`CodeTestCase.checker`) or
+by default (TEST_CHECKER):
+
+    exact             whole output equal after stripping surrounding whitespace
+    lines             line by line, ignoring CR, trailing whitespace of every
+                      line and trailing empty lines
+    tokens            whitespace-separated tokens equal, layout ignored
+    numeric[:eps]     tokens, numbers equal within absolute or relative eps
+    unordered_lines   same lines as `lines`, in any order
+
+Outputs are normalized and compared in blocks of about 64 KiB with C-level
+string operations, never as stripped, split or normalized copies of the whole
+text: multi-megabyte stdout is compared in one pass with memory bounded by the
+block size (the expected output for unordered_lines), and the first
+differing block ends the comparison.
+
+More checkers can be added with `register_checker`.
+"""
+
+import math
+import re
+from collections import Counter
+from collections.abc import Callable, Iterator
+from itertools import zip_longest
+
+from loguru import logger
+
+Checker = Callable[[str, str], bool]
+"""checker(expected, actual) -> whether the actual output is accepted"""
+
+_TOKEN = re.compile(r"\S+")
+_NEWLINE = re.compile(r"\n")
+_WHITESPACE = re.compile(r"\s")
+_TRAILING_SPACE = re.compile(r"[^\S\n]+(?=\n)")
+_BLOCK_CHARS = 64 * 1024
+_DEFAULT_EPSILON = 1e-6
+
+_factories: dict[str, Callable[[str | None], Checker]] = {}
+
+
+def register_checker(name: str, factory: Callable[[str | None], Checker]) -> None:
+    """
+    Make a checker available under `name`; the factory gets the text after
+    the colon of the spec, None without one
+    """
+    _factories[name] = factory
+
+
+def checker_names() -> list[str]:
+    """
+    Names of the registered checkers
+    """
+    return sorted(_factories)
+
+
+def get_checker(spec: str) -> Checker:
+    """
+    Checker for a spec like "lines" or "numeric:1e-9"
+    """
+    name, _, argument = spec.strip().partition(":")
+    factory = _factories.get(name)
+    if factory is None:
+        raise ValueError(f"Unknown output checker {name}")
+    return factory(argument or None)
+
+
+def check_output(expected: str, actual: str | None, spec: str) -> bool:
+    """
+    Whether `actual` is accepted for `expected` by the checker of `spec`
+    """
+    actual = actual or ""
+    # Identical outputs pass every checker, compared in C without walking them
+    if expected == actual:
+        return True
+    try:
+        checker = get_checker(spec)
+    except ValueError as e:
+        logger.warning(f"{e}, comparing lines")
+        checker = lines_equal
+    return checker(expected, actual)
+
+
+def _blocks(text: str, boundary: re.Pattern[str]) -> Iterator[str]:
+    """
+    Text in slices of about _BLOCK_CHARS, each cut right after a boundary match
+    """
+    start = 0
+    length = len(text)
+    while start < length:
+        match = boundary.search(text, min(start + _BLOCK_CHARS, length))
+        end = match.end() if match else length
+        yield text[start:end]
+        start = end
+
+
+def line_blocks(text: str) -> Iterator[str]:
+    """
+    Text normalized for line comparison, in blocks: CR and trailing whitespace
+    of every line removed, every line ended by a newline, trailing empty
+    lines left out
+    """
+    pending_blank = 0
+    for block in _blocks(text, _NEWLINE):
+        if not block.endswith("\n"):
+            block += "\n"
+        block = _TRAILING_SPACE.sub("", block)
+        content = block.rstrip("\n")
+        if not content:
+            pending_blank += len(block)
+            continue
+        # Empty lines only count when something follows them
+        yield "\n" * pending_blank + content + "\n"
+        pending_blank = len(block) - len(content) - 1
+
+
+def token_blocks(text: str) -> Iterator[str]:
+    """
+    Text normalized for token comparison, in blocks: every token followed by one space
+    """
+    for block in _blocks(text, _WHITESPACE):
+        tokens = block.split()
+        if tokens:
+            yield " ".join(tokens) + " "
+
+
+def iter_tokens(text: str) -> Iterator[str]:
+    """
+    Whitespace-separated tokens of text
+    """
+    for match in _TOKEN.finditer(text):
+        yield match.group()
+
+
+def streams_equal(left: Iterator[str], right: Iterator[str]) -> bool:
+    """
+    Whether two streams of non-empty text blocks concatenate to the same text
+    """
+    a = b = ""
+    while True:
+        if not a:
+            a = next(left, None)
+        if not b:
+            b = next(right, None)
+        if a is None or b is None:
+            return a is None and b is None
+        n = min(len(a), len(b))
+        if a[:n] != b[:n]:
+            return False
+        a, b = a[n:], b[n:]
+
+
+def exact_equal(expected: str, actual: str) -> bool:
+    """
+    Outputs equal after stripping surrounding whitespace
+    """
+    return expected.strip() == actual.strip()
+
+
+def lines_equal(expected: str, actual: str) -> bool:
+    """
+    Outputs equal line by line, see line_blocks
+    """
+    return streams_equal(line_blocks(expected), line_blocks(actual))
+
+
+def tokens_equal(expected: str, actual: str) -> bool:
+    """
+    Outputs equal token by token, whatever whitespace separates them
+    """
+    return streams_equal(token_blocks(expected), token_blocks(actual))
+
+
+def _numbers_close(expected: str, actual: str, epsilon: float) -> bool:
+    if expected == actual:
+        return True
+    try:
+        a, b = float(expected), float(actual)
+    except ValueError:
+        return False
+    if math.isnan(a) or math.isnan(b):
+        return math.isnan(a) and math.isnan(b)
+    return math.isclose(a, b, rel_tol=epsilon, abs_tol=epsilon)
+
+
+def numeric_checker(argument: str | None) -> Checker:
+    """
+    Token checker comparing numbers within the epsilon given as argument
+    """
+    epsilon = float(argument) if argument else _DEFAULT_EPSILON
+
+    def numeric_equal(expected: str, actual: str) -> bool:
+        # Usually the tokens are identical, only differing outputs are parsed
+        if tokens_equal(expected, actual):
+            return True
+        return all(
+            a is not None and b is not None and _numbers_close(a, b, epsilon)
+            for a, b in zip_longest(iter_tokens(expected), iter_tokens(actual))
+        )
+
+    return numeric_equal
+
+
+def _line_counts(text: str, limit: int | None = None) -> Counter[str] | None:
+    counts: Counter[str] = Counter()
+    total = 0
+    for block in line_blocks(text):
+        lines = block.split("\n")
+        lines.pop()
+        total += len(lines)
+        if limit is not None and total > limit:
+            return None
+        counts.update(lines)
+    return counts
+
+
+def unordered_lines_equal(expected: str, actual: str) -> bool:
+    """
+    Same lines as the expected output, in any order
+    """
+    expected_counts = _line_counts(expected)
+    # Counting stops once the output has more lines than expected
+    actual_counts = _line_counts(actual, limit=expected_counts.total())
+    return actual_counts == expected_counts
+
+
+register_checker("exact", lambda _: exact_equal)
+register_checker("lines", lambda _: lines_equal)
+register_checker("tokens", lambda _: tokens_equal)
+register_checker("numeric", numeric_checker)
+register_checker("unordered_lines", lambda _: unordered_lines_equal)
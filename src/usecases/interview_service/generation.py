@@ -0,0 +1,156 @@
+import asyncio
+import itertools
+from collections import deque
+from typing import AsyncGenerator
+
+from src.domain.generation.generation import GenerationKind
+
+_numbers = itertools.count(1)
+
+
+def format_event_id(number: int, seq: int) -> str:
+    """
+    Format the SSE event id of a chunk of a generation
+    """
+    return f"{number}.{seq}"
+
+
+def parse_event_id(event_id: str | None) -> tuple[int, int] | None:
+    """
+    Parse an SSE event id (e.g. the Last-Event-ID header) into
+    generation number and chunk sequence, None if it is not ours
+    """
+    if not event_id:
+        return None
+    number, _, seq = event_id.strip().partition(".")
+    try:
+        return int(number), int(seq)
+    except ValueError:
+        return None
+
+
+class ReplayGapError(LookupError):
+    """
+    Chunks a reader still needs were dropped from the replay buffer
+    """
+
+
+class Generation:
+    """
+    A streamed LLM generation of a room, decoupled from HTTP connections.
+
+    The producer appends chunks to a bounded replay buffer, any number of
+    subscribers read it from an arbitrary position and wait for new chunks.
+    Chunks are numbered from 1; once the buffer is full the oldest chunks are
+    dropped, and a subscriber that still needed one of them (it resumed from
+    too far back or fell that far behind) gets ReplayGapError instead of a
+    stream with a hole in it.
+
+    Readers are counted with attach / detach. When the last one detaches from
+    an unfinished generation, its producer task is cancelled after a grace
+    period, unless a reader (e.g. a reconnecting client) attaches again first.
+    """
+
+    def __init__(self, kind: GenerationKind, max_chunks: int):
+        self.kind = kind
+        self.number = next(_numbers)
+        self.done = False
+        self.error: BaseException | None = None
+        self.task: asyncio.Task | None = None
+        self.readers = 0
+        self.abandoned = False
+
+        self._abandon_timer: asyncio.TimerHandle | None = None
+        self._chunks: deque[str] = deque(maxlen=max_chunks)
+        self._first_seq = 1
+        self._last_seq = 0
+        self._changed = asyncio.Event()
+
+    @property
+    def last_seq(self) -> int:
+        """
+        Sequence number of the last produced chunk
+        """
+        return self._last_seq
+
+    def text(self) -> str:
+        """
+        Text currently retained in the replay buffer
+        """
+        return "".join(self._chunks)
+
+    def append(self, chunk: str) -> None:
+        """
+        Add a produced chunk and wake up subscribers
+        """
+        if len(self._chunks) == self._chunks.maxlen:
+            self._first_seq += 1
+        self._chunks.append(chunk)
+        self._last_seq += 1
+        self._notify()
+
+    def attach(self) -> None:
+        """
+        Count a new reader, keeping an abandoned generation from being cancelled
+        """
+        self.readers += 1
+        if self._abandon_timer is not None:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+
+    def detach(self, grace: float) -> None:
+        """
+        Uncount a reader; without readers the producer is cancelled after `grace` seconds
+        """
+        self.readers -= 1
+        if self.readers > 0 or self.done or self.task is None:
+            return
+        if grace <= 0:
+            self._abandon()
+        elif self._abandon_timer is None:
+            self._abandon_timer = asyncio.get_running_loop().call_later(grace, self._abandon)
+
+    def _abandon(self) -> None:
+        self._abandon_timer = None
+        if self.readers == 0 and not self.done and self.task is not None:
+            self.abandoned = True
+            self.task.cancel()
+
+    def finish(self, error: BaseException | None = None) -> None:
+        """
+        Mark the generation as finished, optionally with an error
+        """
+        self.done = True
+        self.error = error
+        if self._abandon_timer is not None:
+            self._abandon_timer.cancel()
+            self._abandon_timer = None
+        self._notify()
+
+    def _notify(self) -> None:
+        changed, self._changed = self._changed, asyncio.Event()
+        changed.set()
+
+    async def events(self, after: int = 0) -> AsyncGenerator[tuple[str, str], None]:
+        """
+        Yield (event id, chunk) for every chunk after the given sequence number,
+        waiting for new ones until the generation finishes
+        """
+        seq = after + 1
+
+        while True:
+            while seq <= self._last_seq:
+                if seq < self._first_seq:
+                    raise ReplayGapError(
+                        f"Chunks {seq}-{self._first_seq - 1} of generation {self.number} "
+                        f"are no longer buffered"
+                    )
+                yield format_event_id(self.number, seq), self._chunks[seq - self._first_seq]
+                seq += 1
+
+            if self.done:
+                if self.error is not None:
+                    raise self.error
+                return
+
+            await self._changed.wait()
@@ -0,0 +1,116 @@
+import asyncio
+from collections import deque
+from typing import AsyncGenerator
+
+from src.core.metrics import registry
+from src.domain.generation.generation import RoomEvent
+
+_dropped_events_total = registry.counter(
+    "observer_events_dropped_total",
+    "Room events dropped for observers that did not keep up",
+)
+
+
+class Subscription:
+    """
+    Bounded event queue of a single observer.
+
+    When the queue is full the oldest event is dropped, so a slow observer
+    lags behind instead of slowing down the publisher. The number of dropped
+    events is reported to the observer as a "lagged" event.
+    """
+
+    def __init__(self, max_events: int):
+        self.dropped = 0
+        self.closed = False
+
+        self._events: deque[RoomEvent] = deque()
+        self._max_events = max_events
+        self._wakeup = asyncio.Event()
+
+    def push(self, event: RoomEvent) -> None:
+        """
+        Enqueue an event without waiting
+        """
+        if len(self._events) >= self._max_events:
+            self._events.popleft()
+            self.dropped += 1
+            _dropped_events_total.inc()
+        self._events.append(event)
+        self._wakeup.set()
+
+    def close(self) -> None:
+        """
+        Finish the subscription once queued events are delivered
+        """
+        self.closed = True
+        self._wakeup.set()
+
+    async def events(self, idle_timeout: float = 0.0) -> AsyncGenerator[RoomEvent | None, None]:
+        """
+        Yield queued events, None after `idle_timeout` seconds without any
+        so the caller can send a heartbeat
+        """
+        while True:
+            if self.dropped:
+                dropped, self.dropped = self.dropped, 0
+                yield RoomEvent(type="lagged", content=str(dropped))
+
+            while self._events:
+                yield self._events.popleft()
+                if self.dropped:
+                    break
+            else:
+                if self.closed:
+                    return
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), idle_timeout or None)
+                except asyncio.TimeoutError:
+                    yield None
+
+
+class RoomHub:
+    """
+    Publish / subscribe hub of a room.
+
+    Published events are shared between subscribers, not copied, and
+    publishing never waits for any of them.
+    """
+
+    def __init__(self, max_events: int):
+        self._max_events = max_events
+        self._subscribers: set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def publish(self, event: RoomEvent) -> None:
+        """
+        Broadcast an event to all subscribers
+        """
+        for subscription in self._subscribers:
+            subscription.push(event)
+
+    def subscribe(self) -> Subscription:
+        """
+        Attach a new subscriber
+        """
+        subscription = Subscription(self._max_events)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        """
+        Detach a subscriber
+        """
+        self._subscribers.discard(subscription)
+
+    def close(self) -> None:
+        """
+        Finish all subscriptions
+        """
+        for subscription in self._subscribers:
+            subscription.close()
+        self._subscribers.clear()
@@ -0,0 +1,345 @@
+import asyncio
+import os
+import pickle
+import stat
+import sys
+import tempfile
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Iterator
+from uuid import UUID, uuid4
+
+from loguru import logger
+
+from src.domain.room.room import Room, RoomStats
+
+
+def room_size(room: Room) -> int:
+    """
+    Approximate resident size of a room in bytes: chat history, tasks,
+    solutions and the current test suite with its run results
+    """
+    size = sys.getsizeof(room)
+
+    for message in room.chat_history:
+        size += sys.getsizeof(message) + sys.getsizeof(message.content)
+    for task in room.tasks:
+        size += sys.getsizeof(task) + sys.getsizeof(task.description)
+    for solution in room.solutions:
+        size += sys.getsizeof(solution) + sys.getsizeof(solution.content)
+
+    if room.current_test_suite is not None:
+        for test in room.current_test_suite.tests:
+            size += (
+                sys.getsizeof(test)
+                + sys.getsizeof(test.input_data)
+                + sys.getsizeof(test.expected_output)
+                + sys.getsizeof(test.stdout or "")
+                + sys.getsizeof(test.stderr or "")
+            )
+
+    return size
+
+
+class RoomStore:
+    """
+    Room registry with a memory ceiling.
+
+    Behaves like a dict of rooms. Resident rooms are kept in LRU order; when
+    their accounted size exceeds `memory_limit` bytes, the least recently used
+    ones are pickled to `spill_dir` and loaded back transparently on access.
+    Pinned rooms (with work in flight holding a reference) are never spilled.
+
+    Spills are written by a worker thread; the room stays resident until its
+    file is complete, and a room used meanwhile is kept. `spill_dir` must be
+    private to the service user (created with mode 0o700): rooms are only
+    read from a directory nobody else can write to.
+
+    Rooms spilled by another process sharing `spill_dir` (e.g. a recycled
+    worker) are adopted on access or by `adopt_spilled` and reported through
+    `on_adopt`.
+    """
+
+    def __init__(self, memory_limit: int, spill_dir: str | Path):
+        self.memory_limit = memory_limit
+        self.spill_dir = Path(spill_dir)
+        self.on_adopt: Callable[[Room], None] | None = None
+
+        self._resident: OrderedDict[UUID, Room] = OrderedDict()
+        # Size is recomputed only when the room version or its tests changed
+        self._sizes: dict[UUID, tuple[tuple[int, int], int]] = {}
+        self._resident_bytes = 0
+        self._spilled: set[UUID] = set()
+        self._pins: dict[UUID, int] = {}
+        # Accounted size of rooms being written by a thread
+        self._spilling: dict[UUID, int] = {}
+        self._spilling_bytes = 0
+        self._called_off: set[UUID] = set()
+        self._tasks: set[asyncio.Task] = set()
+        self._dir_checked = False
+
+    def __contains__(self, room_id: object) -> bool:
+        if room_id in self._resident or room_id in self._spilled:
+            return True
+        return isinstance(room_id, UUID) and self._on_disk(room_id)
+
+    def __len__(self) -> int:
+        return len(self._resident) + len(self._spilled)
+
+    def __getitem__(self, room_id: UUID) -> Room:
+        room = self._resident.get(room_id)
+        if room is None:
+            adopted = room_id not in self._spilled
+            if adopted and not self._on_disk(room_id):
+                raise KeyError(room_id)
+            room = self._load(room_id)
+            if adopted and self.on_adopt is not None:
+                self.on_adopt(room)
+        else:
+            self._resident.move_to_end(room_id)
+            self._call_off_spill(room_id)
+
+        self._account(room_id, room)
+        self._enforce(keep=room_id)
+        return room
+
+    def __setitem__(self, room_id: UUID, room: Room) -> None:
+        if room_id in self._spilled:
+            self._remove_file(room_id)
+        self._call_off_spill(room_id)
+        self._resident[room_id] = room
+        self._resident.move_to_end(room_id)
+        self._account(room_id, room)
+        self._enforce(keep=room_id)
+
+    def __delitem__(self, room_id: UUID) -> None:
+        if room_id in self._resident:
+            self._call_off_spill(room_id)
+            del self._resident[room_id]
+            _, size = self._sizes.pop(room_id)
+            self._resident_bytes -= size
+        elif room_id in self:
+            self._remove_file(room_id)
+        else:
+            raise KeyError(room_id)
+
+    def get(self, room_id: UUID, default: Room | None = None) -> Room | None:
+        """
+        Get a room, loading it back if it was spilled
+        """
+        return self[room_id] if room_id in self else default
+
+    @contextmanager
+    def pinned(self, room_id: UUID) -> Iterator[None]:
+        """
+        Keep the room resident while the block runs
+        """
+        self.pin(room_id)
+        try:
+            yield
+        finally:
+            self.unpin(room_id)
+
+    def pin(self, room_id: UUID) -> None:
+        """
+        Keep the room resident until the matching `unpin`
+        """
+        self._pins[room_id] = self._pins.get(room_id, 0) + 1
+        self._call_off_spill(room_id)
+
+    def unpin(self, room_id: UUID) -> None:
+        """
+        Release a pin taken with `pin`
+        """
+        count = self._pins.pop(room_id) - 1
+        if count:
+            self._pins[room_id] = count
+
+    def spill_all(self) -> int:
+        """
+        Spill every resident room, pinned or not, e.g. before the process exits.
+        Written right away on the calling thread. Returns the number of spilled rooms
+        """
+        room_ids = list(self._resident)
+        for room_id in room_ids:
+            self._call_off_spill(room_id)
+            self._spill_now(room_id)
+        return len(room_ids) - len(self._resident)
+
+    def adopt_spilled(self, owned: Callable[[UUID], bool]) -> int:
+        """
+        Adopt the rooms left in the spill directory by previous processes that
+        `owned` accepts, reporting each through `on_adopt`. Returns their number
+        """
+        if not self._check_dir():
+            return 0
+        adopted = 0
+        for path in self.spill_dir.glob("*.pickle"):
+            try:
+                room_id = UUID(path.stem)
+            except ValueError:
+                continue
+            if room_id in self._spilled or room_id in self._resident or not owned(room_id):
+                continue
+            self[room_id]
+            adopted += 1
+        return adopted
+
+    def stats(self) -> RoomStats:
+        """
+        Resident and spilled rooms with accounted memory
+        """
+        return RoomStats(
+            resident=len(self._resident),
+            spilled=len(self._spilled),
+            pinned=len(self._pins),
+            resident_bytes=self._resident_bytes,
+            memory_limit=self.memory_limit,
+        )
+
+    def _account(self, room_id: UUID, room: Room) -> None:
+        suite = room.current_test_suite
+        key = (room.version, len(suite.tests) if suite is not None else -1)
+
+        cached = self._sizes.get(room_id)
+        if cached is not None:
+            if cached[0] == key:
+                return
+            self._resident_bytes -= cached[1]
+
+        size = room_size(room)
+        self._sizes[room_id] = (key, size)
+        self._resident_bytes += size
+
+    def _enforce(self, keep: UUID) -> None:
+        if self._resident_bytes - self._spilling_bytes <= self.memory_limit:
+            return
+
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+
+        for room_id in list(self._resident):
+            if self._resident_bytes - self._spilling_bytes <= self.memory_limit:
+                break
+            if room_id == keep or room_id in self._pins or room_id in self._spilling:
+                continue
+            if loop is None:
+                self._spill_now(room_id)
+                continue
+            key, size = self._sizes[room_id]
+            self._spilling[room_id] = size
+            self._spilling_bytes += size
+            task = loop.create_task(self._spill(room_id, self._resident[room_id], key))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _spill(self, room_id: UUID, room: Room, key: tuple[int, int]) -> None:
+        try:
+            await asyncio.to_thread(self._write, room_id, room)
+            written = True
+        except Exception as e:
+            logger.error(f"Could not spill room {room_id}: {e}")
+            written = False
+        finally:
+            self._spilling_bytes -= self._spilling.pop(room_id)
+            called_off = room_id in self._called_off
+            self._called_off.discard(room_id)
+
+        if not written or room_id in self._spilled:
+            return
+        # Used, changed or removed while it was written: the file is stale
+        changed = self._sizes.get(room_id, (None,))[0] != key
+        if called_off or changed or self._resident.get(room_id) is not room:
+            self._path(room_id).unlink(missing_ok=True)
+            return
+        self._evict(room_id)
+
+    def _spill_now(self, room_id: UUID) -> None:
+        try:
+            self._write(room_id, self._resident[room_id])
+        except OSError as e:
+            logger.error(f"Could not spill room {room_id}: {e}")
+            return
+        self._evict(room_id)
+
+    def _call_off_spill(self, room_id: UUID) -> None:
+        if room_id in self._spilling:
+            self._called_off.add(room_id)
+
+    def _evict(self, room_id: UUID) -> None:
+        del self._resident[room_id]
+        _, size = self._sizes.pop(room_id)
+        self._resident_bytes -= size
+        self._spilled.add(room_id)
+        logger.info(f"Spilled room {room_id} ({size} bytes) to {self._path(room_id)}")
+
+    def _path(self, room_id: UUID) -> Path:
+        return self.spill_dir / f"{room_id}.pickle"
+
+    def _check_dir(self) -> bool:
+        """
+        Create the spill directory, False if it is not private to this user
+        """
+        if self._dir_checked:
+            return True
+        try:
+            ensure_private_dir(self.spill_dir)
+        except OSError as e:
+            logger.error(f"Rooms are not spilled to or loaded from {self.spill_dir}: {e}")
+            return False
+        self._dir_checked = True
+        return True
+
+    def _on_disk(self, room_id: UUID) -> bool:
+        return self._check_dir() and self._path(room_id).exists()
+
+    def _write(self, room_id: UUID, room: Room) -> None:
+        if not self._check_dir():
+            raise PermissionError(f"Spill directory {self.spill_dir} is not private")
+        path = self._path(room_id)
+        # Unique, a room being spilled in the background may be written at shutdown too
+        tmp = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump(room, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+
+    def _load(self, room_id: UUID) -> Room:
+        path = self._path(room_id)
+        with open(path, "rb") as f:
+            room: Room = pickle.load(f)
+        self._remove_file(room_id)
+
+        self._resident[room_id] = room
+        logger.info(f"Loaded spilled room {room_id}")
+        return room
+
+    def _remove_file(self, room_id: UUID) -> None:
+        self._spilled.discard(room_id)
+        try:
+            self._path(room_id).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def ensure_private_dir(path: Path) -> None:
+    """
+    Create a directory only the current user can access, or check that an
+    existing one is
+    """
+    path.mkdir(mode=0o700, parents=True, exist_ok=True)
+    info = path.lstat()
+    if not stat.S_ISDIR(info.st_mode) or info.st_uid != os.getuid():
+        raise PermissionError(f"{path} is not a directory owned by uid {os.getuid()}")
+    # Files may have been planted while others could write to it
+    if info.st_mode & 0o077:
+        raise PermissionError(f"{path} is accessible to other users, expected mode 0700")
+
+
+def default_spill_dir() -> Path:
+    """
+    Spill directory used when none is configured
+    """
+    return Path(tempfile.gettempdir()) / f"interview-service-rooms-{os.getuid()}"
@@ -1,14 +1,17 @@
 from src.domain.message.message import Message, RoleEnum, TypeEnum
-from src.domain.room.room import Room, Solution, SolutionType, Interviewee
+from src.domain.room.room import Room, RoomStats, Solution, SolutionType, Interviewee
 from src.domain.task.task import Task, TaskMetadata, TaskType
 from src.domain.test.test import CodeTestCase, CodeTestSuite
 from src.domain.vacancy.vacancy import VacancyInfo
-from uuid import UUID, uuid4
+from uuid import UUID
 from src.usecases.interfaces.interview_service import InterviewServiceBase
 from typing import AsyncGenerator, Any
 from src.usecases.interfaces.vacancy_service import VacancyServiceBase
 from src.usecases.interfaces.ai_chat import AIChatBase
 import asyncio
+import time
+import weakref
+from contextlib import aclosing
 from datetime import datetime, timedelta
 from loguru import logger
 from src.domain.metrics.metrics import MetricsBlock1
@@ -16,6 +19,33 @@ from src.domain.metrics.metrics import MetricsBlock1
 from src.usecases.interfaces.code_run_service import CodeRunServiceBase
 from src.domain.test.run_result import RunResult
 from datetime import datetime
+from src.core.context import current_room_id
+from src.core.log import truncate
+from src.core.metrics import registry
+from src.core.setting import settings
+from src.core.tracing import current_span, span, traced
+from src.core.workers import is_draining, new_room_id, owns_room
+from src.domain.generation.generation import GenerationKind, RoomEvent
+from src.usecases.interview_service.checker import check_output
+from src.usecases.interview_service.generation import (
+    Generation,
+    format_event_id,
+    parse_event_id,
+)
+from src.usecases.interview_service.hub import RoomHub
+from src.usecases.interview_service.room_store import RoomStore, default_spill_dir
+
+_active_rooms = registry.gauge("rooms_active", "Rooms in memory or spilled to disk")
+_pending_timers = registry.gauge("room_timers_pending", "Rooms waiting for their expiry")
+_abandoned_generations_total = registry.counter(
+    "generations_abandoned_total",
+    "Generations cancelled because every reader disconnected",
+    labels=("kind",),
+)
+_stop_room_seconds = registry.histogram(
+    "room_stop_seconds",
+    "Duration of stopping a room, including metrics generation and sending results",
+)
 
 
 class InterviewService(InterviewServiceBase):
@@ -23,11 +53,18 @@ class InterviewService(InterviewServiceBase):
     Interview service implementation
     """
 
-    _room_sessions: dict[UUID, Any] = {}
+    _room_sessions = RoomStore(
+        memory_limit=settings.room_memory_limit_mb * 1024 * 1024,
+        spill_dir=settings.room_spill_dir or default_spill_dir(),
+    )
+    _generations: dict[tuple[UUID, GenerationKind], Generation] = {}
+    _hubs: dict[UUID, RoomHub] = {}
+    # Kept only while held or awaited, ids of unknown rooms leave nothing behind
+    _room_locks: weakref.WeakValueDictionary[UUID, asyncio.Lock] = weakref.WeakValueDictionary()
+    _background_tasks: set[asyncio.Task] = set()
     _instance = None
 
     def __new__(cls, *args, **kwargs):
-        logger.info(cls._instance)
         if cls._instance is None:
             cls._instance = super().__new__(cls)
         return cls._instance
@@ -41,7 +78,9 @@ class InterviewService(InterviewServiceBase):
         self.vacancy_service = vacancy_service
         self.ai_chat = ai_chat
         self.code_run_service = code_run_service
+        InterviewService._room_sessions.on_adopt = self._adopt_room
 
+    @traced("InterviewService.create_room")
     async def create_room(self, vacancy_id: UUID, interviewee: Interviewee) -> Room:
         """
         Creates a new room for the given vacancy
@@ -49,6 +88,10 @@ class InterviewService(InterviewServiceBase):
 
         logger.info(f"Creating room for vacancy {vacancy_id}")
 
+        room_id = new_room_id()
+        current_room_id.set(room_id)
+        current_span().set_attribute("room_id", str(room_id))
+
         vacancy_info = await self.vacancy_service.get_vacancy(vacancy_id)
         vacancy_info = await self.ai_chat.create_chat(
             vacancy_info=vacancy_info,
@@ -56,7 +99,7 @@ class InterviewService(InterviewServiceBase):
         )
 
         room = Room(
-            id=uuid4(),
+            id=room_id,
             vacancy_id=vacancy_id,
             vacancy_info=vacancy_info,
             interviewee=interviewee,
@@ -78,7 +121,7 @@ class InterviewService(InterviewServiceBase):
         InterviewService._room_sessions[room.id] = room
         logger.info(f"Created room {room.id}")
 
-        asyncio.create_task(self._stop_room_in(room.id))
+        self._spawn(self._stop_room_in(room.id))
 
         return room
 
@@ -89,7 +132,12 @@ class InterviewService(InterviewServiceBase):
         Generates a welcome message for the room with the given id
         """
 
-        logger.info(InterviewService._room_sessions)
+        async for _, chunk in self.stream_generation(room_id, GenerationKind.WELCOME):
+            yield chunk
+
+    async def _produce_welcome_message(self, room_id: UUID) -> AsyncGenerator[str, None]:
+        current_room_id.set(room_id)
+        logger.info(f"Generating welcome message for room {room_id}")
 
         room = InterviewService._room_sessions[room_id]
         stream = await self.ai_chat.generate_welcome_message(
@@ -103,11 +151,13 @@ class InterviewService(InterviewServiceBase):
             content="",
         )
 
-        async for chunk in stream:  # type: ignore
-            message.content += chunk
-            yield chunk
-
-        room.chat_history.append(message)
+        with span("welcome.body"):
+            try:
+                async for chunk in stream:  # type: ignore
+                    message.content += chunk
+                    yield chunk
+            finally:
+                self._commit_reply(room, message)
 
     async def get_room(self, room_id: UUID) -> Room:
         """
@@ -115,24 +165,37 @@ class InterviewService(InterviewServiceBase):
         """
         return InterviewService._room_sessions[room_id]
 
+    @traced("InterviewService.send_solution")
     async def send_solution(self, room_id: UUID, solution: Solution):
         """
         Sends the solution to the room with the given id
         """
 
-        logger.info(f"Sending solution {solution.content}")
+        logger.info(
+            f"Sending {solution.solution_type} solution of {len(solution.content)} chars "
+            f"to room {room_id}"
+        )
+        logger.opt(lazy=True).debug("Solution: {}", lambda: truncate(solution.content))
 
-        room: Room = InterviewService._room_sessions[room_id]
-        room.solutions.append(solution)
+        # Waits for the current turn, so the solution follows its response
+        async with self._room_lock(room_id):
+            room: Room = InterviewService._room_sessions[room_id]
+            room.solutions.append(solution)
 
-        room.metrics_block1.copy_paste_suspicion += solution.count_suspicious_copy_paste
+            room.metrics_block1.copy_paste_suspicion += solution.count_suspicious_copy_paste
 
-        room.chat_history.append(
-            Message(
-                role=RoleEnum.USER, type=TypeEnum.SOLUTION, content=solution.content
+            room.chat_history.append(
+                Message(
+                    role=RoleEnum.USER, type=TypeEnum.SOLUTION, content=solution.content
+                )
             )
+            room.touch()
+        self._publish(
+            room_id,
+            RoomEvent(type="message", kind=str(TypeEnum.SOLUTION), content=solution.content),
         )
 
+    @traced("InterviewService.run_code")
     async def run_code(
         self, room_id: UUID, language: str, code: str
     ) -> list[CodeTestCase]:
@@ -152,7 +215,7 @@ class InterviewService(InterviewServiceBase):
         ]
 
         async def run_test(test: CodeTestCase) -> CodeTestCase:
-            logger.info(f"Running test {test.id}")
+            logger.debug(f"Running test {test.id}")
             result = await self.code_run_service.run_code(
                 language, test.input_data, code
             )
@@ -163,12 +226,18 @@ class InterviewService(InterviewServiceBase):
             test.stdout = result.stdout
             test.stderr = result.stderr
             test.execution_time = result.execution_time
-            test.correct = test.expected_output.strip() == (result.stdout or "").strip()
+            test.correct = check_output(
+                test.expected_output, result.stdout, test.checker or settings.test_checker
+            )
 
             return test
 
         test_runs = [run_test(run) for run in not_hidden_tests]
-        run_results: list[CodeTestCase] = await asyncio.gather(*test_runs)
+        # Results are written to this room object, it must not be spilled meanwhile
+        with InterviewService._room_sessions.pinned(room_id):
+            run_results: list[CodeTestCase] = await asyncio.gather(*test_runs)
+            # Its size changed, the store recounts it
+            room.touch()
 
         return run_results
 
@@ -177,51 +246,124 @@ class InterviewService(InterviewServiceBase):
         Gets the solution response for the room with the given id
         """
 
+        async for _, chunk in self.stream_generation(room_id, GenerationKind.SOLUTION_RESPONSE):
+            yield chunk
+
+    async def _produce_solution_response(self, room_id: UUID) -> AsyncGenerator[str, None]:
         logger.info(f"Getting solution response for room {room_id}")
+        current_room_id.set(room_id)
 
         room = InterviewService._room_sessions[room_id]
-        stream, user_message, ai_message = await self.ai_chat.create_response(
-            room.vacancy_info,
-            room.chat_history,
-            room.tasks[-1],
-        )
-
-        async for chunk in stream:  # type: ignore
-            ai_message.content += chunk
-            yield chunk
+        with span("response.ctrl"):
+            stream, user_message, ai_message = await self.ai_chat.create_response(
+                room.vacancy_info,
+                room.chat_history,
+                room.tasks[-1],
+            )
 
-        room.chat_history.append(ai_message)
+        with span("response.body"):
+            try:
+                async for chunk in stream:  # type: ignore
+                    ai_message.content += chunk
+                    yield chunk
+            finally:
+                self._commit_reply(room, ai_message)
 
     async def new_task(self, room_id: UUID) -> AsyncGenerator[str, None]:
         """
         Creates a new task for the room with the given id
         """
 
+        async for _, chunk in self.stream_generation(room_id, GenerationKind.TASK):
+            yield chunk
+
+    async def _produce_task(self, room_id: UUID) -> AsyncGenerator[str, None]:
         logger.info(f"Creating new task for room {room_id}")
+        current_room_id.set(room_id)
 
         room = InterviewService._room_sessions[room_id]
-        stream, task = await self.ai_chat.create_task(
-            room.vacancy_info,
-            room.chat_history,
-        )
+        # Waits for the control block of the reply: task type and language
+        with span("task.ctrl"):
+            stream, task = await self.ai_chat.create_task(
+                room.vacancy_info,
+                room.chat_history,
+            )
 
-        async for chunk in stream:  # type: ignore
-            task.description += chunk
-            yield chunk
+        # A task cut short is discarded, the next task request generates a new one
+        with span("task.body", task_type=str(task.type)):
+            async for chunk in stream:  # type: ignore
+                task.description += chunk
+                yield chunk
 
         room.chat_history.append(
             Message(role=RoleEnum.AI, type=TypeEnum.TASK, content=task.description)
         )
         room.vacancy_info.tasks.append(task)
         room.tasks.append(task)
+        room.touch()
 
         if task.type == TaskType.CODE:
-            room.current_test_suite = await self.ai_chat.create_test_suite(
+            # Tests are attached while they stream in, so visible ones can be run
+            # before the hidden ones are generated
+            room.current_test_suite = CodeTestSuite(
+                task_id=getattr(task, "id", "task_without_id"),
+                tests=[],
+            )
+            # Pinned from here, so the room object the task writes to is never spilled
+            InterviewService._room_sessions.pin(room.id)
+            self._spawn(self._fill_test_suite(room, task, room.current_test_suite))
+
+    async def _fill_test_suite(self, room: Room, task: Task, suite: CodeTestSuite) -> None:
+        """
+        Stream generated tests into the test suite of the room
+        """
+
+        current_room_id.set(room.id)
+
+        try:
+            with span("task.test_suite"):
+                await self._stream_test_suite(room, task, suite)
+        finally:
+            InterviewService._room_sessions.unpin(room.id)
+
+    async def _stream_test_suite(self, room: Room, task: Task, suite: CodeTestSuite) -> None:
+        try:
+            async for case in self.ai_chat.stream_test_suite(
                 room.vacancy_info,
                 room.chat_history,
                 task,
-            )
-
+            ):
+                if room.current_test_suite is not suite:
+                    logger.info(f"Test suite of room {room.id} replaced, stopping generation")
+                    return
+                suite.tests.append(case)
+                room.touch()
+
+            if not suite.tests:
+                logger.warning(f"No tests streamed for room {room.id}, regenerating once")
+                generated = await self.ai_chat.create_test_suite(
+                    room.vacancy_info,
+                    room.chat_history,
+                    task,
+                    attempts=1,
+                )
+                if room.current_test_suite is suite:
+                    suite.tests.extend(generated.tests)
+                    room.touch()
+        except Exception as e:
+            logger.error(f"Failed to generate test suite for room {room.id}: {e}")
+            # Otherwise the candidate just sees a task without tests
+            if room.current_test_suite is suite:
+                self._publish(
+                    room.id,
+                    RoomEvent(
+                        type="error",
+                        kind="test_suite",
+                        content=f"Test generation failed: {e}",
+                    ),
+                )
+
+    @traced("InterviewService.get_current_task_metadata")
     async def get_current_task_metadata(self, room_id: UUID) -> TaskMetadata:
         """
         Gets the current task metadata for the room with the given id
@@ -235,20 +377,27 @@ class InterviewService(InterviewServiceBase):
             language=room.tasks[-1].language,
         )
 
+    @traced("InterviewService.send_question")
     async def send_question(self, room_id: UUID, question: str):
         """
         Creates a response for the room with the given id
         """
 
-        logger.info(f"Sending question {question} for room {room_id}")
-
-        room = InterviewService._room_sessions[room_id]
-        room.chat_history.append(
-            Message(
-                role=RoleEnum.USER,
-                type=TypeEnum.QUESTION,
-                content=question,
+        logger.info(f"Sending question of {len(question)} chars to room {room_id}")
+        logger.opt(lazy=True).debug("Question: {}", lambda: truncate(question))
+
+        async with self._room_lock(room_id):
+            room = InterviewService._room_sessions[room_id]
+            room.chat_history.append(
+                Message(
+                    role=RoleEnum.USER,
+                    type=TypeEnum.QUESTION,
+                    content=question,
+                )
             )
+            room.touch()
+        self._publish(
+            room_id, RoomEvent(type="message", kind=str(TypeEnum.QUESTION), content=question)
         )
 
     async def get_response(self, room_id: UUID) -> AsyncGenerator[str, None]:
@@ -256,23 +405,175 @@ class InterviewService(InterviewServiceBase):
         Gets the response for the room with the given id
         """
 
+        async for _, chunk in self.stream_generation(room_id, GenerationKind.RESPONSE):
+            yield chunk
+
+    async def _produce_response(self, room_id: UUID) -> AsyncGenerator[str, None]:
         logger.info(f"Getting response for room {room_id}")
+        current_room_id.set(room_id)
 
         room = InterviewService._room_sessions[room_id]
 
-        stream, user_message, ai_message = await self.ai_chat.create_response(
-            room.vacancy_info,
-            room.chat_history,
-            room.tasks[-1],
-        )
-
-        async for chunk in stream:  # type: ignore
-            ai_message.content += chunk
-            yield chunk
+        with span("response.ctrl"):
+            stream, user_message, ai_message = await self.ai_chat.create_response(
+                room.vacancy_info,
+                room.chat_history,
+                room.tasks[-1],
+            )
 
         room.chat_history[-1].type = user_message.type
-        room.chat_history.append(ai_message)
+        with span("response.body"):
+            try:
+                async for chunk in stream:  # type: ignore
+                    ai_message.content += chunk
+                    yield chunk
+            finally:
+                self._commit_reply(room, ai_message)
+
+    async def stream_generation(  # type: ignore
+        self,
+        room_id: UUID,
+        kind: GenerationKind,
+        last_event_id: str | None = None,
+    ) -> AsyncGenerator[tuple[str, str], None]:
+        """
+        Streams (event id, chunk) of a generation of the room.
+
+        A new generation is started unless one of this kind is in flight, then
+        the request attaches to it. With last_event_id the client resumes the
+        buffered generation it was reading. Either way no extra LLM call is made.
+        If the chunks it needs were dropped from the replay buffer the stream
+        raises ReplayGapError.
+
+        Closing this stream (the client went away) detaches the reader; once a
+        generation has had no readers for STREAM_ABANDON_GRACE_SECONDS its LLM
+        call is cancelled.
+        """
+
+        resume = parse_event_id(last_event_id)
+        generation = InterviewService._generations.get((room_id, kind))
+        after = 0
+
+        if generation is not None and generation.abandoned:
+            generation = None
+
+        if resume is not None and generation is not None and generation.number == resume[0]:
+            after = resume[1]
+            logger.info(f"Resuming {kind} generation of room {room_id} after {after}")
+        elif generation is not None and not generation.done:
+            # An overlapping request reads the in-flight stream instead of
+            # starting another LLM call
+            logger.info(f"Attaching to in-flight {kind} generation of room {room_id}")
+        else:
+            generation = self._start_generation(room_id, kind)
+
+        generation.attach()
+        try:
+            async with aclosing(generation.events(after)) as events:
+                async for event in events:
+                    yield event
+        finally:
+            generation.detach(settings.stream_abandon_grace_seconds)
+
+    def _start_generation(self, room_id: UUID, kind: GenerationKind) -> Generation:
+        """
+        Starts a generation of the given kind as a room-scoped background producer
+        """
+
+        if room_id not in InterviewService._room_sessions:
+            raise KeyError(room_id)
+
+        producers = {
+            GenerationKind.WELCOME: self._produce_welcome_message,
+            GenerationKind.SOLUTION_RESPONSE: self._produce_solution_response,
+            GenerationKind.RESPONSE: self._produce_response,
+            GenerationKind.TASK: self._produce_task,
+        }
+
+        generation = Generation(kind, settings.stream_replay_chunks)
+        InterviewService._generations[(room_id, kind)] = generation
+        generation.task = self._spawn(
+            self._run_generation(room_id, generation, producers[kind](room_id))
+        )
+        return generation
+
+    async def _run_generation(
+        self, room_id: UUID, generation: Generation, source: AsyncGenerator[str, None]
+    ) -> None:
+        current_room_id.set(room_id)
+        kind = str(generation.kind)
+        self._publish(room_id, RoomEvent(type="start", kind=kind))
+        with span(
+            "InterviewService.generation", kind=kind, generation=generation.number
+        ) as generation_span:
+            try:
+                # Turns of a room run one at a time, in request order
+                async with self._room_lock(room_id):
+                    generation_span.add_event("room_lock_acquired")
+                    with InterviewService._room_sessions.pinned(room_id):
+                        async for chunk in source:
+                            generation.append(chunk)
+                            self._publish(
+                                room_id,
+                                RoomEvent(
+                                    type="message_chunk",
+                                    kind=kind,
+                                    event_id=format_event_id(generation.number, generation.last_seq),
+                                    content=chunk,
+                                ),
+                            )
+            except asyncio.CancelledError:
+                if generation.abandoned:
+                    logger.info(f"{generation.kind} generation abandoned by its readers, cancelled")
+                    _abandoned_generations_total.labels(kind).inc()
+                generation.finish(RuntimeError(f"{generation.kind} generation was cancelled"))
+                self._publish(room_id, RoomEvent(type="cancelled", kind=kind))
+                raise
+            except Exception as e:
+                logger.error(f"{generation.kind} generation failed: {e}")
+                generation_span.set_status("error")
+                generation.finish(e)
+                self._publish(room_id, RoomEvent(type="error", kind=kind, content=str(e)))
+            else:
+                generation.finish()
+                self._publish(room_id, RoomEvent(type="complete", kind=kind))
+
+    async def observe(self, room_id: UUID) -> AsyncGenerator[RoomEvent | None, None]:  # type: ignore
+        """
+        Streams events of the room to an observer until the room stops.
+        None is yielded when the room is idle, for heartbeats
+        """
+
+        if room_id not in InterviewService._room_sessions:
+            raise KeyError(room_id)
+
+        hub = InterviewService._hubs.get(room_id)
+        if hub is None:
+            hub = InterviewService._hubs[room_id] = RoomHub(settings.observer_queue_size)
+
+        subscription = hub.subscribe()
+        logger.info(f"Observer attached to room {room_id}, {len(hub)} observing")
+        try:
+            async for event in subscription.events(settings.sse_heartbeat_seconds):
+                if event is None and is_draining():
+                    # The worker is stopping, the observer reconnects to its successor
+                    return
+                yield event
+        finally:
+            hub.unsubscribe(subscription)
+
+    def _publish(self, room_id: UUID, event: RoomEvent) -> None:
+        hub = InterviewService._hubs.get(room_id)
+        if hub is not None:
+            hub.publish(event)
+
+    async def get_room_stats(self) -> RoomStats:
+        """
+        Gets resident and spilled room counts with accounted memory
+        """
+        return InterviewService._room_sessions.stats()
 
+    @traced("InterviewService.stop_room")
     async def stop_room(self, room_id: UUID) -> None:
         """
         Stops the room with the given id
@@ -284,10 +585,34 @@ class InterviewService(InterviewServiceBase):
 
         logger.info(f"Stopping room {room_id}")
 
-        room: Room = InterviewService._room_sessions[room_id]
-        del InterviewService._room_sessions[room_id]
+        # Let the running turn commit its messages first
+        async with self._room_lock(room_id):
+            if room_id not in InterviewService._room_sessions:
+                return
+            room: Room = InterviewService._room_sessions[room_id]
+            del InterviewService._room_sessions[room_id]
+        InterviewService._room_locks.pop(room_id, None)
+        for kind in GenerationKind:
+            InterviewService._generations.pop((room_id, kind), None)
+        hub = InterviewService._hubs.pop(room_id, None)
+        if hub is not None:
+            hub.close()
+
+        started = time.perf_counter()
+        try:
+            await self._finish_room(room_id, room)
+        finally:
+            _stop_room_seconds.observe(time.perf_counter() - started)
+            # After the metrics completions, which still run with the room's endpoint
+            self.ai_chat.forget_room(room_id)
+
+    async def _finish_room(self, room_id: UUID, room: Room) -> None:
+        """
+        Computes the metrics of a stopped room and sends its results
+        """
 
         logger.info(f"Getting metrics for room {room_id}")
+        current_room_id.set(room_id)
 
         user_message_len = len(
             [
@@ -298,9 +623,12 @@ class InterviewService(InterviewServiceBase):
         )
 
         room.metrics_block1.time_spent = datetime.now() - room.created_at
+        # A room stopped before any answer has no time per task
         room.metrics_block1.time_per_task = (
-            room.last_task_time - room.created_at
-        ) / user_message_len
+            (room.last_task_time - room.created_at) / user_message_len
+            if user_message_len
+            else timedelta(0)
+        )
         room.metrics_block1.answers_count = user_message_len
 
         metrics1, metrics2, metrics3 = await self.ai_chat.create_metrics(
@@ -353,5 +681,58 @@ class InterviewService(InterviewServiceBase):
 
     async def _stop_room_in(self, room_id: UUID) -> None:
         room = InterviewService._room_sessions[room_id]
-        await asyncio.sleep(room.vacancy_info.duration.total_seconds())
+        ends_at = room.created_at + room.vacancy_info.duration
+        _pending_timers.inc()
+        try:
+            await asyncio.sleep(max(0.0, (ends_at - datetime.now()).total_seconds()))
+        finally:
+            _pending_timers.dec()
         await self.stop_room(room_id)
+
+    def resume_spilled_rooms(self) -> int:
+        """
+        Adopt the rooms of this worker left on disk by a previous process, so
+        they are stopped on time even if nobody opens them again
+        """
+        resumed = InterviewService._room_sessions.adopt_spilled(owns_room)
+        if resumed:
+            logger.info(f"Resumed {resumed} spilled rooms")
+        return resumed
+
+    def _adopt_room(self, room: Room) -> None:
+        """
+        Re-arm the stop timer of a room left on disk by a previous worker
+        """
+        logger.info(f"Adopted room {room.id}")
+        self._spawn(self._stop_room_in(room.id))
+
+    def _room_lock(self, room_id: UUID) -> asyncio.Lock:
+        """
+        Lock sequencing the turns of a room
+        """
+        lock = InterviewService._room_locks.get(room_id)
+        if lock is None:
+            lock = InterviewService._room_locks[room_id] = asyncio.Lock()
+        return lock
+
+    def _commit_reply(self, room: Room, message: Message) -> None:
+        """
+        Append a streamed AI reply to the chat history, also one that was cut
+        short by an error or abandoned by its readers: the history then holds
+        what the candidate saw. Replies without any text are dropped.
+        """
+        if message.content:
+            room.chat_history.append(message)
+        room.touch()
+
+    def _spawn(self, coro: Any) -> asyncio.Task:
+        """
+        Run a coroutine in the background, keeping a reference until it is done
+        """
+        task = asyncio.create_task(coro)
+        InterviewService._background_tasks.add(task)
+        task.add_done_callback(InterviewService._background_tasks.discard)
+        return task
+
+
+_active_rooms.set_function(lambda: len(InterviewService._room_sessions))
@@ -0,0 +1,17 @@
+import pytest
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers", "benchmark: wall-clock regression gate, only run with -m benchmark"
+    )
+
+
+def pytest_collection_modifyitems(config, items):
+    # Timings depend on the machine and its load, they are checked on request
+    if "benchmark" in config.getoption("markexpr", ""):
+        return
+    skip = pytest.mark.skip(reason="wall-clock benchmark, run with -m benchmark")
+    for item in items:
+        if item.get_closest_marker("benchmark"):
+            item.add_marker(skip)
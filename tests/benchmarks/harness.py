@@ -0,0 +1,92 @@
+"""
+Timing, baselines and the regression gate of the micro-benchmarks.
+
+Timings are stored relative to a fixed pure-Python reference workload timed
+in the same process, so baselines recorded on one machine still mean
+something on another. Record new baselines after an intended change with
+
+    python -m tests.benchmarks.harness [--record]
+
+The regression gate is skipped in the default test run, check it with
+
+    python -m pytest tests/benchmarks -m benchmark
+"""
+
+import argparse
+import json
+import timeit
+from collections.abc import Callable
+from pathlib import Path
+
+BASELINES_PATH = Path(__file__).with_name("baselines.json")
+
+
+def seconds_per_call(func: Callable[[], object], repeat: int = 5, min_time: float = 0.02) -> float:
+    """
+    Best-of-`repeat` mean time of one call, each round running at least `min_time`
+    """
+    timer = timeit.Timer(func)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def _reference() -> None:
+    parts = [str(i) for i in range(500)]
+    text = "".join(parts)
+    text.find("<think>")
+    sorted(parts)
+
+
+def reference_seconds() -> float:
+    """
+    Time of the reference workload on this machine
+    """
+    return seconds_per_call(_reference, repeat=7)
+
+
+def relative_cost(func: Callable[[], object]) -> float:
+    """
+    Time of one call in units of the reference workload, timed right after it
+    """
+    return seconds_per_call(func) / reference_seconds()
+
+
+def load_baselines() -> dict[str, float]:
+    """
+    Recorded relative costs by workload name
+    """
+    if not BASELINES_PATH.exists():
+        return {}
+    return json.loads(BASELINES_PATH.read_text())
+
+
+def main() -> None:
+    from tests.benchmarks.workloads import WORKLOADS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--record", action="store_true", help="overwrite baselines.json")
+    args = parser.parse_args()
+
+    reference = reference_seconds()
+    baselines = load_baselines()
+    costs: dict[str, float] = {}
+
+    print(f"reference workload: {reference * 1e6:.2f} µs")
+    print(f"{'workload':<50} {'µs/call':>10} {'relative':>10} {'baseline':>10}")
+    for name, func in WORKLOADS.items():
+        seconds = seconds_per_call(func)
+        costs[name] = round(seconds / reference, 3)
+        baseline = baselines.get(name)
+        print(
+            f"{name:<50} {seconds * 1e6:>10.2f} {costs[name]:>10.3f} "
+            f"{baseline if baseline is not None else '-':>10}"
+        )
+
+    if args.record:
+        BASELINES_PATH.write_text(json.dumps(costs, indent=2) + "\n")
+        print(f"Recorded {len(costs)} baselines to {BASELINES_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import asyncio
+import os
+
+import pytest
+
+from src.usecases.interview_service.checker import check_output
+from tests.benchmarks.harness import load_baselines, relative_cost
+from tests.benchmarks.workloads import (
+    BODY,
+    CHECKER_SPECS,
+    CTRL,
+    WORKLOADS,
+    chunks,
+    model_output,
+    program_output,
+    split_tags,
+    _filter_thinking,
+    _strip_think_and_ctrl,
+)
+
+# How many times slower than its recorded baseline a workload may get
+TOLERANCE = float(os.environ.get("BENCHMARK_TOLERANCE", "2.0"))
+
+ATTEMPTS = 3
+
+BASELINES = load_baselines()
+
+
+@pytest.mark.parametrize(
+    "parts",
+    [chunks(model_output(200), 1), chunks(model_output(200), 16), split_tags(model_output(200))],
+    ids=["chunks_1", "chunks_16", "split_tags"],
+)
+def test_stream_workloads_yield_only_the_body(parts):
+    # The timed streams are only meaningful if they are parsed correctly
+    assert asyncio.run(_strip_think_and_ctrl(parts)) == BODY
+    assert asyncio.run(_filter_thinking(parts)) == f"<ctrl>{CTRL}</ctrl>{BODY}"
+
+
+@pytest.mark.parametrize("spec", sorted(CHECKER_SPECS))
+def test_checker_workloads_accept_the_output(spec):
+    expected = program_output(lines=5000)
+    assert check_output(expected, expected.replace("\n", " \r\n"), spec)
+    assert not check_output(expected, expected.replace("4999", "5000"), spec)
+
+
+def test_every_workload_has_a_baseline():
+    assert sorted(set(WORKLOADS) - set(BASELINES)) == [], (
+        "record baselines with python -m tests.benchmarks.harness --record"
+    )
+
+
+@pytest.mark.benchmark
+@pytest.mark.parametrize("name", list(WORKLOADS))
+def test_no_regression_against_baseline(name):
+    baseline = BASELINES.get(name)
+    if baseline is None:
+        pytest.skip("no baseline recorded")
+
+    # Re-measured before failing, a single slow run on a busy machine is noise
+    for _ in range(ATTEMPTS):
+        cost = relative_cost(WORKLOADS[name])
+        if cost < baseline * TOLERANCE:
+            break
+
+    assert cost < baseline * TOLERANCE, (
+        f"{name} costs {cost:.3f} reference units, baseline is {baseline:.3f} "
+        f"(tolerance x{TOLERANCE}); see python -m tests.benchmarks.harness"
+    )
@@ -0,0 +1,209 @@
+"""
+Synthetic inputs and timed calls of the ai_utils hot paths.
+
+Model streams are built the way a reasoning model produces them: a long
+<think> block, a <ctrl> block, then the visible body, cut into chunks of
+various sizes, including 1-character chunks and boundaries that split every
+tag in two.
+"""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator, Callable
+
+from src.adapters.ai_chat.ai_utils.json_parsers import _load_json
+from src.adapters.ai_chat.ai_utils.map_enum import (
+    map_assistant_type,
+    map_task_language,
+    map_task_type,
+    map_user_type,
+)
+from src.adapters.ai_chat.ai_utils.prompt_builders import (
+    _format_chat_history,
+    _format_test_suite,
+)
+from src.adapters.ai_chat.ai_utils.streams import filter_thinking_chunks, strip_think_and_ctrl
+from src.domain.message.message import Message, RoleEnum, TypeEnum
+from src.domain.test.test import CodeTestCase, CodeTestSuite
+from src.usecases.interview_service.checker import check_output
+
+CTRL = '{"user_type": "answer", "assistant_type": "response"}'
+
+BODY = (
+    "Thanks, that makes sense. Could you also explain how your solution behaves "
+    "when the input is empty, and what its time complexity is? "
+) * 8
+
+
+def reasoning(words: int) -> str:
+    """
+    Reasoning text of the given length, mentioning tags the parser must skip
+    """
+    sentence = (
+        "the candidate wrote a loop so I should ask about complexity and not "
+        "emit a <ctrl> block before the reasoning is over "
+    ).split()
+    return " ".join(sentence[i % len(sentence)] for i in range(words))
+
+
+def model_output(think_words: int, ctrl: bool = True) -> str:
+    """
+    Full output of a reasoning model
+    """
+    output = f"<think>{reasoning(think_words)}</think>"
+    if ctrl:
+        output += f"<ctrl>{CTRL}</ctrl>"
+    return output + BODY
+
+
+def chunks(text: str, size: int) -> list[str]:
+    """
+    Text cut into chunks of `size` characters
+    """
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+def split_tags(text: str) -> list[str]:
+    """
+    Text cut into chunks so that every tag is split across two of them
+    """
+    parts: list[str] = []
+    start = 0
+    for tag in ("<think>", "</think>", "<ctrl>", "</ctrl>"):
+        index = text.find(tag, start)
+        if index == -1:
+            continue
+        middle = index + len(tag) // 2
+        parts.append(text[start:middle])
+        start = middle
+    parts.append(text[start:])
+    return [part for part in parts if part]
+
+
+async def _stream(parts: list[str]) -> AsyncIterator[str]:
+    for part in parts:
+        yield part
+
+
+async def _strip_think_and_ctrl(parts: list[str]) -> str:
+    _, body = await strip_think_and_ctrl(_stream(parts))
+    return "".join([chunk async for chunk in body])
+
+
+async def _filter_thinking(parts: list[str]) -> str:
+    body = await filter_thinking_chunks(_stream(parts))
+    return "".join([chunk async for chunk in body])
+
+
+def chat_history(turns: int) -> list[Message]:
+    """
+    Interview transcript with the given number of question/answer turns
+    """
+    history = [Message(RoleEnum.AI, TypeEnum.TASK, "Read two integers and print their sum.")]
+    for i in range(turns):
+        history.append(Message(RoleEnum.AI, TypeEnum.QUESTION, f"Question {i}: {BODY[:160]}"))
+        history.append(Message(RoleEnum.USER, TypeEnum.ANSWER, f"Answer {i}: {reasoning(40)}"))
+    return history
+
+
+def executed_suite(tests: int) -> CodeTestSuite:
+    """
+    Executed test suite with multi-line inputs and outputs
+    """
+    return CodeTestSuite(
+        task_id="task",
+        tests=[
+            CodeTestCase(
+                id=f"t{i}",
+                input_data="\n".join(f"{j} {-j}" for j in range(i % 5 + 1)),
+                expected_output="\n".join("0" for _ in range(i % 5 + 1)),
+                correct=i % 3 != 0,
+                status="success",
+                stdout="0\n" * (i % 5 + 1),
+                stderr=None if i % 4 else "Traceback (most recent call last):\n  ...",
+                execution_time=12,
+                is_hidden=i > 3,
+            )
+            for i in range(tests)
+        ],
+    )
+
+
+def program_output(lines: int) -> str:
+    """
+    Large numeric stdout of a solution, one pair of numbers per line
+    """
+    return "".join(f"{i} {i / 7:.6f}\n" for i in range(lines))
+
+
+# Checkers that accept the output printed with CRLF line endings and trailing spaces
+CHECKER_SPECS = {"lines", "tokens", "numeric", "unordered_lines"}
+
+
+_METRICS = {
+    "summary": "The candidate explained their solutions clearly. " * 4,
+    "clarity_score": 4,
+    "completeness_score": 3,
+    "feedback_response": "Accepted hints and improved the solution.",
+    "tech_fit_level": "medium",
+    "tech_fit_comment": "Solid basics, limited experience with concurrency.",
+}
+VALID_JSON = json.dumps(_METRICS, indent=2)
+# Fenced, with a trailing comma and prose around it, as models sometimes reply
+BROKEN_JSON = f"Here is the result:\n```json\n{VALID_JSON[:-2]},\n}}\n```\nDone."
+
+_MAP_INPUTS = ("answer", "QUESTION", "solution", "other", None, "unexpected")
+
+
+def _map_all() -> None:
+    for value in _MAP_INPUTS:
+        map_user_type(value)
+        map_assistant_type(value)
+        map_task_language(value)
+        map_task_type(value)
+
+
+def _workloads() -> dict[str, Callable[[], object]]:
+    loop = asyncio.new_event_loop()
+    run = loop.run_until_complete
+
+    long_output = model_output(think_words=1500)
+    filter_output = model_output(think_words=1500, ctrl=False)
+    short_output = model_output(think_words=60)
+    history = chat_history(turns=20)
+    suite = executed_suite(tests=20)
+    expected = program_output(lines=5000)
+    crlf = expected.replace("\n", " \r\n")
+
+    streams = {
+        "chunks_16": lambda text: chunks(text, 16),
+        "chunks_1": lambda text: chunks(text, 1),
+        "split_tags": split_tags,
+    }
+    workloads: dict[str, Callable[[], object]] = {}
+    for name, cut in streams.items():
+        long_parts = cut(long_output)
+        workloads[f"strip_think_and_ctrl[long_think,{name}]"] = (
+            lambda parts=long_parts: run(_strip_think_and_ctrl(parts))
+        )
+        filter_parts = cut(filter_output)
+        workloads[f"filter_thinking_chunks[long_think,{name}]"] = (
+            lambda parts=filter_parts: run(_filter_thinking(parts))
+        )
+    short_parts = chunks(short_output, 4)
+    workloads["strip_think_and_ctrl[short_think,chunks_4]"] = lambda: run(
+        _strip_think_and_ctrl(short_parts)
+    )
+    workloads["_format_chat_history[20_turns]"] = lambda: _format_chat_history(history)
+    workloads["_format_test_suite[20_tests]"] = lambda: _format_test_suite(suite)
+    workloads["_load_json[valid]"] = lambda: _load_json(VALID_JSON)
+    workloads["_load_json[repaired]"] = lambda: _load_json(BROKEN_JSON)
+    workloads["map_*[all_inputs]"] = _map_all
+    for spec in sorted(CHECKER_SPECS):
+        workloads[f"check_output[{spec},5000_lines_crlf]"] = (
+            lambda spec=spec: check_output(expected, crlf, spec)
+        )
+    return workloads
+
+
+WORKLOADS = _workloads()
@@ -0,0 +1,50 @@
+import pytest
+from fastapi import FastAPI
+
+from src.presentation.fast_api.v1.interview import interview
+from src.usecases.interfaces.interview_service import InterviewServiceBase
+from src.usecases.interview_service.room_store import RoomStore
+from src.usecases.interview_service.service import InterviewService
+from tests.stubs import RecordingVacancyService, StubAIChat, StubCodeRunner
+
+
+@pytest.fixture
+def ai_chat() -> StubAIChat:
+    return StubAIChat()
+
+
+@pytest.fixture
+def code_runner() -> StubCodeRunner:
+    return StubCodeRunner()
+
+
+@pytest.fixture
+def vacancy_service() -> RecordingVacancyService:
+    return RecordingVacancyService()
+
+
+@pytest.fixture
+def service(ai_chat, code_runner, vacancy_service, tmp_path, monkeypatch) -> InterviewService:
+    """
+    The interview service singleton over stub adapters, with its room state
+    reset for the test
+    """
+    monkeypatch.setattr(
+        InterviewService,
+        "_room_sessions",
+        RoomStore(memory_limit=64 * 1024 * 1024, spill_dir=tmp_path / "rooms"),
+    )
+    monkeypatch.setattr(InterviewService, "_generations", {})
+    monkeypatch.setattr(InterviewService, "_hubs", {})
+    return InterviewService(vacancy_service, ai_chat, code_runner)
+
+
+@pytest.fixture
+def app(service) -> FastAPI:
+    """
+    The interview routes served by the stubbed service
+    """
+    app = FastAPI()
+    app.include_router(interview.router, prefix="/api/v1")
+    app.dependency_overrides[InterviewServiceBase] = lambda: service
+    return app
@@ -0,0 +1,158 @@
+"""
+In-process stand-ins for the adapters of the interview service
+"""
+
+import asyncio
+from collections import Counter
+from datetime import datetime, timedelta
+from uuid import UUID, uuid4
+
+from src.adapters.vacancy_service.mock import MockVacancyService
+from src.domain.message.message import Message, RoleEnum, TypeEnum
+from src.domain.metrics.metrics import (
+    MetricsBlock1,
+    MetricsBlock2,
+    MetricsBlock3,
+    Recommendation,
+    SeniorityGuess,
+    TechFitLevel,
+)
+from src.domain.room.room import Interviewee, Room
+from src.domain.task.task import Task, TaskType
+from src.domain.test.run_result import RunResult
+from src.domain.test.test import CodeTestCase, CodeTestSuite
+from src.domain.vacancy.vacancy import VacancyInfo
+from src.usecases.interview_service.service import InterviewService
+
+
+class StubAIChat:
+    """
+    Streams `chunks` as every reply, `delay` seconds before each chunk.
+    Calls are counted per method in `calls`
+    """
+
+    def __init__(self, chunks: list[str] | None = None, delay: float = 0.0):
+        self.chunks = chunks if chunks is not None else ["Hello", ", ", "candidate"]
+        self.delay = delay
+        self.calls: Counter[str] = Counter()
+        self.forgotten: list[UUID] = []
+        self.tests: list[CodeTestCase] = []
+
+    async def _stream(self):
+        for chunk in self.chunks:
+            await asyncio.sleep(self.delay)
+            yield chunk
+
+    async def create_chat(self, vacancy_info, chat_history):
+        self.calls["create_chat"] += 1
+        return vacancy_info
+
+    async def generate_welcome_message(self, vacancy_info, chat_history):
+        self.calls["generate_welcome_message"] += 1
+        return self._stream()
+
+    async def create_response(self, vacancy_info, chat_history, task):
+        self.calls["create_response"] += 1
+        return (
+            self._stream(),
+            Message(RoleEnum.USER, TypeEnum.ANSWER, ""),
+            Message(RoleEnum.AI, TypeEnum.RESPONSE, ""),
+        )
+
+    async def create_task(self, vacancy_info, chat_history):
+        self.calls["create_task"] += 1
+        return self._stream(), Task(type=TaskType.THEORY, language=None, description="")
+
+    async def create_metrics(self, vacancy_info, chat_history, metrics_block1):
+        self.calls["create_metrics"] += 1
+        return (
+            metrics_block1,
+            MetricsBlock2("summary", 3, 3, "feedback", TechFitLevel.MEDIUM, "comment"),
+            MetricsBlock3(
+                "strengths", "weaknesses", "honest", SeniorityGuess.JUNIOR, Recommendation.DOUBT
+            ),
+        )
+
+    async def create_test_suite(self, vacancy_info, chat_history, task, attempts=None):
+        self.calls["create_test_suite"] += 1
+        return CodeTestSuite(task_id="task", tests=list(self.tests))
+
+    async def stream_test_suite(self, vacancy_info, chat_history, task):
+        self.calls["stream_test_suite"] += 1
+        for test in self.tests:
+            yield test
+
+    def forget_room(self, room_id: UUID) -> None:
+        self.forgotten.append(room_id)
+
+
+class StubCodeRunner:
+    """
+    Echoes stdin as stdout after `delay` seconds
+    """
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.runs = 0
+
+    async def run_code(self, language: str, stdin: str, code: str) -> RunResult:
+        self.runs += 1
+        await asyncio.sleep(self.delay)
+        return RunResult(
+            status="Accepted",
+            exception=None,
+            stdin=stdin,
+            stdout=stdin,
+            stderr=None,
+            execution_time=1,
+        )
+
+
+class RecordingVacancyService(MockVacancyService):
+    """
+    Mock vacancy service keeping the rooms whose results were sent
+    """
+
+    def __init__(self):
+        self.results: list[Room] = []
+
+    async def add_interview_results(self, room: Room) -> None:
+        self.results.append(room)
+
+
+def make_room(room_id: UUID | None = None, chat_bytes: int = 0) -> Room:
+    """
+    Room of a running interview, optionally with a candidate answer of `chat_bytes`
+    """
+    chat = [Message(RoleEnum.USER, TypeEnum.ANSWER, "x" * chat_bytes)] if chat_bytes else []
+    return Room(
+        id=room_id or uuid4(),
+        vacancy_id=uuid4(),
+        vacancy_info=VacancyInfo(
+            profession="Python developer",
+            position="Junior",
+            requirements="",
+            questions="",
+            tasks=[],
+            task_ides=[],
+            interview_plan="",
+            duration=timedelta(minutes=90),
+        ),
+        interviewee=Interviewee("Ivan", "Ivanov", ""),
+        chat_history=chat,
+        tasks=[],
+        solutions=[],
+        metrics=[],
+        created_at=datetime.now(),
+        last_task_time=datetime.now(),
+        metrics_block1=MetricsBlock1(timedelta(0), timedelta(0), 0, 0),
+        current_test_suite=None,
+    )
+
+
+def add_room(room: Room) -> Room:
+    """
+    Put a room into the service's store, as create_room does
+    """
+    InterviewService._room_sessions[room.id] = room
+    return room
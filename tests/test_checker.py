@@ -0,0 +1,131 @@
+import pytest
+
+from src.usecases.interview_service import checker
+from src.usecases.interview_service.checker import (
+    _BLOCK_CHARS,
+    check_output,
+    checker_names,
+    get_checker,
+    register_checker,
+)
+
+
+def reference_lines(text: str) -> list[str]:
+    """
+    What line_blocks computes, on the whole text at once
+    """
+    lines = [line.rstrip() for line in text.replace("\r", "").split("\n")]
+    while lines and not lines[-1]:
+        lines.pop()
+    return lines
+
+
+@pytest.mark.parametrize(
+    ("expected", "actual", "accepted"),
+    [
+        ("1\n2\n", "1\r\n2\r\n", True),
+        ("1\n2", "1  \n2\t\n", True),
+        ("1\n2\n", "1\n2\n\n\n\n", True),
+        ("1\n2", "1\n\n2", False),
+        ("1\n2", "\n1\n2", False),
+        ("1 2", "1  2", False),
+        ("", "\n\n", True),
+    ],
+)
+def test_lines(expected, actual, accepted):
+    assert check_output(expected, actual, "lines") is accepted
+
+
+# Blank lines before, across and after the cut between 64 KiB blocks
+LONG_LINE = "x" * (_BLOCK_CHARS - 1)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        LONG_LINE + "\n\n\nend\n",
+        LONG_LINE + "x\n\n\nend",
+        "start\n" + "\n" * (2 * _BLOCK_CHARS) + "end\n",
+        "start" + "\n" * (3 * _BLOCK_CHARS),
+        "start\n" + " \n" * _BLOCK_CHARS + "end",
+    ],
+)
+def test_lines_across_block_boundaries(text):
+    crlf = text.replace("\n", "\r\n")
+    one_blank_less = text.replace("\n\n", "\n", 1)
+    one_blank_more = text.replace("\n", "\n\n", 1)
+
+    assert check_output(text, crlf, "lines")
+    assert check_output(text, text + "\n\n", "lines")
+    for other in (one_blank_less, one_blank_more):
+        accepted = reference_lines(other) == reference_lines(text)
+        assert check_output(text, other, "lines") is accepted
+        assert check_output(other.replace("\n", "\r\n"), text, "lines") is accepted
+
+
+@pytest.mark.parametrize(
+    ("spec", "expected", "actual", "accepted"),
+    [
+        ("numeric", "1 2.5", "1.0000000001 2.5", True),
+        ("numeric", "1.0", "1.05", False),
+        ("numeric:0.1", "1.0", "1.05", True),
+        ("numeric", "1 nan", "1.0 NaN", True),
+        ("numeric", "nan", "1", False),
+        ("numeric", "1", "nan", False),
+        ("numeric", "1 2", "1", False),
+        ("numeric", "1", "1 2", False),
+        ("numeric", "yes 1", "no 1", False),
+    ],
+)
+def test_numeric(spec, expected, actual, accepted):
+    assert check_output(expected, actual, spec) is accepted
+
+
+def test_unordered_lines():
+    assert check_output("1\n2\n2\n", "2\r\n1\n2", "unordered_lines")
+    assert not check_output("1\n2\n2\n", "2\n1\n1", "unordered_lines")
+    assert not check_output("1\n2\n", "2\n1\n1\n", "unordered_lines")
+
+
+def test_unordered_lines_stop_counting_an_output_that_is_too_long(monkeypatch):
+    read = []
+
+    def line_blocks(text):
+        for block in original(text):
+            read.append(block)
+            yield block
+
+    original = checker.line_blocks
+    monkeypatch.setattr(checker, "line_blocks", line_blocks)
+    actual = "1\n" * (10 * _BLOCK_CHARS)
+
+    assert not check_output("1\n1\n", actual, "unordered_lines")
+    # The expected output and the first block of the actual one
+    assert len(read) == 2
+
+
+@pytest.mark.parametrize(
+    ("expected", "actual", "accepted"),
+    [("1\n2", "1\r\n2\n\n", True), ("1 2", "1  2", False)],
+)
+def test_unknown_spec_falls_back_to_lines(expected, actual, accepted):
+    with pytest.raises(ValueError, match="Unknown output checker"):
+        get_checker("fuzzy")
+
+    assert check_output(expected, actual, "fuzzy") is accepted
+
+
+def test_register_checker(monkeypatch):
+    monkeypatch.setattr(checker, "_factories", dict(checker._factories))
+    arguments = []
+
+    def case_insensitive(argument):
+        arguments.append(argument)
+        return lambda expected, actual: expected.casefold() == actual.casefold()
+
+    register_checker("case_insensitive", case_insensitive)
+
+    assert "case_insensitive" in checker_names()
+    assert check_output("YES", "yes", "case_insensitive")
+    assert not check_output("YES", "no", " case_insensitive:strict ")
+    assert arguments == [None, "strict"]
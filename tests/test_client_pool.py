@@ -0,0 +1,153 @@
+import asyncio
+import time
+from uuid import uuid4
+
+import pytest
+from aiohttp import web
+
+from benchmarks.fake_llm import FakeLLM, FakeLLMConfig
+from benchmarks.load_test import free_port
+from src.adapters.ai_chat.ai_utils.client_pool import LLMClientPool
+from src.core.context import current_room_id
+
+MESSAGES = [{"role": "system", "content": "system"}, {"role": "user", "content": "hi"}]
+
+
+async def start_replica(config: FakeLLMConfig) -> tuple[FakeLLM, str, web.AppRunner]:
+    fake = FakeLLM(config)
+    runner = web.AppRunner(fake.app(), access_log=None)
+    await runner.setup()
+    port = free_port()
+    await web.TCPSite(runner, "127.0.0.1", port).start()
+    return fake, f"http://127.0.0.1:{port}/v1", runner
+
+
+async def stream_text(pool: LLMClientPool) -> str:
+    deltas = pool.stream_chat_completion(model="fake", messages=MESSAGES)
+    return "".join([delta async for delta in deltas])
+
+
+def run_with_replicas(configs: list[FakeLLMConfig], scenario, **pool_options) -> None:
+    async def main():
+        replicas = [await start_replica(config) for config in configs]
+        pool = LLMClientPool(
+            base_urls=[url for _, url, _ in replicas], api_key="test", **pool_options
+        )
+        try:
+            await scenario(pool, [fake for fake, _, _ in replicas])
+        finally:
+            await pool.close()
+            for _, _, runner in replicas:
+                await runner.cleanup()
+
+    asyncio.run(main())
+
+
+def test_completion_has_its_own_deadline():
+    async def scenario(pool, fakes):
+        # Slower than the stream timeout, within the completion deadline
+        assert await pool.create_chat_completion(model="fake", messages=MESSAGES)
+
+    run_with_replicas(
+        [FakeLLMConfig(ttft=0.5, think_words=0)],
+        scenario,
+        request_timeout=0.2,
+        completion_timeout=5.0,
+    )
+
+
+def test_completion_timeout_is_not_retried():
+    async def scenario(pool, fakes):
+        with pytest.raises(Exception, match="timed out"):
+            await pool.create_chat_completion(model="fake", messages=MESSAGES)
+        assert fakes[0].requests == 1
+
+    run_with_replicas(
+        [FakeLLMConfig(ttft=1.0, think_words=0)], scenario, completion_timeout=0.2, retries=2
+    )
+
+
+@pytest.mark.parametrize("retries", [0, 2])
+def test_only_the_pool_retries(retries):
+    async def scenario(pool, fakes):
+        with pytest.raises(Exception):
+            await pool.create_chat_completion(model="fake", messages=MESSAGES)
+        assert fakes[0].requests == retries + 1
+
+    run_with_replicas(
+        [FakeLLMConfig(ttft=0.0, failure_rate=1.0)], scenario, retries=retries
+    )
+
+
+def test_stream_fails_over_before_the_first_token():
+    async def scenario(pool, fakes):
+        broken, healthy = fakes
+        # The first request of an idle pool goes to the first endpoint
+        pool._next = len(pool.endpoints) - 1
+
+        assert (await stream_text(pool)).endswith("OK")
+        assert (broken.requests, broken.failures, healthy.requests) == (1, 1, 1)
+        assert pool.endpoints[0].consecutive_failures == 1
+
+    run_with_replicas(
+        [FakeLLMConfig(ttft=0.0, failure_rate=1.0), FakeLLMConfig(ttft=0.0, think_words=0, tokens_per_second=1000)],
+        scenario,
+    )
+
+
+def test_room_sticks_to_its_endpoint_until_it_is_forgotten():
+    async def scenario(pool, fakes):
+        room_id = uuid4()
+        current_room_id.set(room_id)
+        for _ in range(4):
+            await stream_text(pool)
+        # Every turn of the room hit the same replica
+        assert sorted(fake.requests for fake in fakes) == [0, 4]
+
+        pool.forget(room_id)
+        assert room_id not in pool._sticky
+
+    run_with_replicas([FakeLLMConfig(ttft=0.0, think_words=0, tokens_per_second=1000)] * 2, scenario)
+
+
+def test_room_moves_when_its_endpoint_is_much_busier():
+    async def scenario(pool, fakes):
+        room_id = uuid4()
+        sticky = pool.pick(room_id)
+        other = next(e for e in pool.endpoints if e is not sticky)
+
+        sticky.outstanding = pool.sticky_imbalance
+        assert pool.pick(room_id) is sticky
+        sticky.outstanding = pool.sticky_imbalance + 1
+        assert pool.pick(room_id) is other
+        sticky.outstanding = 0
+        assert pool.pick(room_id) is other
+
+    run_with_replicas([FakeLLMConfig()] * 2, scenario, sticky_imbalance=2)
+
+
+def test_failing_endpoint_cools_down_then_gets_a_probe():
+    async def scenario(pool, fakes):
+        broken, healthy = fakes
+        pool._next = len(pool.endpoints) - 1
+        await stream_text(pool)
+        assert pool.endpoints[0].unhealthy_until > time.monotonic()
+
+        # Out of rotation during the cooldown
+        for _ in range(3):
+            await stream_text(pool)
+        assert broken.requests == 1
+
+        broken.config.failure_rate = 0.0
+        await asyncio.sleep(1.0)
+        # Both idle again, the rotation reaches the recovered endpoint
+        await asyncio.gather(stream_text(pool), stream_text(pool))
+        assert broken.requests == 2
+        assert pool.endpoints[0].unhealthy_until == 0.0
+
+    run_with_replicas(
+        [FakeLLMConfig(ttft=0.0, failure_rate=1.0), FakeLLMConfig(ttft=0.0, think_words=0, tokens_per_second=1000)],
+        scenario,
+        failure_threshold=1,
+        cooldown=1.0,
+    )
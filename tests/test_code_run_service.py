@@ -0,0 +1,80 @@
+import asyncio
+
+import pytest
+from aiohttp import web
+
+from benchmarks.fake_runner import FakeRunner, FakeRunnerConfig
+from benchmarks.load_test import free_port
+from src.adapters import code_run_service
+from src.adapters.code_run_service import CodeRunService
+from src.core.resilience import Dependency, TransientError
+
+CODE = "print(input())"
+
+
+def run_against(config: FakeRunnerConfig, scenario, monkeypatch, **policy) -> FakeRunner:
+    policy = {"timeout": 0.3, "retries": 2, "hedge_after": 0.1, **policy}
+    monkeypatch.setattr(
+        code_run_service,
+        "code_runner",
+        Dependency(
+            "code_runner_test", backoff_base=0.01, backoff_max=0.01, failure_threshold=100, **policy
+        ),
+    )
+    fake = FakeRunner(config)
+
+    async def main():
+        runner = web.AppRunner(fake.app(), access_log=None)
+        await runner.setup()
+        port = free_port()
+        await web.TCPSite(runner, "127.0.0.1", port).start()
+        try:
+            await scenario(CodeRunService(f"http://127.0.0.1:{port}", "key"))
+        finally:
+            await CodeRunService.close()
+            await runner.cleanup()
+
+    asyncio.run(main())
+    return fake
+
+
+def test_slow_run_is_hedged_once(monkeypatch):
+    async def scenario(service):
+        result = await service.run_code("python", "42", CODE)
+        assert result.stdout.strip() == "42"
+
+    fake = run_against(
+        FakeRunnerConfig(latency="fixed", median=0.2), scenario, monkeypatch, timeout=2.0
+    )
+    assert fake.requests == 2
+
+
+@pytest.mark.parametrize(
+    ("config", "error"),
+    [
+        # Every request times out
+        (FakeRunnerConfig(latency="fixed", median=0.6), TimeoutError),
+        # Every request is answered with a 5xx, after the hedge went out
+        (FakeRunnerConfig(latency="fixed", median=0.2, error_rate=1.0), TransientError),
+    ],
+    ids=["slow", "failing"],
+)
+def test_hedge_and_retries_share_the_request_budget(monkeypatch, config, error):
+    async def scenario(service):
+        with pytest.raises(error):
+            await service.run_code("python", "42", CODE)
+
+    fake = run_against(config, scenario, monkeypatch, retries=2)
+    # Not (1 + hedge) * (1 + retries)
+    assert fake.requests == 3
+
+
+def test_without_retries_nothing_is_hedged(monkeypatch):
+    async def scenario(service):
+        with pytest.raises(TimeoutError):
+            await service.run_code("python", "42", CODE)
+
+    fake = run_against(
+        FakeRunnerConfig(latency="fixed", median=0.6), scenario, monkeypatch, retries=0
+    )
+    assert fake.requests == 1
@@ -0,0 +1,222 @@
+import asyncio
+
+import pytest
+
+from src.core.setting import settings
+from src.domain.generation.generation import GenerationKind
+from src.usecases.interview_service.generation import (
+    Generation,
+    ReplayGapError,
+    format_event_id,
+    parse_event_id,
+)
+from src.usecases.interview_service.service import (
+    InterviewService,
+    _abandoned_generations_total,
+)
+from tests.stubs import add_room, make_room
+
+
+def generation_with(chunks: list[str], max_chunks: int = 10, done: bool = True) -> Generation:
+    generation = Generation(GenerationKind.RESPONSE, max_chunks)
+    for chunk in chunks:
+        generation.append(chunk)
+    if done:
+        generation.finish()
+    return generation
+
+
+async def read(generation: Generation, after: int = 0) -> list[tuple[str, str]]:
+    return [event async for event in generation.events(after)]
+
+
+@pytest.mark.parametrize(
+    ("event_id", "parsed"),
+    [("3.14", (3, 14)), (" 3.14 ", (3, 14)), ("", None), (None, None), ("x.1", None), ("3", None)],
+)
+def test_parse_event_id(event_id, parsed):
+    assert parse_event_id(event_id) == parsed
+
+
+def test_reader_resumes_after_its_last_event_id():
+    generation = generation_with(["a", "b", "c", "d"])
+    last_event_id = format_event_id(generation.number, 2)
+
+    _, after = parse_event_id(last_event_id)
+    events = asyncio.run(read(generation, after))
+
+    assert events == [
+        (format_event_id(generation.number, 3), "c"),
+        (format_event_id(generation.number, 4), "d"),
+    ]
+
+
+def test_resume_within_the_buffer_after_eviction():
+    generation = generation_with(["a", "b", "c", "d", "e"], max_chunks=3)
+
+    assert [chunk for _, chunk in asyncio.run(read(generation, after=2))] == ["c", "d", "e"]
+    assert generation.text() == "cde"
+
+
+@pytest.mark.parametrize("after", [0, 1])
+def test_resume_past_the_buffer_fails(after):
+    generation = generation_with(["a", "b", "c", "d", "e"], max_chunks=3)
+
+    with pytest.raises(ReplayGapError, match=f"Chunks {after + 1}-2"):
+        asyncio.run(read(generation, after))
+
+
+def test_reader_that_falls_behind_the_buffer_fails():
+    async def scenario():
+        generation = generation_with(["a"], max_chunks=2, done=False)
+        events = generation.events()
+        assert await anext(events) == (format_event_id(generation.number, 1), "a")
+
+        # Produced faster than the reader reads
+        for chunk in "bcd":
+            generation.append(chunk)
+        with pytest.raises(ReplayGapError):
+            await anext(events)
+
+    asyncio.run(scenario())
+
+
+def test_live_reader_gets_chunks_until_the_generation_finishes():
+    async def scenario():
+        generation = generation_with([], done=False)
+        reader = asyncio.create_task(read(generation))
+        for chunk in "abc":
+            await asyncio.sleep(0)
+            generation.append(chunk)
+        generation.finish()
+        assert [chunk for _, chunk in await reader] == ["a", "b", "c"]
+
+    asyncio.run(scenario())
+
+
+def run_producer(scenario) -> None:
+    async def main():
+        generation = generation_with([], done=False)
+        generation.task = asyncio.create_task(asyncio.sleep(10))
+        try:
+            await scenario(generation)
+        finally:
+            generation.task.cancel()
+
+    asyncio.run(main())
+
+
+def test_reattach_within_the_grace_period_keeps_the_generation():
+    async def scenario(generation):
+        generation.attach()
+        generation.detach(grace=0.1)
+        await asyncio.sleep(0.05)
+        generation.attach()
+        await asyncio.sleep(0.1)
+
+        assert not generation.abandoned
+        assert not generation.task.done()
+
+    run_producer(scenario)
+
+
+def test_generation_without_readers_is_cancelled_after_the_grace_period():
+    async def scenario(generation):
+        generation.attach()
+        generation.attach()
+        generation.detach(grace=0.05)
+        await asyncio.sleep(0.1)
+        # One reader is still there
+        assert not generation.task.done()
+
+        generation.detach(grace=0.05)
+        await asyncio.sleep(0.1)
+        assert generation.abandoned
+        assert generation.task.cancelled()
+
+    run_producer(scenario)
+
+
+def test_finished_generation_is_never_abandoned():
+    async def scenario(generation):
+        generation.attach()
+        generation.finish()
+        generation.detach(grace=0)
+
+        assert not generation.abandoned
+        assert not generation.task.done()
+
+    run_producer(scenario)
+
+
+def test_resuming_a_generation_makes_no_extra_llm_call(service, ai_chat):
+    room = add_room(make_room())
+
+    async def scenario():
+        events = [e async for e in service.stream_generation(room.id, GenerationKind.WELCOME)]
+        resumed = [
+            e
+            async for e in service.stream_generation(
+                room.id, GenerationKind.WELCOME, last_event_id=events[0][0]
+            )
+        ]
+        assert resumed == events[1:]
+        assert ai_chat.calls["generate_welcome_message"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_resuming_past_the_buffer_fails_cleanly(service, ai_chat, monkeypatch):
+    monkeypatch.setattr(settings, "stream_replay_chunks", 2)
+    ai_chat.chunks = list("abcde")
+    ai_chat.delay = 0.01
+    room = add_room(make_room())
+
+    async def scenario():
+        events = [e async for e in service.stream_generation(room.id, GenerationKind.WELCOME)]
+        with pytest.raises(ReplayGapError):
+            async for _ in service.stream_generation(
+                room.id, GenerationKind.WELCOME, last_event_id=events[0][0]
+            ):
+                pass
+        assert ai_chat.calls["generate_welcome_message"] == 1
+        generation = InterviewService._generations[(room.id, GenerationKind.WELCOME)]
+        assert generation.readers == 0
+
+    asyncio.run(scenario())
+
+
+def test_generation_abandoned_by_its_reader_is_cancelled_and_committed(
+    service, ai_chat, monkeypatch
+):
+    monkeypatch.setattr(settings, "stream_abandon_grace_seconds", 0.05)
+    ai_chat.chunks = ["chunk "] * 100
+    ai_chat.delay = 0.01
+    room = add_room(make_room())
+    abandoned = _abandoned_generations_total.labels("welcome")
+    before = abandoned.value
+
+    async def scenario():
+        events = service.stream_generation(room.id, GenerationKind.WELCOME)
+        seen = [await anext(events) for _ in range(3)]
+        # The client goes away
+        await events.aclose()
+
+        generation = InterviewService._generations[(room.id, GenerationKind.WELCOME)]
+        with pytest.raises(asyncio.CancelledError):
+            await generation.task
+        assert generation.abandoned
+        assert abandoned.value == before + 1
+
+        # The history holds what was produced before the cancel, not the full reply
+        [reply] = room.chat_history
+        assert reply.content.startswith("".join(chunk for _, chunk in seen))
+        assert len(reply.content) < len("chunk ") * 100
+
+        # The next request starts a new generation instead of reading the cancelled one
+        ai_chat.chunks = ["again"]
+        events = service.stream_generation(room.id, GenerationKind.WELCOME)
+        assert [chunk async for _, chunk in events] == ["again"]
+        assert ai_chat.calls["generate_welcome_message"] == 2
+
+    asyncio.run(scenario())
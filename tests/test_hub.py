@@ -0,0 +1,127 @@
+import asyncio
+
+from src.core.setting import settings
+from src.domain.generation.generation import GenerationKind, RoomEvent
+from src.usecases.interview_service.hub import RoomHub, _dropped_events_total
+from tests.stubs import add_room, make_room
+
+
+def chunk(number: int) -> RoomEvent:
+    return RoomEvent(type="message_chunk", kind="response", content=str(number))
+
+
+async def take(subscription, count: int) -> list[RoomEvent | None]:
+    events = subscription.events()
+    return [await anext(events) for _ in range(count)]
+
+
+def test_slow_subscriber_lags_and_learns_how_much():
+    async def scenario():
+        hub = RoomHub(max_events=3)
+        slow = hub.subscribe()
+        dropped = _dropped_events_total.labels().value
+
+        # Never waits, however far behind the subscriber is
+        for number in range(10):
+            hub.publish(chunk(number))
+
+        assert _dropped_events_total.labels().value == dropped + 7
+        assert await take(slow, 4) == [
+            RoomEvent(type="lagged", content="7"),
+            chunk(7),
+            chunk(8),
+            chunk(9),
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_lag_is_reported_where_it_happened():
+    async def scenario():
+        hub = RoomHub(max_events=2)
+        subscription = hub.subscribe()
+        events = subscription.events()
+        hub.publish(chunk(0))
+        assert await anext(events) == chunk(0)
+
+        for number in range(1, 5):
+            hub.publish(chunk(number))
+        assert [await anext(events) for _ in range(3)] == [
+            RoomEvent(type="lagged", content="2"),
+            chunk(3),
+            chunk(4),
+        ]
+
+    asyncio.run(scenario())
+
+
+def test_slow_subscriber_does_not_affect_a_fast_one():
+    async def scenario():
+        hub = RoomHub(max_events=2)
+        hub.subscribe()
+        fast = hub.subscribe()
+        received = []
+
+        async def read():
+            async for event in fast.events():
+                received.append(event)
+
+        reader = asyncio.create_task(read())
+        for number in range(10):
+            hub.publish(chunk(number))
+            await asyncio.sleep(0)
+        hub.close()
+        await reader
+
+        assert received == [chunk(number) for number in range(10)]
+
+    asyncio.run(scenario())
+
+
+def test_closed_subscription_delivers_queued_events_then_ends():
+    async def scenario():
+        hub = RoomHub(max_events=10)
+        subscription = hub.subscribe()
+        hub.publish(chunk(1))
+        hub.close()
+
+        assert [event async for event in subscription.events()] == [chunk(1)]
+        assert len(hub) == 0
+
+    asyncio.run(scenario())
+
+
+def test_idle_subscription_yields_heartbeats():
+    async def scenario():
+        subscription = RoomHub(max_events=10).subscribe()
+        events = subscription.events(idle_timeout=0.01)
+
+        assert await anext(events) is None
+        subscription.push(chunk(1))
+        assert await anext(events) == chunk(1)
+
+    asyncio.run(scenario())
+
+
+def test_observer_that_does_not_read_cannot_block_the_generation(service, ai_chat, monkeypatch):
+    monkeypatch.setattr(settings, "observer_queue_size", 2)
+    ai_chat.chunks = [f"{number} " for number in range(50)]
+    room = add_room(make_room())
+
+    async def scenario():
+        observer = service.observe(room.id)
+        first = asyncio.create_task(anext(observer))
+        await asyncio.sleep(0)
+
+        # Runs to the end while the observer reads a single event
+        async with asyncio.timeout(5):
+            async for _ in service.stream_generation(room.id, GenerationKind.WELCOME):
+                pass
+
+        assert (await first).type == "start"
+        lagged, last_chunk, complete = [await anext(observer) for _ in range(3)]
+        assert lagged.type == "lagged" and int(lagged.content) > 0
+        assert (last_chunk.content, complete.type) == ("49 ", "complete")
+        await observer.aclose()
+
+    asyncio.run(scenario())
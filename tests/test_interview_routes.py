@@ -0,0 +1,65 @@
+import pytest
+from fastapi.testclient import TestClient
+
+from src.domain.message.message import Message, RoleEnum, TypeEnum
+from tests.stubs import add_room, make_room
+
+
+@pytest.fixture
+def room(service):
+    return add_room(make_room())
+
+
+@pytest.fixture
+def client(app, room):
+    with TestClient(app, cookies={"room_id": str(room.id)}) as client:
+        yield client
+
+
+def test_room_has_an_etag(client, room):
+    response = client.get("/api/v1/room")
+
+    assert response.status_code == 200
+    assert response.headers["etag"] == f'"{room.id.hex}.{room.version}"'
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    [
+        "{etag}",
+        'W/{etag}',
+        '"other", {etag}',
+        '"other",{etag}',
+        '  "other" ,  W/{etag}  ',
+        "*",
+    ],
+)
+def test_unchanged_room_is_not_sent_again(client, if_none_match):
+    etag = client.get("/api/v1/room").headers["etag"]
+
+    response = client.get(
+        "/api/v1/room", headers={"if-none-match": if_none_match.format(etag=etag)}
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+@pytest.mark.parametrize("if_none_match", ['"other"', '"other", W/"another"', ""])
+def test_room_is_sent_when_no_etag_matches(client, if_none_match):
+    response = client.get("/api/v1/room", headers={"if-none-match": if_none_match})
+
+    assert response.status_code == 200
+
+
+def test_changed_room_gets_a_new_etag(client, room):
+    etag = client.get("/api/v1/room").headers["etag"]
+    room.chat_history.append(Message(RoleEnum.USER, TypeEnum.ANSWER, "hi"))
+    room.touch()
+
+    response = client.get("/api/v1/room", headers={"if-none-match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert response.json()["chat"] == [{"sender": "user", "content": "hi"}]
@@ -0,0 +1,84 @@
+import json
+
+import pytest
+
+from src.adapters.ai_chat.ai_utils.json_parsers import (
+    TestCaseStreamParser,
+    parse_test_case,
+    parse_test_suite_json,
+    repair_json,
+)
+from src.adapters.ai_chat.ai_utils.json_schemas import build_test_suite_schema, compile_schema
+
+CHECKERS = ["lines", "numeric", "tokens", "unordered_lines"]
+validate_test_case = compile_schema(build_test_suite_schema(CHECKERS)["properties"]["tests"]["items"])
+
+TRUNCATED_SUITE = (
+    '{"tests": ['
+    '{"id": "t1", "input_data": "5", "expected_output": "120", "is_hidden": false}, '
+    '{"id": "t2", "input_data": "9", "expected_output": "36288'
+)
+
+
+def test_truncated_test_suite_drops_the_cut_test():
+    suite = parse_test_suite_json(TRUNCATED_SUITE, task_id="task", checker_names=CHECKERS)
+
+    assert [(t.id, t.expected_output) for t in suite.tests] == [("t1", "120")]
+
+
+@pytest.mark.parametrize(
+    ("text", "expected"),
+    [
+        ('{"a": "complete", "b": "cut of', {"a": "complete"}),
+        ('{"a": 1, "b": 36288', {"a": 1}),
+        ('{"a": [1, 2], "b": tr', {"a": [1, 2]}),
+        ('{"a": "x", "b": "y"', {"a": "x", "b": "y"}),
+        ('{"a": ["x", "y"', {"a": ["x", "y"]}),
+        ('{"a": [{"b": "x"}, {"b": "y"', {"a": [{"b": "x"}]}),
+        ('{"a": "x",}', {"a": "x"}),
+    ],
+)
+def test_repair_keeps_only_complete_members(text, expected):
+    assert json.loads(repair_json(text)) == expected
+
+
+@pytest.mark.parametrize("checker", ["tokens", "unordered_lines", "numeric:1e-6", "numeric"])
+def test_test_case_accepts_a_checker(checker):
+    test = {"id": "t1", "input_data": "", "expected_output": "1", "is_hidden": True}
+    test["checker"] = checker
+
+    assert validate_test_case(test) == []
+    assert parse_test_case(test, 0, CHECKERS).checker == checker
+
+
+@pytest.mark.parametrize("checker", ["fuzzy", "fuzzy:1", "exact"])
+def test_test_case_rejects_a_checker_it_was_not_given(checker):
+    test = {"id": "t1", "input_data": "", "expected_output": "1", "is_hidden": True}
+    test["checker"] = checker
+
+    assert validate_test_case(test)
+    with pytest.raises(ValueError, match="Invalid checker"):
+        parse_test_case(test, 0, CHECKERS)
+
+
+SUITE = """Here are the tests:
+```json
+{"tests": [
+  {"id": "t1", "input_data": "1 2\\n", "expected_output": "3", "is_hidden": false},
+  {"id": "t2", "input_data": "{[\\"}", "expected_output": "}]", "is_hidden": true},
+  {"id": "t3", "input_data": "", "expected_output": "\\\\", "nested": {"a": [1, {"b": 2}]}}
+]}
+```"""
+
+
+def test_stream_parser_result_does_not_depend_on_chunk_boundaries():
+    expected = TestCaseStreamParser().feed(SUITE)
+    suite = json.loads(SUITE[SUITE.index("{") : SUITE.rindex("}") + 1])
+    assert [json.loads(raw) for raw in expected] == suite["tests"]
+
+    for size in range(1, len(SUITE) + 1):
+        parser = TestCaseStreamParser()
+        completed = []
+        for start in range(0, len(SUITE), size):
+            completed += parser.feed(SUITE[start : start + size])
+        assert completed == expected, f"chunk size {size}"
@@ -0,0 +1,138 @@
+import base64
+import time
+
+import orjson
+import pytest
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.asymmetric.utils import decode_dss_signature
+from fastapi import HTTPException
+
+from src.presentation.fast_api.middlewares import jwt
+from src.presentation.fast_api.middlewares.jwt import PUBLIC_ROUTES, JWTManager
+
+PRIVATE_KEY = ec.generate_private_key(ec.SECP256R1())
+PUBLIC_PEM = (
+    PRIVATE_KEY.public_key()
+    .public_bytes(serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo)
+    .decode()
+)
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def sign(payload: dict, key: ec.EllipticCurvePrivateKey = PRIVATE_KEY) -> str:
+    signing_input = (
+        f"{_b64encode(orjson.dumps({'alg': 'ES256', 'typ': 'JWT'}))}."
+        f"{_b64encode(orjson.dumps(payload))}"
+    )
+    r, s = decode_dss_signature(key.sign(signing_input.encode(), ec.ECDSA(hashes.SHA256())))
+    return f"{signing_input}.{_b64encode(r.to_bytes(32, 'big') + s.to_bytes(32, 'big'))}"
+
+
+@pytest.fixture
+def manager() -> JWTManager:
+    return JWTManager(PUBLIC_PEM)
+
+
+def test_raw_signature_is_converted_to_der(manager):
+    payload = {"room_id": "r1", "exp": int(time.time()) + 60}
+
+    assert manager.verify_token(sign(payload)) == payload
+
+
+def test_token_signed_by_jose_is_accepted(manager):
+    from jose import jwt as jose_jwt
+
+    private_pem = PRIVATE_KEY.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    token = jose_jwt.encode({"room_id": "r1"}, private_pem.decode(), algorithm="ES256")
+
+    assert manager.verify_token(token) == {"room_id": "r1"}
+
+
+@pytest.mark.parametrize(
+    "token",
+    [
+        sign({"room_id": "r1"}, ec.generate_private_key(ec.SECP256R1())),
+        sign({"room_id": "r1"})[:-4] + "AAAA",
+        "not.a.token",
+    ],
+    ids=["other_key", "tampered", "garbage"],
+)
+def test_invalid_token_is_rejected(manager, token):
+    with pytest.raises(HTTPException) as error:
+        manager.verify_token(token)
+    assert error.value.status_code == 401
+    assert manager._verified == {}
+
+
+def test_verified_token_is_served_from_cache(manager, monkeypatch):
+    token = sign({"room_id": "r1"})
+    manager.verify_token(token)
+
+    def fail(token):
+        raise AssertionError("signature verified again")
+
+    monkeypatch.setattr(manager, "verify_signature", fail)
+    assert manager.verify_token(token) == {"room_id": "r1"}
+
+
+def test_cached_token_expires(manager, monkeypatch):
+    now = int(time.time())
+    token = sign({"room_id": "r1", "exp": now + 60})
+    manager.verify_token(token)
+
+    monkeypatch.setattr(jwt.time, "time", lambda: now + 61)
+    with pytest.raises(HTTPException, match="expired"):
+        manager.verify_token(token)
+    assert manager._verified == {}
+
+
+@pytest.mark.parametrize("exp", ["soon", None, True, [1]])
+def test_non_numeric_expiry_is_rejected(manager, exp):
+    with pytest.raises(HTTPException, match="exp must be a number") as error:
+        manager.verify_token(sign({"room_id": "r1", "exp": exp}))
+    assert error.value.status_code == 401
+    assert manager._verified == {}
+
+
+def test_token_is_rejected_before_its_not_before_time(manager, monkeypatch):
+    now = int(time.time())
+    token = sign({"room_id": "r1", "nbf": now + 60, "exp": now + 120})
+
+    with pytest.raises(HTTPException, match="not yet valid") as error:
+        manager.verify_token(token)
+    assert error.value.status_code == 401
+
+    monkeypatch.setattr(jwt.time, "time", lambda: now + 60)
+    assert manager.verify_token(token)["room_id"] == "r1"
+
+
+def test_non_numeric_not_before_is_rejected(manager):
+    with pytest.raises(HTTPException, match="nbf must be a number"):
+        manager.verify_token(sign({"room_id": "r1", "nbf": "2030-01-01"}))
+
+
+@pytest.mark.parametrize(
+    ("route", "public"),
+    [
+        ("POST /api/v1/room", True),
+        ("POST /api/v1/room/question", True),
+        ("POST /api/v1/room/solution", True),
+        ("POST /api/v1/room/run", True),
+        ("GET /docs", True),
+        ("GET /openapi.json", True),
+        ("GET /ready", True),
+        ("GET /metrics", True),
+        ("GET /api/v1/room/task/sse", False),
+        ("DELETE /api/v1/room", False),
+    ],
+)
+def test_public_routes(route, public):
+    assert bool(PUBLIC_ROUTES.fullmatch(route)) is public
@@ -0,0 +1,140 @@
+import asyncio
+import os
+import pickle
+from datetime import datetime
+from uuid import uuid4
+
+import pytest
+
+from src.domain.message.message import Message, RoleEnum, TypeEnum
+from src.domain.room.room import Room
+from src.domain.test.test import CodeTestCase, CodeTestSuite
+from src.usecases.interview_service.room_store import RoomStore, room_size
+from src.usecases.interview_service.service import InterviewService
+
+
+def make_room(text_bytes: int = 10_000) -> Room:
+    return Room(
+        id=uuid4(),
+        vacancy_id=uuid4(),
+        vacancy_info=None,
+        interviewee=None,
+        chat_history=[Message(RoleEnum.USER, TypeEnum.ANSWER, "x" * text_bytes)],
+        tasks=[],
+        solutions=[],
+        metrics=[],
+        created_at=datetime.now(),
+        last_task_time=datetime.now(),
+        metrics_block1=None,
+        current_test_suite=None,
+    )
+
+
+def store_for(rooms: int, spill_dir) -> RoomStore:
+    # Room for all but one of `rooms` rooms
+    return RoomStore(memory_limit=room_size(make_room()) * (rooms - 1), spill_dir=spill_dir)
+
+
+def test_spill_dir_is_created_private(tmp_path):
+    spill_dir = tmp_path / "rooms"
+    store = store_for(2, spill_dir)
+    rooms = [make_room() for _ in range(2)]
+    for room in rooms:
+        store[room.id] = room
+
+    assert store.stats().spilled == 1
+    assert spill_dir.stat().st_mode & 0o777 == 0o700
+    assert store[rooms[0].id].chat_history == rooms[0].chat_history
+
+
+def test_rooms_are_not_loaded_from_a_shared_directory(tmp_path):
+    spill_dir = tmp_path / "rooms"
+    spill_dir.mkdir(mode=0o777)
+    os.chmod(spill_dir, 0o777)
+    planted = make_room()
+    (spill_dir / f"{planted.id}.pickle").write_bytes(pickle.dumps(planted))
+
+    store = store_for(2, spill_dir)
+
+    assert planted.id not in store
+    with pytest.raises(KeyError):
+        store[planted.id]
+
+
+def test_spill_is_written_off_the_event_loop(tmp_path):
+    async def scenario():
+        store = store_for(2, tmp_path)
+        first, second = make_room(), make_room()
+        store[first.id] = first
+        store[second.id] = second
+
+        # Still resident until the thread has written the file
+        assert store.stats().resident == 2
+        while store._tasks:
+            await asyncio.sleep(0.01)
+        assert store.stats().spilled == 1
+        assert store[first.id].chat_history == first.chat_history
+
+    asyncio.run(scenario())
+
+
+def test_room_used_while_spilling_stays_resident(tmp_path):
+    async def scenario():
+        store = store_for(2, tmp_path)
+        first, second = make_room(), make_room()
+        store[first.id] = first
+        store[second.id] = second
+
+        with store.pinned(first.id):
+            while store._tasks:
+                await asyncio.sleep(0.01)
+
+        assert store.stats().spilled == 0
+        assert list(tmp_path.iterdir()) == []
+
+    asyncio.run(scenario())
+
+
+def test_rooms_left_by_a_previous_process_are_adopted(tmp_path):
+    previous = store_for(3, tmp_path)
+    mine, theirs = make_room(), make_room()
+    previous[mine.id] = mine
+    previous[theirs.id] = theirs
+    previous.spill_all()
+
+    store = store_for(3, tmp_path)
+    adopted: list[Room] = []
+    store.on_adopt = adopted.append
+
+    assert store.adopt_spilled(lambda room_id: room_id == mine.id) == 1
+    assert [room.id for room in adopted] == [mine.id]
+    assert store.adopt_spilled(lambda room_id: True) == 1
+
+
+def test_room_is_not_spilled_while_its_code_runs(service, code_runner, tmp_path, monkeypatch):
+    store = store_for(3, tmp_path)
+    monkeypatch.setattr(InterviewService, "_room_sessions", store)
+    code_runner.delay = 0.2
+
+    async def scenario():
+        room = make_room()
+        room.current_test_suite = CodeTestSuite("task", [CodeTestCase("t1", "42", "42")])
+        store[room.id] = room
+        version = room.version
+
+        run = asyncio.create_task(service.run_code(room.id, "python", "print(input())"))
+        await asyncio.sleep(0.05)
+        # Other rooms push the running one, least recently used, over the limit
+        for other in (make_room(), make_room()):
+            store[other.id] = other
+        while store._tasks:
+            await asyncio.sleep(0.01)
+        assert store.stats().spilled == 1
+        assert room.id not in store._spilled
+
+        [result] = await run
+        assert result.correct
+        assert room.version > version
+        assert store[room.id].current_test_suite.tests[0].stdout == "42"
+
+    asyncio.run(scenario())
@@ -0,0 +1,140 @@
+import asyncio
+import time
+
+import pytest
+
+from src.adapters.ai_chat.ai_utils.scheduler import LLMPriority, LLMScheduler
+
+
+async def enqueue(scheduler: LLMScheduler, priority: LLMPriority, served: list) -> asyncio.Task:
+    async def acquire():
+        await scheduler.acquire(priority)
+        served.append(priority)
+
+    task = asyncio.create_task(acquire())
+    # Let it reach the queue
+    await asyncio.sleep(0)
+    return task
+
+
+def test_slot_goes_to_the_highest_priority_then_fifo():
+    async def scenario():
+        scheduler = LLMScheduler(1)
+        await scheduler.acquire(LLMPriority.CHAT)
+        served: list[LLMPriority] = []
+        order = [LLMPriority.BACKGROUND, LLMPriority.TEST_SUITE, LLMPriority.CHAT, LLMPriority.TASK]
+        tasks = [await enqueue(scheduler, priority, served) for priority in order]
+        assert scheduler.queued(LLMPriority.BACKGROUND) == 1
+
+        for _ in tasks:
+            scheduler.release()
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+
+        assert served == sorted(order)
+        scheduler.release()
+        assert scheduler.active == 0
+
+    asyncio.run(scenario())
+
+
+@pytest.mark.parametrize(("aging", "first"), [(0.0, LLMPriority.CHAT), (0.05, LLMPriority.BACKGROUND)])
+def test_aged_waiter_is_served_before_newer_higher_priorities(aging, first):
+    async def scenario():
+        scheduler = LLMScheduler(1, aging=aging)
+        await scheduler.acquire(LLMPriority.CHAT)
+        served: list[LLMPriority] = []
+        background = await enqueue(scheduler, LLMPriority.BACKGROUND, served)
+        await asyncio.sleep(0.1)
+        chat = await enqueue(scheduler, LLMPriority.CHAT, served)
+
+        scheduler.release()
+        await asyncio.sleep(0)
+        assert served == [first]
+
+        scheduler.release()
+        await asyncio.gather(background, chat)
+
+    asyncio.run(scenario())
+
+
+def test_background_work_is_not_starved_by_steady_chat_load():
+    async def scenario():
+        scheduler = LLMScheduler(2, aging=0.1)
+        stop = asyncio.Event()
+
+        async def chat_user():
+            while not stop.is_set():
+                async with scheduler.slot(LLMPriority.CHAT):
+                    await asyncio.sleep(0.01)
+
+        # More chat users than slots: there is always a chat call waiting
+        users = [asyncio.create_task(chat_user()) for _ in range(6)]
+        await asyncio.sleep(0.05)
+        started = time.monotonic()
+        async with scheduler.slot(LLMPriority.BACKGROUND):
+            waited = time.monotonic() - started
+        stop.set()
+        await asyncio.gather(*users)
+
+        assert waited < 1.0
+        assert scheduler.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_waiter_cancelled_in_the_queue_leaves_it():
+    async def scenario():
+        scheduler = LLMScheduler(1)
+        await scheduler.acquire(LLMPriority.CHAT)
+        served: list[LLMPriority] = []
+        cancelled = await enqueue(scheduler, LLMPriority.CHAT, served)
+        waiting = await enqueue(scheduler, LLMPriority.TASK, served)
+
+        cancelled.cancel()
+        await asyncio.gather(cancelled, return_exceptions=True)
+        assert scheduler.queued(LLMPriority.CHAT) == 0
+
+        scheduler.release()
+        await waiting
+        assert served == [LLMPriority.TASK]
+        assert scheduler.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_slot_handed_to_a_cancelled_waiter_moves_on():
+    async def scenario():
+        scheduler = LLMScheduler(1)
+        await scheduler.acquire(LLMPriority.CHAT)
+        served: list[LLMPriority] = []
+        first = await enqueue(scheduler, LLMPriority.CHAT, served)
+        second = await enqueue(scheduler, LLMPriority.TASK, served)
+
+        # Handed over, then cancelled before the waiter could run
+        scheduler.release()
+        first.cancel()
+        await asyncio.gather(first, return_exceptions=True)
+
+        await second
+        assert served == [LLMPriority.TASK]
+        assert scheduler.active == 1
+        scheduler.release()
+        assert scheduler.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_slot_is_released_when_the_call_fails():
+    async def scenario():
+        scheduler = LLMScheduler(1)
+        with pytest.raises(RuntimeError):
+            async with scheduler.slot(LLMPriority.CHAT):
+                assert scheduler.active == 1
+                raise RuntimeError("LLM call failed")
+        assert scheduler.active == 0
+
+        # The released slot is free right away
+        await asyncio.wait_for(scheduler.acquire(LLMPriority.BACKGROUND), timeout=1)
+
+    asyncio.run(scenario())
@@ -0,0 +1,108 @@
+import asyncio
+import gc
+from datetime import timedelta
+from uuid import uuid4
+
+from src.domain.generation.generation import GenerationKind
+from src.domain.message.message import RoleEnum, TypeEnum
+from src.usecases.interview_service.service import InterviewService
+from tests.stubs import add_room, make_room
+
+
+async def read_all(events) -> list[tuple[str, str]]:
+    return [event async for event in events]
+
+
+def test_concurrent_requests_share_one_generation(service, ai_chat):
+    ai_chat.delay = 0.01
+    room = add_room(make_room())
+
+    async def scenario():
+        first, second = await asyncio.gather(
+            read_all(service.stream_generation(room.id, GenerationKind.WELCOME)),
+            read_all(service.stream_generation(room.id, GenerationKind.WELCOME)),
+        )
+        assert first == second
+        assert "".join(chunk for _, chunk in first) == "Hello, candidate"
+
+    asyncio.run(scenario())
+
+    assert ai_chat.calls["generate_welcome_message"] == 1
+    # Committed once
+    assert [message.content for message in room.chat_history] == ["Hello, candidate"]
+
+
+def test_stop_room_waits_for_the_running_turn(service, ai_chat, vacancy_service):
+    ai_chat.delay = 0.05
+    room = add_room(make_room())
+
+    async def scenario():
+        reader = asyncio.create_task(
+            read_all(service.stream_generation(room.id, GenerationKind.WELCOME))
+        )
+        await asyncio.sleep(0.01)
+        await service.stop_room(room.id)
+
+        # The reply was committed before the results were sent
+        [sent] = vacancy_service.results
+        assert [message.content for message in sent.chat_history] == ["Hello, candidate"]
+        assert "".join(chunk for _, chunk in await reader) == "Hello, candidate"
+
+    asyncio.run(scenario())
+
+    assert room.id not in InterviewService._room_sessions
+    assert not InterviewService._generations
+    assert room.id not in InterviewService._room_locks
+    assert ai_chat.forgotten == [room.id]
+
+
+def test_stop_room_without_answers(service, vacancy_service):
+    room = add_room(make_room())
+
+    asyncio.run(service.stop_room(room.id))
+
+    [sent] = vacancy_service.results
+    assert sent.metrics_block1.answers_count == 0
+    assert sent.metrics_block1.time_per_task == timedelta(0)
+    assert sent.metrics
+
+
+def test_stop_room_counts_answers(service, vacancy_service):
+    room = add_room(make_room(chat_bytes=10))
+
+    asyncio.run(service.stop_room(room.id))
+
+    [sent] = vacancy_service.results
+    assert sent.metrics_block1.answers_count == 1
+    assert sent.chat_history[0].role == RoleEnum.USER
+    assert sent.chat_history[0].type == TypeEnum.ANSWER
+
+
+def test_room_locks_are_not_kept_for_unknown_rooms(service):
+    async def scenario():
+        for _ in range(100):
+            async with service._room_lock(uuid4()):
+                pass
+
+    asyncio.run(scenario())
+    gc.collect()
+
+    assert len(InterviewService._room_locks) == 0
+
+
+def test_turns_of_a_room_are_sequenced(service, ai_chat):
+    ai_chat.delay = 0.01
+    room = add_room(make_room())
+
+    async def scenario():
+        welcome = asyncio.create_task(
+            read_all(service.stream_generation(room.id, GenerationKind.WELCOME))
+        )
+        await asyncio.sleep(0.005)
+        # Queued behind the welcome message on the room lock
+        await service.send_question(room.id, "Why?")
+        await welcome
+
+    asyncio.run(scenario())
+
+    assert [message.content for message in room.chat_history] == ["Hello, candidate", "Why?"]
@@ -0,0 +1,126 @@
+import asyncio
+
+import pytest
+
+from src.presentation.fast_api.sse import coalesce_chunks, encode_event
+
+
+async def source(*items: tuple[float, str], error: Exception | None = None, closed=None):
+    """
+    Yield (event id, chunk) after the given delays, ids 1, 2, ...
+    """
+    try:
+        for number, (delay, chunk) in enumerate(items, start=1):
+            await asyncio.sleep(delay)
+            yield str(number), chunk
+        if error is not None:
+            raise error
+    finally:
+        if closed is not None:
+            closed.set()
+
+
+def collect(chunks, **options) -> list:
+    async def main():
+        return [event async for event in coalesce_chunks(chunks, **options)]
+
+    return asyncio.run(main())
+
+
+def test_chunks_within_the_window_are_merged():
+    events = collect(source((0, "a"), (0, "b"), (0, "c")), window=0.05, max_size=100)
+
+    # One event with the id of its last part
+    assert events == [("3", "abc")]
+
+
+def test_window_expiry_flushes_the_batch():
+    events = collect(source((0, "a"), (0, "b"), (0.1, "c")), window=0.03, max_size=100)
+
+    assert events == [("2", "ab"), ("3", "c")]
+
+
+def test_batch_is_flushed_at_max_size():
+    events = collect(source((0, "ab"), (0, "cd"), (0, "e")), window=1.0, max_size=4)
+
+    assert events == [("2", "abcd"), ("3", "e")]
+
+
+def test_zero_window_passes_chunks_through():
+    events = collect(source((0, "a"), (0, ""), (0, "b")), window=0.0, max_size=100)
+
+    # Empty chunks are dropped
+    assert events == [("1", "a"), ("3", "b")]
+
+
+def test_idle_source_gets_heartbeats():
+    events = collect(source((0.12, "a")), window=0.01, max_size=100, heartbeat=0.05)
+
+    assert events[:2] == [None, None]
+    assert events[-1] == ("1", "a")
+
+
+def test_no_heartbeats_while_a_batch_is_pending():
+    events = collect(
+        source((0, "a"), (0.02, "b")), window=0.2, max_size=100, heartbeat=0.01
+    )
+
+    assert events == [("2", "ab")]
+
+
+def test_last_partial_batch_is_flushed_when_the_source_ends():
+    # Ends long before the window would expire
+    events = collect(source((0, "a"), (0, "b")), window=10.0, max_size=100)
+
+    assert events == [("2", "ab")]
+
+
+def test_partial_batch_is_delivered_before_the_source_error():
+    async def main():
+        received = []
+        with pytest.raises(RuntimeError, match="cancelled"):
+            async for event in coalesce_chunks(
+                source((0, "a"), (0, "b"), error=RuntimeError("generation was cancelled")),
+                window=10.0,
+                max_size=100,
+            ):
+                received.append(event)
+        return received
+
+    assert asyncio.run(main()) == [("2", "ab")]
+
+
+def test_closing_the_stream_between_chunks_closes_the_source():
+    async def main():
+        closed = asyncio.Event()
+        chunks = coalesce_chunks(
+            source((0, "a"), (10, "b"), closed=closed), window=0.0, max_size=100
+        )
+        assert await anext(chunks) == ("1", "a")
+
+        await chunks.aclose()
+        assert closed.is_set()
+
+    asyncio.run(main())
+
+
+def test_cancelling_a_read_closes_the_source():
+    async def main():
+        closed = asyncio.Event()
+        chunks = coalesce_chunks(
+            source((0, "a"), (10, "b"), closed=closed), window=10.0, max_size=100
+        )
+        # Waits for the window with "a" buffered and "b" pending
+        reader = asyncio.create_task(anext(chunks))
+        await asyncio.sleep(0.01)
+        reader.cancel()
+        await asyncio.gather(reader, return_exceptions=True)
+
+        await asyncio.wait_for(closed.wait(), timeout=1)
+
+    asyncio.run(main())
+
+
+def test_encode_event():
+    assert encode_event({"type": "start"}) == b'data: {"type":"start"}\n\n'
+    assert encode_event({"a": 1}, "3.4") == b'id: 3.4\ndata: {"a":1}\n\n'
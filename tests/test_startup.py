@@ -0,0 +1,26 @@
+import os
+
+from benchmarks.import_time import import_seconds, loaded_modules
+
+# Seconds that importing src.main may add on top of importing fastapi itself
+STARTUP_BUDGET = float(os.environ.get("STARTUP_IMPORT_BUDGET_SECONDS", "0.6"))
+
+# Loaded on first use by the adapters, never at import
+LAZY_MODULES = ("openai", "aiohttp", "jose", "cryptography")
+
+
+def test_heavy_dependencies_are_not_imported_at_startup():
+    loaded = loaded_modules()
+
+    assert [name for name in LAZY_MODULES if name in loaded] == []
+
+
+def test_startup_import_time_within_budget():
+    # Best of several runs, compared to the framework alone to cancel out machine speed
+    app = min(import_seconds("src.main") for _ in range(3))
+    framework = min(import_seconds("fastapi") for _ in range(3))
+
+    assert app - framework < STARTUP_BUDGET, (
+        f"import src.main takes {app - framework:.3f}s more than fastapi, "
+        f"budget is {STARTUP_BUDGET:.3f}s; see python -m benchmarks.import_time"
+    )
@@ -0,0 +1,86 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.core.setting import settings
+from src.domain.generation.generation import GenerationKind
+from src.usecases.interview_service.service import InterviewService
+from tests.stubs import add_room, make_room
+
+
+@pytest.fixture
+def room(service):
+    return add_room(make_room())
+
+
+@pytest.fixture
+def session(app, room):
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            "/api/v1/room/ws", headers={"cookie": f"room_id={room.id}"}
+        ) as websocket:
+            yield websocket
+
+
+def receive_stream(websocket) -> list[dict]:
+    frames = [websocket.receive_json()]
+    while frames[-1]["type"] not in ("complete", "error"):
+        frames.append(websocket.receive_json())
+    return frames
+
+
+def test_welcome_is_streamed(session):
+    session.send_json({"type": "welcome", "ref": "w1"})
+
+    frames = receive_stream(session)
+
+    assert (frames[0]["type"], frames[-1]["type"]) == ("start", "complete")
+    assert {frame["ref"] for frame in frames} == {"w1"}
+    assert "".join(f["content"] for f in frames if f["type"] == "message_chunk") == (
+        "Hello, candidate"
+    )
+
+
+def test_binary_frame_is_answered_with_an_error(session):
+    session.send_bytes(b'{"type": "welcome"}')
+
+    assert session.receive_json() == {
+        "type": "error",
+        "message": "Binary frames are not supported, send JSON text",
+    }
+    # The session goes on
+    session.send_json({"type": "welcome", "ref": "w1"})
+    assert receive_stream(session)[-1]["type"] == "complete"
+
+
+@pytest.mark.parametrize("raw", ["{not json", '{"type": "dance"}', '{"type": "question"}'])
+def test_invalid_frame_is_answered_with_an_error(session, raw):
+    session.send_text(raw)
+
+    frame = session.receive_json()
+    assert frame["type"] == "error"
+    assert frame["message"].startswith("Invalid frame")
+
+
+def test_disconnect_detaches_the_stream(app, room, ai_chat, monkeypatch):
+    monkeypatch.setattr(settings, "stream_abandon_grace_seconds", 0.0)
+    ai_chat.chunks = ["chunk "] * 1000
+    ai_chat.delay = 0.01
+
+    with TestClient(app) as client:
+        with client.websocket_connect(
+            "/api/v1/room/ws", headers={"cookie": f"room_id={room.id}"}
+        ) as websocket:
+            websocket.send_json({"type": "welcome"})
+            assert websocket.receive_json()["type"] == "start"
+            assert websocket.receive_json()["type"] == "message_chunk"
+        # The session ended without an error, its reader is gone
+
+        generation = InterviewService._generations[(room.id, GenerationKind.WELCOME)]
+        deadline = time.monotonic() + 5
+        while not generation.done and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert generation.readers == 0
+    assert generation.abandoned
@@ -0,0 +1,110 @@
+import asyncio
+import time
+from uuid import UUID, uuid4
+
+import aiohttp
+import pytest
+import uvicorn
+from fastapi import FastAPI
+
+from benchmarks.load_test import free_port
+from src.core.setting import settings
+from src.core.workers import room_owner, worker_socket_path
+from src.presentation.fast_api.middlewares.worker_router import (
+    WorkerRoutingMiddleware,
+    close_worker_sessions,
+)
+from src.usecases.interview_service.service import (
+    InterviewService,
+    _abandoned_generations_total,
+)
+from tests.stubs import add_room, make_room
+
+
+def room_of_worker(index: int) -> UUID:
+    room_id = uuid4()
+    while room_owner(room_id, settings.server_workers) != index:
+        room_id = uuid4()
+    return room_id
+
+
+@pytest.fixture
+def two_workers(app, tmp_path, monkeypatch):
+    """
+    This process acts as worker 0 on a TCP port and as worker 1 on its unix
+    socket, so requests of worker 1's rooms go through the proxy
+    """
+    monkeypatch.setattr(settings, "server_workers", 2)
+    monkeypatch.setattr(settings, "server_worker_index", 0)
+    monkeypatch.setattr(settings, "server_runtime_dir", str(tmp_path))
+    monkeypatch.setattr(settings, "stream_abandon_grace_seconds", 0.0)
+
+    app.add_middleware(WorkerRoutingMiddleware)
+    return app
+
+
+async def until(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.02)
+
+
+def run_workers(app: FastAPI, scenario) -> None:
+    async def main():
+        port = free_port()
+        options = dict(lifespan="off", log_level="warning", timeout_graceful_shutdown=1)
+        servers = [
+            uvicorn.Server(uvicorn.Config(app, port=port, **options)),
+            uvicorn.Server(uvicorn.Config(app, uds=str(worker_socket_path(1)), **options)),
+        ]
+        tasks = [asyncio.create_task(server.serve()) for server in servers]
+        try:
+            await until(lambda: all(server.started for server in servers))
+            await scenario(f"http://127.0.0.1:{port}/api/v1")
+        finally:
+            for server in servers:
+                server.should_exit = True
+            await asyncio.gather(*tasks)
+            await close_worker_sessions()
+
+    asyncio.run(main())
+
+
+def test_disconnect_through_the_proxy_abandons_the_generation(two_workers, ai_chat):
+    ai_chat.chunks = ["chunk "] * 1000
+    ai_chat.delay = 0.02
+    room = add_room(make_room(room_of_worker(1)))
+    abandoned = _abandoned_generations_total.labels("welcome")
+    before = abandoned.value
+
+    async def scenario(base_url: str):
+        async with aiohttp.ClientSession(cookies={"room_id": str(room.id)}) as client:
+            response = await client.get(f"{base_url}/room/welcome/sse")
+            assert response.status == 200
+            while b"message_chunk" not in await response.content.readline():
+                pass
+            response.close()
+
+        await until(lambda: abandoned.value == before + 1)
+        # What the candidate saw is kept, the rest was never generated
+        reply = room.chat_history[-1].content
+        assert reply.startswith("chunk ") and len(reply) < len("chunk ") * 1000
+
+    run_workers(two_workers, scenario)
+
+
+def test_observer_disconnect_through_the_proxy_unsubscribes(two_workers):
+    room = add_room(make_room(room_of_worker(1)))
+
+    async def scenario(base_url: str):
+        async with aiohttp.ClientSession() as client:
+            response = await client.get(f"{base_url}/room/{room.id}/observe/sse")
+            assert b"observe" in await response.content.readline()
+            hub = InterviewService._hubs[room.id]
+            assert len(hub) == 1
+            response.close()
+
+        await until(lambda: len(hub) == 0)
+
+    run_workers(two_workers, scenario)